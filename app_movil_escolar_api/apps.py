@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class AppMovilEscolarApiConfig(AppConfig):
+    name = "app_movil_escolar_api"
+
+    def ready(self):
+        # Conecta las señales que alimentan la bitácora de sincronización y
+        # las que invalidan el caché
+        from . import caching, sync  # noqa: F401
@@ -0,0 +1,329 @@
+import math
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .metrics import registry
+from .models import Administradores, Alumnos, EventoAcademico, Maestros
+
+# Buckets (segundos) para el tiempo de recálculo de un valor
+COMPUTE_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+def _cambio_usuario(instance, created, update_fields):
+    # El login solo toca last_login y un usuario nuevo aún no aparece en
+    # ninguna lista ni detalle cacheado: ninguno de los dos invalida
+    return not created and set(update_fields or ()) != {"last_login"}
+
+
+# Grupo -> {modelo: condición}. Guardar o borrar uno de esos modelos (si la
+# condición se cumple) invalida todas las llaves del grupo
+INVALIDA = {
+    "eventos": {
+        EventoAcademico: None,
+        User: _cambio_usuario,
+    },
+    "estadisticas": {
+        Administradores: None,
+        Alumnos: None,
+        Maestros: None,
+        User: _cambio_usuario,
+    },
+}
+
+# Modelo -> grupo de sus detalles. Guardar o borrar un objeto invalida solo
+# las llaves de ese objeto (ver get_or_compute(objeto=...))
+DETALLES = {
+    Administradores: "admin",
+    Alumnos: "alumno",
+    Maestros: "maestro",
+    EventoAcademico: "evento",
+    # Datos del usuario anidados en perfiles y eventos (ver dependencias)
+    User: "usuario",
+}
+
+
+def _cache():
+    return caches[settings.CACHE_HELPER_ALIAS]
+
+
+def _llave_version(grupo, objeto=None):
+    return f"ver:{grupo}" if objeto is None else f"ver:{grupo}:{objeto}"
+
+
+def versiones(*pares):
+    """
+    Versiones vigentes de los (grupo, objeto) pedidos (objeto None = el
+    grupo completo), en una sola lectura del caché. Van dentro de las
+    llaves, así que invalidar es solo cambiarlas. Empiezan en un valor único
+    (no en 1) para que, si el caché las desaloja, la nueva no coincida con
+    llaves viejas que sigan ahí.
+    """
+    cache = _cache()
+    llaves = [_llave_version(grupo, objeto) for grupo, objeto in pares]
+    actuales = cache.get_many(llaves)
+    for llave in llaves:
+        if llave not in actuales:
+            cache.add(llave, time.time_ns(), None)
+            actuales[llave] = cache.get(llave)
+    return [actuales[llave] for llave in llaves]
+
+
+def version(grupo, objeto=None):
+    return versiones((grupo, objeto))[0]
+
+
+def invalidar(grupo, objeto=None):
+    """
+    Invalida todas las llaves de `grupo`, o solo las de `objeto` dentro del
+    grupo (las viejas expiran solas)
+    """
+    try:
+        _cache().incr(_llave_version(grupo, objeto))
+    except ValueError:
+        # Aún no tenía versión: la primera que se cree ya es nueva
+        pass
+
+
+class _Vuelos:
+    """
+    Recálculos en curso en este proceso: el primer hilo que pide una llave
+    la calcula y los demás esperan su resultado en lugar de ir también a
+    la base
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._eventos = {}
+
+    def tomar(self, llave):
+        with self._lock:
+            if llave in self._eventos:
+                return False
+            self._eventos[llave] = threading.Event()
+            return True
+
+    def soltar(self, llave):
+        with self._lock:
+            evento = self._eventos.pop(llave, None)
+        if evento:
+            evento.set()
+
+    def esperar(self, llave, timeout):
+        with self._lock:
+            evento = self._eventos.get(llave)
+        if evento is None:
+            time.sleep(min(timeout, 0.05))
+        else:
+            evento.wait(timeout)
+
+
+_vuelos = _Vuelos()
+
+
+def get_or_compute(
+    grupo, clave, calcular, ttl, beta=1.0, objeto=None, dependencias=None
+):
+    """
+    Valor de `clave` en `grupo`, o `calcular()` si no está o ya venció.
+
+    - Single-flight: solo una petición recalcula cada llave (un hilo por
+      proceso y, entre procesos, quien gana el candado en el caché). Las
+      demás usan el valor anterior si existe o esperan el nuevo.
+    - Expiración anticipada probabilística (XFetch): cerca de vencer, cada
+      lectura tiene una probabilidad creciente de recalcular antes de tiempo,
+      mayor cuanto más caro fue el cálculo; con `beta` > 1 se adelanta más.
+      Así el valor casi nunca llega a vencer con tráfico.
+    - El valor anterior se conserva CACHE_STALE_SECONDS después de vencer
+      para servirlo mientras otro lo recalcula.
+
+    Con `objeto` la llave lleva también la versión de ese objeto:
+    invalidar(grupo, objeto) descarta solo sus llaves. `dependencias(valor)`
+    regresa los (grupo, objeto) de otros datos incluidos en el valor (p. ej.
+    el usuario anidado en un perfil); si alguno cambió, el valor se
+    recalcula. Con CACHE_VERIFY_RATE una fracción de los aciertos se
+    compara contra la base para medir cuántos estaban desactualizados.
+    """
+    if not settings.CACHE_HELPER_ENABLED:
+        return calcular()
+    cache = _cache()
+    llave = _llave(grupo, clave, objeto)
+    limite = time.monotonic() + settings.CACHE_LOCK_SECONDS
+    espero = False
+    while True:
+        guardado = cache.get(llave)
+        if guardado is not None and not _vigente(cache, guardado[3]):
+            guardado = None
+        if guardado is not None:
+            valor, expira, costo, _ = guardado
+            # -log(u) con u en (0, 1]: casi siempre chico, a veces grande
+            adelanto = -costo * beta * math.log(1.0 - random.random())
+            if time.time() + adelanto < expira:
+                registry.inc("cache_requests_total", {"group": grupo, "result": "hit"})
+                if random.random() < settings.CACHE_VERIFY_RATE:
+                    return _verificar(grupo, valor, calcular)
+                return valor
+        if _tomar(cache, llave):
+            resultado = "early" if guardado is not None else "miss"
+            registry.inc("cache_requests_total", {"group": grupo, "result": resultado})
+            try:
+                return _recalcular(cache, grupo, llave, calcular, ttl, dependencias)
+            finally:
+                _soltar(cache, llave)
+        if guardado is not None:
+            # Otro ya lo recalcula: mientras, el valor anterior
+            registry.inc("cache_requests_total", {"group": grupo, "result": "stale"})
+            return guardado[0]
+        if time.monotonic() >= limite:
+            # Quien lo calculaba tardó demasiado o murió: se calcula aquí
+            registry.inc("cache_requests_total", {"group": grupo, "result": "timeout"})
+            return _recalcular(cache, grupo, llave, calcular, ttl, dependencias)
+        if not espero:
+            espero = True
+            registry.inc("cache_requests_total", {"group": grupo, "result": "wait"})
+        _vuelos.esperar(llave, min(0.1, limite - time.monotonic()))
+
+
+def refrescar(grupo, clave, calcular, ttl):
+    """
+    Recalcula y guarda `clave` aunque siga vigente, para quien la mantiene
+    caliente (ver scheduler.py). Si alguien ya la recalcula no hace nada.
+    """
+    if not settings.CACHE_HELPER_ENABLED:
+        return
+    cache = _cache()
+    llave = _llave(grupo, clave)
+    if _tomar(cache, llave):
+        registry.inc("cache_requests_total", {"group": grupo, "result": "refresh"})
+        try:
+            _recalcular(cache, grupo, llave, calcular, ttl, None)
+        finally:
+            _soltar(cache, llave)
+
+
+def _llave(grupo, clave, objeto=None):
+    if objeto is None:
+        return f"{grupo}:{version(grupo)}:{clave}"
+    vigentes = versiones((grupo, None), (grupo, objeto))
+    return f"{grupo}:{vigentes[0]}:{objeto}:{vigentes[1]}:{clave}"
+
+
+def clave_seleccion(seleccion):
+    """
+    Parte de la llave para una selección de ?fields=/?expand= (None = todo);
+    sin espacios ni caracteres que Memcached rechace
+    """
+    return "*" if seleccion is None else ",".join(seleccion)
+
+
+def detalle(grupo, objeto_id, seleccion, calcular, dependencias=None):
+    """
+    get_or_compute() para el detalle de un objeto por id (?id=), una llave
+    por selección de campos. Un id que no es número no se cachea: la vista
+    responde como siempre.
+    """
+    if not str(objeto_id or "").isdigit():
+        return calcular()
+    return get_or_compute(
+        grupo,
+        clave_seleccion(seleccion),
+        calcular,
+        settings.DETALLE_CACHE_TTL,
+        objeto=int(objeto_id),
+        dependencias=dependencias,
+    )
+
+
+def usuario_en(campo):
+    """
+    dependencias() para un detalle con el usuario anidado en `campo` (si la
+    selección de campos lo incluye)
+    """
+
+    def dependencias(valor):
+        anidado = valor.get(campo)
+        if isinstance(anidado, dict) and anidado.get("id") is not None:
+            return [("usuario", anidado["id"])]
+        return []
+
+    return dependencias
+
+
+def _vigente(cache, dependientes):
+    # Las versiones de las dependencias con las que se calculó siguen igual
+    if not dependientes:
+        return True
+    return cache.get_many(list(dependientes)) == dependientes
+
+
+def _verificar(grupo, valor, calcular):
+    fresco = calcular()
+    resultado = "match" if fresco == valor else "mismatch"
+    registry.inc("cache_verify_total", {"group": grupo, "result": resultado})
+    return fresco
+
+
+def _tomar(cache, llave):
+    if not _vuelos.tomar(llave):
+        return False
+    if cache.add(f"lock:{llave}", 1, settings.CACHE_LOCK_SECONDS):
+        return True
+    _vuelos.soltar(llave)
+    return False
+
+
+def _soltar(cache, llave):
+    cache.delete(f"lock:{llave}")
+    _vuelos.soltar(llave)
+
+
+def _recalcular(cache, grupo, llave, calcular, ttl, dependencias):
+    inicio = time.perf_counter()
+    valor = calcular()
+    costo = time.perf_counter() - inicio
+    registry.observe(
+        "cache_compute_seconds", {"group": grupo}, costo, buckets=COMPUTE_BUCKETS
+    )
+    dependientes = {}
+    if dependencias is not None:
+        # Se leen después de calcular (las dependencias salen del valor): un
+        # cambio que hace commit justo durante el cálculo puede quedar sin
+        # ver hasta el TTL; CACHE_VERIFY_RATE lo mide
+        pares = dependencias(valor)
+        dependientes = dict(
+            zip([_llave_version(*par) for par in pares], versiones(*pares))
+        )
+    cache.set(
+        llave,
+        (valor, time.time() + ttl, costo, dependientes),
+        ttl + settings.CACHE_STALE_SECONDS,
+    )
+    return valor
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def _invalidar_grupos(sender, instance, created=False, update_fields=None, **kwargs):
+    if kwargs.get("raw"):
+        return
+    for grupo, modelos in INVALIDA.items():
+        if sender not in modelos:
+            continue
+        condicion = modelos[sender]
+        if condicion is None or condicion(instance, created, update_fields):
+            # Después del commit: antes, quien recalcule aún leería lo viejo
+            transaction.on_commit(lambda grupo=grupo: invalidar(grupo))
+    grupo = DETALLES.get(sender)
+    if grupo and (
+        sender is not User or _cambio_usuario(instance, created, update_fields)
+    ):
+        # El pk se lee ya: después de un delete Django lo deja en None
+        pk = instance.pk
+        transaction.on_commit(lambda grupo=grupo, pk=pk: invalidar(grupo, pk))
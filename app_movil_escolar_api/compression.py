@@ -0,0 +1,249 @@
+import gzip
+import zlib
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.regex_helper import _lazy_re_compile
+
+from .instrumentation import measure
+from .metrics import registry
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli es opcional
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - zstandard es opcional
+    zstandard = None
+
+# En streaming se vacía el compresor cada tantos bytes de entrada: chunks
+# chicos se comprimen juntos (mejor razón) sin retener demasiado la salida
+STREAM_FLUSH_BYTES = 64 * 1024
+
+_ACCEPT_ENCODING = _lazy_re_compile(r"\s*([\w*-]+)\s*(?:;\s*q\s*=\s*([\d.]+))?\s*")
+
+
+def parse_accept_encoding(header):
+    """
+    Regresa {codificación: q} del header Accept-Encoding
+    """
+    codificaciones = {}
+    for parte in header.split(","):
+        match = _ACCEPT_ENCODING.fullmatch(parte)
+        if not match:
+            continue
+        try:
+            q = float(match[2]) if match[2] else 1.0
+        except ValueError:
+            continue
+        codificaciones[match[1].lower()] = q
+    return codificaciones
+
+
+class Codec:
+    """
+    Una codificación de Content-Encoding: comprime un cuerpo completo o un
+    iterador (respuestas streaming) sin juntarlo en memoria
+    """
+
+    name = None
+
+    def __init__(self, level):
+        self.level = level
+
+    def compress(self, data):
+        raise NotImplementedError
+
+    def compressor(self):
+        """
+        Objeto con compress(chunk), flush() (entrega lo pendiente sin cerrar)
+        y finish() (cierra el stream)
+        """
+        raise NotImplementedError
+
+    def compress_stream(self, chunks):
+        compressor = self.compressor()
+        pendiente = 0
+        for chunk in chunks:
+            data = compressor.compress(chunk)
+            pendiente += len(chunk)
+            if pendiente >= STREAM_FLUSH_BYTES:
+                data += compressor.flush()
+                pendiente = 0
+            if data:
+                yield data
+        yield compressor.finish()
+
+
+class GzipCodec(Codec):
+    name = "gzip"
+
+    def compress(self, data):
+        # mtime=0: la misma respuesta siempre produce los mismos bytes
+        return gzip.compress(data, compresslevel=self.level, mtime=0)
+
+    def compressor(self):
+        return _ZlibStream(zlib.compressobj(self.level, zlib.DEFLATED, 31))
+
+
+class _ZlibStream:
+    def __init__(self, compressobj):
+        self._obj = compressobj
+
+    def compress(self, chunk):
+        return self._obj.compress(chunk)
+
+    def flush(self):
+        return self._obj.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._obj.flush()
+
+
+class BrotliCodec(Codec):
+    name = "br"
+
+    def compress(self, data):
+        return brotli.compress(data, quality=self.level)
+
+    def compressor(self):
+        return _BrotliStream(brotli.Compressor(quality=self.level))
+
+
+class _BrotliStream:
+    def __init__(self, compressor):
+        self._obj = compressor
+
+    def compress(self, chunk):
+        return self._obj.process(chunk)
+
+    def flush(self):
+        return self._obj.flush()
+
+    def finish(self):
+        return self._obj.finish()
+
+
+class ZstdCodec(Codec):
+    name = "zstd"
+
+    def compress(self, data):
+        return zstandard.ZstdCompressor(level=self.level).compress(data)
+
+    def compressor(self):
+        return _ZstdStream(zstandard.ZstdCompressor(level=self.level).compressobj())
+
+
+class _ZstdStream:
+    def __init__(self, compressobj):
+        self._obj = compressobj
+
+    def compress(self, chunk):
+        return self._obj.compress(chunk)
+
+    def flush(self):
+        return self._obj.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self):
+        return self._obj.flush()
+
+
+def available_codecs():
+    """
+    Codecs instalados en orden de preferencia del servidor (mejor primero)
+    """
+    codecs = []
+    if brotli is not None:
+        codecs.append(BrotliCodec(settings.COMPRESSION_BROTLI_QUALITY))
+    if zstandard is not None:
+        codecs.append(ZstdCodec(settings.COMPRESSION_ZSTD_LEVEL))
+    codecs.append(GzipCodec(settings.COMPRESSION_GZIP_LEVEL))
+    return [c for c in codecs if c.name in settings.COMPRESSION_ENCODINGS]
+
+
+def choose_codec(codecs, accept_encoding):
+    """
+    El codec con mayor q en Accept-Encoding; a igual q, el preferido del
+    servidor. "*" cubre las codificaciones no mencionadas y q=0 las excluye.
+    """
+    aceptadas = parse_accept_encoding(accept_encoding)
+    comodin = aceptadas.get("*", 0.0)
+    mejor, mejor_q = None, 0.0
+    for codec in codecs:
+        q = aceptadas.get(codec.name, comodin)
+        if q > mejor_q:
+            mejor, mejor_q = codec, q
+    return mejor
+
+
+class CompressionMiddleware:
+    """
+    Comprime las respuestas según Accept-Encoding: brotli o zstd si están
+    instalados, si no gzip. Solo comprime tipos de texto (JSON, HTML, ...)
+    de al menos COMPRESSION_MIN_SIZE bytes; las respuestas streaming se
+    comprimen por chunks, sin juntarlas en memoria.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.codecs = available_codecs()
+        self.min_size = settings.COMPRESSION_MIN_SIZE
+        self.content_types = tuple(settings.COMPRESSION_CONTENT_TYPES)
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        return self.process_response(request, response)
+
+    def compressible(self, response):
+        if response.has_header("Content-Encoding") or response.status_code in (
+            204,
+            206,
+            304,
+        ):
+            return False
+        content_type = response.get("Content-Type", "").split(";")[0].strip()
+        if not content_type.startswith(self.content_types):
+            return False
+        if response.streaming:
+            # Los iteradores async (ASGI) se quedan sin comprimir
+            return not response.is_async
+        return len(response.content) >= self.min_size
+
+    def process_response(self, request, response):
+        if not self.codecs or not self.compressible(response):
+            return response
+
+        # La respuesta depende de Accept-Encoding aunque esta no se comprima
+        patch_vary_headers(response, ("Accept-Encoding",))
+        codec = choose_codec(self.codecs, request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        if codec is None:
+            return response
+
+        if response.streaming:
+            response.streaming_content = codec.compress_stream(
+                response.streaming_content
+            )
+            # Ya no se conoce el tamaño final
+            response.headers.pop("Content-Length", None)
+        else:
+            original = len(response.content)
+            with measure("cmp"):
+                compressed = codec.compress(response.content)
+            if len(compressed) >= original:
+                return response
+            response.content = compressed
+            response.headers["Content-Length"] = str(len(compressed))
+            labels = {"encoding": codec.name}
+            registry.inc("http_response_uncompressed_bytes_total", labels, original)
+            registry.inc(
+                "http_response_compressed_bytes_total", labels, len(compressed)
+            )
+
+        # La representación cambió: el ETag fuerte ya no aplica byte a byte
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = codec.name
+        return response
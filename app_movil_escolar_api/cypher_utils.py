@@ -1,8 +1,4 @@
 import base64
-from cryptography.fernet import Fernet, InvalidToken
-from cryptography.hazmat.backends import default_backend
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 from django.conf import settings
 
 class CypherUtils:
@@ -21,6 +17,12 @@ class CypherUtils:
 
     @staticmethod
     def cipherFernet(password):
+        # cryptography es pesado de importar; solo se carga cuando se cifra algo
+        from cryptography.fernet import Fernet
+        from cryptography.hazmat.backends import default_backend
+        from cryptography.hazmat.primitives import hashes
+        from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+
         key = PBKDF2HMAC(algorithm=hashes.SHA256(), length=32, salt=b'hdjk', iterations=1000, backend=default_backend()).derive(password)
         return Fernet(base64.urlsafe_b64encode(key))
 
@@ -1,9 +1,83 @@
-from app_movil_escolar_api.models import *
-import json
-import requests
-import datetime
+import logging
+import os
 import random
 import string
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
+from .metrics import registry
+
+logger = logging.getLogger(__name__)
+
+# Content types que cuentan como imagen en is_url_image
+IMAGE_FORMATS = ("image/png", "image/jpeg", "image/jpg")
+
+# Buckets (segundos) para revisar una URL remota
+URL_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_lock = threading.Lock()
+_session = None
+_session_pid = None
+_resultados = None
+
+
+def _sesion():
+    # Una sesión por proceso: reusa las conexiones (keep-alive) a cada host.
+    # requests se importa aquí para no cargarlo en el arranque de la instancia
+    global _session, _session_pid
+    with _lock:
+        if _session is None or _session_pid != os.getpid():
+            # Tras un fork no se comparten los sockets del padre
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            session = requests.Session()
+            # Sin reintentos: una URL caída cuesta a lo más los timeouts
+            adapter = HTTPAdapter(pool_maxsize=settings.URL_CHECK_WORKERS, max_retries=0)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.max_redirects = 5
+            _session = session
+            _session_pid = os.getpid()
+        return _session
+
+
+def _cache():
+    # LRU con TTL: a lo más URL_CHECK_CACHE_SIZE URLs por URL_CHECK_CACHE_TTL
+    # segundos. Se usa siempre con _lock (TTLCache no es thread-safe)
+    global _resultados
+    if _resultados is None:
+        from cachetools import TTLCache
+
+        _resultados = TTLCache(
+            maxsize=settings.URL_CHECK_CACHE_SIZE, ttl=settings.URL_CHECK_CACHE_TTL
+        )
+    return _resultados
+
+
+def _en_cache(url):
+    with _lock:
+        return _cache().get(url)
+
+
+def _revisar(url):
+    """
+    Content type de la URL (sin parámetros), o None si no responde bien.
+    Primero HEAD; si el servidor no lo acepta, GET sin leer el cuerpo.
+    """
+    session = _sesion()
+    timeout = (settings.URL_CHECK_CONNECT_TIMEOUT, settings.URL_CHECK_READ_TIMEOUT)
+    r = session.head(url, timeout=timeout, allow_redirects=True)
+    if r.status_code in (405, 501):
+        r = session.get(url, timeout=timeout, stream=True)
+        r.close()
+    if r.status_code >= 400:
+        return None
+    return r.headers.get("content-type", "").split(";")[0].strip().lower()
+
 
 class DataUtils:
 
@@ -66,12 +140,59 @@ class DataUtils:
 
     @staticmethod
     def is_url_image(image_url):
-        image_formats = ("image/png", "image/jpeg", "image/jpg")
-        r = requests.head(image_url)
-        print("Content type:: "+str(r.headers["content-type"]))
-        if r.headers["content-type"] in image_formats:
-            return True
-        return False
+        """
+        True si la URL responde con un content type de imagen (PNG o JPEG).
+        El resultado se recuerda URL_CHECK_CACHE_TTL segundos; si la URL no
+        responde a tiempo regresa False y no se recuerda.
+        """
+        if not image_url or not DataUtils.is_url(image_url):
+            return False
+        guardado = _en_cache(image_url)
+        if guardado is not None:
+            registry.inc("url_checks_total", {"result": "cached"})
+            return guardado
+
+        import requests
+
+        inicio = time.perf_counter()
+        try:
+            content_type = _revisar(image_url)
+        except requests.RequestException as e:
+            logger.warning("No se pudo revisar la URL %s: %s", image_url, e)
+            registry.inc("url_checks_total", {"result": "error"})
+            return False
+        finally:
+            registry.observe(
+                "url_check_seconds", {}, time.perf_counter() - inicio, buckets=URL_BUCKETS
+            )
+        es_imagen = content_type in IMAGE_FORMATS
+        registry.inc("url_checks_total", {"result": "image" if es_imagen else "not_image"})
+        with _lock:
+            _cache()[image_url] = es_imagen
+        return es_imagen
+
+    @staticmethod
+    def are_urls_images(urls):
+        """
+        {url: bool} de is_url_image para varias URLs. Las que no están en
+        caché se revisan a la vez en hasta URL_CHECK_WORKERS hilos, así que
+        el total tarda lo que la más lenta y no la suma de todas.
+        """
+        urls = list(dict.fromkeys(urls))
+        resultado = {}
+        pendientes = []
+        for url in urls:
+            if url and DataUtils.is_url(url) and _en_cache(url) is None:
+                pendientes.append(url)
+            else:
+                resultado[url] = DataUtils.is_url_image(url)
+        if len(pendientes) == 1:
+            resultado[pendientes[0]] = DataUtils.is_url_image(pendientes[0])
+        elif pendientes:
+            workers = min(settings.URL_CHECK_WORKERS, len(pendientes))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="urls") as pool:
+                resultado.update(zip(pendientes, pool.map(DataUtils.is_url_image, pendientes)))
+        return {url: resultado[url] for url in urls}
 
     @staticmethod
     def getUrl(request):
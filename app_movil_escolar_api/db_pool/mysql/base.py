@@ -0,0 +1,7 @@
+from django.db.backends.mysql import base
+
+from ..pool import PooledDatabaseWrapper
+
+
+class DatabaseWrapper(PooledDatabaseWrapper, base.DatabaseWrapper):
+    pass
@@ -0,0 +1,246 @@
+import os
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+
+from ..metrics import registry
+
+# Buckets (segundos) para la espera por una conexión del pool
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class _Conexion:
+    __slots__ = ("raw", "creada", "usada")
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.creada = self.usada = time.monotonic()
+
+
+class ConnectionPool:
+    """
+    Conexiones abiertas de una base (alias) en este proceso, a lo más
+    `size`. Los hilos que no encuentran una libre esperan hasta `timeout`
+    segundos. Una conexión que estuvo inactiva más de `check_after`
+    segundos se prueba con SELECT 1 antes de entregarla; las que rebasan
+    `max_idle` sin usarse o `max_lifetime` de vida se cierran.
+    """
+
+    def __init__(self, alias, size, timeout, check_after, max_idle, max_lifetime):
+        self.alias = alias
+        self.size = size
+        self.timeout = timeout
+        self.check_after = check_after
+        self.max_idle = max_idle
+        self.max_lifetime = max_lifetime
+        self._cond = threading.Condition()
+        # Libres, la usada más recientemente al final (sigue caliente)
+        self._libres = deque()
+        # Conexiones abiertas: libres más prestadas
+        self._abiertas = 0
+        # conexión cruda -> _Conexion, de las prestadas
+        self._prestadas = {}
+
+    def get(self, conectar):
+        """
+        Presta una conexión, reutilizando una libre o abriendo otra con
+        `conectar()` si hay cupo. Lanza PoolTimeout si el pool sigue lleno
+        después de `timeout` segundos.
+        """
+        inicio = time.monotonic()
+        limite = inicio + self.timeout
+        esperando = False
+        while True:
+            with self._cond:
+                self._cerrar_inactivas()
+                while not self._libres and self._abiertas >= self.size:
+                    if not esperando:
+                        esperando = True
+                        registry.inc("db_pool_exhausted_total", {"alias": self.alias})
+                    restante = limite - time.monotonic()
+                    if restante <= 0:
+                        registry.inc("db_pool_timeouts_total", {"alias": self.alias})
+                        raise PoolTimeout(
+                            f"Pool de '{self.alias}' lleno ({self.size} conexiones) "
+                            f"por más de {self.timeout} s"
+                        )
+                    self._cond.wait(restante)
+                conexion = self._libres.pop() if self._libres else None
+                if conexion is None:
+                    self._abiertas += 1
+
+            if conexion is None:
+                try:
+                    conexion = _Conexion(conectar())
+                except BaseException:
+                    self._descontar()
+                    raise
+            elif time.monotonic() - conexion.usada > self.check_after:
+                if not self._sana(conexion.raw):
+                    registry.inc(
+                        "db_pool_health_check_failures_total", {"alias": self.alias}
+                    )
+                    self._cerrar(conexion.raw)
+                    self._descontar()
+                    continue
+
+            registry.observe(
+                "db_pool_wait_seconds",
+                {"alias": self.alias},
+                time.monotonic() - inicio,
+                buckets=WAIT_BUCKETS,
+            )
+            with self._cond:
+                self._prestadas[conexion.raw] = conexion
+                self._publicar()
+            return conexion.raw
+
+    def put(self, raw, reutilizable=True):
+        """
+        Regresa una conexión prestada. Con reutilizable=False (conexión rota
+        o cerrada a media transacción) se cierra en lugar de guardarse.
+        """
+        with self._cond:
+            conexion = self._prestadas.pop(raw, None)
+        if conexion is None:
+            # No es de este pool (p. ej. se abrió antes de un fork)
+            self._cerrar(raw)
+            return
+        ahora = time.monotonic()
+        if not reutilizable or ahora - conexion.creada > self.max_lifetime:
+            self._cerrar(raw)
+            self._descontar()
+            return
+        conexion.usada = ahora
+        with self._cond:
+            self._libres.append(conexion)
+            self._publicar()
+            self._cond.notify()
+
+    def cerrar_libres(self):
+        """
+        Cierra las conexiones libres; las prestadas se cierran al volver
+        """
+        with self._cond:
+            while self._libres:
+                self._cerrar(self._libres.popleft().raw)
+                self._abiertas -= 1
+            self._publicar()
+
+    def _cerrar_inactivas(self):
+        # Con el lock tomado. Las más viejas están al principio
+        ahora = time.monotonic()
+        while self._libres and ahora - self._libres[0].usada > self.max_idle:
+            self._cerrar(self._libres.popleft().raw)
+            self._abiertas -= 1
+
+    def _descontar(self):
+        with self._cond:
+            self._abiertas -= 1
+            self._publicar()
+            self._cond.notify()
+
+    def _publicar(self):
+        # Con el lock tomado
+        en_uso = len(self._prestadas)
+        registry.set(
+            "db_pool_connections", {"alias": self.alias, "state": "in_use"}, en_uso
+        )
+        registry.set(
+            "db_pool_connections",
+            {"alias": self.alias, "state": "idle"},
+            self._abiertas - en_uso,
+        )
+
+    @staticmethod
+    def _sana(raw):
+        try:
+            cursor = raw.cursor()
+            try:
+                cursor.execute("SELECT 1")
+                cursor.fetchone()
+            finally:
+                cursor.close()
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _cerrar(raw):
+        try:
+            raw.close()
+        except Exception:
+            pass
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+_pid = os.getpid()
+
+
+def pool_for(alias):
+    global _pid
+    with _pools_lock:
+        if os.getpid() != _pid:
+            # Tras un fork las conexiones del padre no se comparten: cada
+            # worker arma su propio pool
+            _pools.clear()
+            _pid = os.getpid()
+        pool = _pools.get(alias)
+        if pool is None:
+            pool = _pools[alias] = ConnectionPool(
+                alias,
+                size=settings.DATABASE_POOL_SIZE,
+                timeout=settings.DATABASE_POOL_TIMEOUT,
+                check_after=settings.DATABASE_POOL_CHECK_AFTER,
+                max_idle=settings.DATABASE_POOL_MAX_IDLE,
+                max_lifetime=settings.DATABASE_POOL_MAX_LIFETIME,
+            )
+        return pool
+
+
+def cerrar_pools():
+    """
+    Cierra las conexiones libres de todos los pools del proceso. Se llama en
+    el master de gunicorn --preload antes del fork: un worker que heredara
+    el socket lo cerraría al descartar los pools del padre (ver pool_for).
+    """
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.cerrar_libres()
+        _pools.clear()
+
+
+class PooledDatabaseWrapper:
+    """
+    Mixin para el DatabaseWrapper de un backend de Django: connect() toma
+    una conexión del pool y close() la regresa en lugar de cerrarla. Se usa
+    con CONN_MAX_AGE=0 para que Django la suelte al terminar cada petición.
+    """
+
+    def get_new_connection(self, conn_params):
+        conectar = super().get_new_connection
+        try:
+            return pool_for(self.alias).get(lambda: conectar(conn_params))
+        except PoolTimeout as e:
+            raise self.Database.OperationalError(str(e)) from e
+
+    def _close(self):
+        if self.connection is None:
+            return
+        reutilizable = not self.in_atomic_block
+        if reutilizable and self.errors_occurred:
+            reutilizable = self.is_usable()
+        if reutilizable and not self.autocommit:
+            # Nada de una transacción a medias pasa al siguiente usuario
+            try:
+                self.connection.rollback()
+            except Exception:
+                reutilizable = False
+        pool_for(self.alias).put(self.connection, reutilizable)
@@ -0,0 +1,111 @@
+import hashlib
+import random
+import threading
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from .metrics import registry
+from .ratelimit import client_ip
+
+# Métodos que no escriben: pueden leer de una réplica
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+_estado = threading.local()
+
+
+def replicas():
+    return [alias for alias in settings.DATABASES if alias != DEFAULT_DB_ALIAS]
+
+
+class ReplicaRouter:
+    """
+    Lecturas a una réplica solo dentro de una petición que ReplicaMiddleware
+    marcó como segura; todo lo demás (escrituras, comandos, migraciones,
+    shell) usa la primaria. En cuanto la petición escribe, sus lecturas
+    siguientes también van a la primaria para ver lo que acaba de escribir.
+    """
+
+    def db_for_read(self, model, **hints):
+        replica = getattr(_estado, "replica", None)
+        if replica is None or getattr(_estado, "escribio", False):
+            return DEFAULT_DB_ALIAS
+        # Una lectura dentro de una transacción de la primaria debe ver sus
+        # cambios aún sin commit
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return replica
+
+    def db_for_write(self, model, **hints):
+        _estado.escribio = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Réplicas y primaria tienen los mismos datos
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Las réplicas reciben el esquema por replicación
+        return db == DEFAULT_DB_ALIAS
+
+
+class ReplicaMiddleware:
+    """
+    Decide a qué base lee cada petición. Los GET/HEAD/OPTIONS leen de una
+    réplica al azar, salvo que el cliente haya escrito hace menos de
+    REPLICA_STICKY_SECONDS: la réplica puede ir atrasada y el cliente debe
+    ver lo que acaba de guardar (read-after-write).
+
+    El cliente se identifica por su token (header Authorization) o, si aún
+    no tiene (login, registro), por su IP: un GET recién hecho el login
+    todavía encuentra la marca de la IP. Las marcas se guardan en el caché
+    REPLICA_STICKY_CACHE; con un caché por proceso solo las respeta el
+    worker que atendió la escritura.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        aliases = replicas()
+        if not aliases:
+            return self.get_response(request)
+
+        cache = caches[settings.REPLICA_STICKY_CACHE]
+        ip, token = self.sticky_keys(request)
+        _estado.escribio = False
+        _estado.replica = None
+        if request.method in SAFE_METHODS:
+            if cache.get_many([ip, token] if token else [ip]):
+                registry.inc("db_route_requests_total", {"target": "sticky"})
+            else:
+                _estado.replica = random.choice(aliases)
+                registry.inc("db_route_requests_total", {"target": "replica"})
+        else:
+            registry.inc("db_route_requests_total", {"target": "primary"})
+
+        try:
+            return self.get_response(request)
+        finally:
+            if _estado.escribio or request.method not in SAFE_METHODS:
+                # Con token basta marcar al usuario; sin token (login,
+                # registro) se marca la IP
+                cache.set(token or ip, 1, settings.REPLICA_STICKY_SECONDS)
+            _estado.replica = None
+            _estado.escribio = False
+
+    def sticky_keys(self, request):
+        """
+        Claves de caché (ip, token) del cliente; token es None sin header
+        Authorization. Tokens e IPs no quedan en claro en el caché.
+        """
+        token = request.META.get("HTTP_AUTHORIZATION")
+        return (
+            _clave("ip", client_ip(request)),
+            _clave("auth", token) if token else None,
+        )
+
+
+def _clave(tipo, valor):
+    return "sticky:" + hashlib.sha256(f"{tipo}\n{valor}".encode()).hexdigest()
@@ -0,0 +1,176 @@
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse, JsonResponse
+
+from .metrics import registry
+from .ratelimit import client_ip
+
+HEADER = "HTTP_IDEMPOTENCY_KEY"
+MAX_KEY_LENGTH = 255
+
+EN_CURSO = "en_curso"
+LISTO = "listo"
+
+# Headers que no se guardan con la respuesta: los pone de nuevo quien la sirve
+_NO_GUARDAR = {"content-length", "set-cookie", "vary", "date", "server-timing"}
+
+
+class _EnCurso:
+    """
+    Eventos de las peticiones que este proceso está ejecutando, para que los
+    duplicados del mismo proceso despierten en cuanto termina la original en
+    lugar de esperar al siguiente sondeo del caché
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._eventos = {}
+
+    def iniciar(self, clave):
+        with self._lock:
+            self._eventos[clave] = threading.Event()
+
+    def terminar(self, clave):
+        with self._lock:
+            evento = self._eventos.pop(clave, None)
+        if evento:
+            evento.set()
+
+    def esperar(self, clave, timeout):
+        with self._lock:
+            evento = self._eventos.get(clave)
+        if evento is None:
+            time.sleep(timeout)
+        else:
+            evento.wait(timeout)
+
+
+_en_curso = _EnCurso()
+
+
+class IdempotencyMiddleware:
+    """
+    Idempotency-Key para los POST de IDEMPOTENCY_PATHS: la primera petición
+    con una clave se ejecuta y su respuesta se guarda en el caché
+    IDEMPOTENCY_CACHE (acotado y con expiración) por IDEMPOTENCY_TTL
+    segundos; los reintentos con la misma clave reciben esa respuesta sin
+    volver a ejecutar la vista (ni cifrar contraseñas, ni crear duplicados).
+
+    Un duplicado que llega mientras la original sigue en curso la espera
+    hasta IDEMPOTENCY_WAIT_SECONDS. La clave se separa por ruta y por
+    cliente (ver cache_key); reutilizarla con otro cuerpo responde 422. Las
+    respuestas 5xx no se guardan: el reintento se ejecuta.
+
+    Va después de AuthenticationMiddleware para conocer al usuario de sesión.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.paths = tuple(settings.IDEMPOTENCY_PATHS)
+
+    def __call__(self, request):
+        clave = request.META.get(HEADER)
+        if clave is None or request.method != "POST" or request.path not in self.paths:
+            return self.get_response(request)
+        if not clave or len(clave) > MAX_KEY_LENGTH or not clave.isprintable():
+            mensaje = f"Idempotency-Key debe tener de 1 a {MAX_KEY_LENGTH} caracteres"
+            return JsonResponse({"message": mensaje}, status=400)
+
+        cache = caches[settings.IDEMPOTENCY_CACHE]
+        cache_key = self.cache_key(request, clave)
+        huella = hashlib.sha256(request.body).hexdigest()
+
+        limite = time.monotonic() + settings.IDEMPOTENCY_WAIT_SECONDS
+        espera = 0.02
+        while True:
+            if cache.add(
+                cache_key,
+                {"estado": EN_CURSO, "huella": huella},
+                settings.IDEMPOTENCY_LOCK_SECONDS,
+            ):
+                return self.ejecutar(request, cache, cache_key, huella)
+
+            guardada = cache.get(cache_key)
+            if guardada is None:
+                # Expiró o se liberó entre add() y get(): se vuelve a intentar
+                continue
+            if guardada["huella"] != huella:
+                registry.inc("idempotency_requests_total", {"result": "mismatch"})
+                return JsonResponse(
+                    {"message": "Idempotency-Key ya se usó con otro cuerpo"},
+                    status=422,
+                )
+            if guardada["estado"] == LISTO:
+                registry.inc("idempotency_requests_total", {"result": "replayed"})
+                return self.replay(guardada)
+
+            restante = limite - time.monotonic()
+            if restante <= 0:
+                registry.inc("idempotency_requests_total", {"result": "conflict"})
+                response = JsonResponse(
+                    {"message": "Una petición con esta Idempotency-Key sigue en curso"},
+                    status=409,
+                )
+                response["Retry-After"] = "1"
+                return response
+            _en_curso.esperar(cache_key, min(espera, restante))
+            espera = min(espera * 2, 0.5)
+
+    def cache_key(self, request, clave):
+        """
+        Misma clave en otra ruta o de otro cliente es otra petición. El
+        cliente es su token (header Authorization, que DRF autentica hasta la
+        vista), su usuario de sesión o, si es anónimo (registro), su IP.
+        """
+        autorizacion = request.META.get("HTTP_AUTHORIZATION")
+        if autorizacion:
+            cliente = f"auth:{autorizacion}"
+        elif request.user.is_authenticated:
+            cliente = f"user:{request.user.pk}"
+        else:
+            cliente = f"ip:{client_ip(request)}"
+        alcance = hashlib.sha256(
+            "\n".join((request.path, cliente, clave)).encode()
+        ).hexdigest()
+        return f"idem:{alcance}"
+
+    def ejecutar(self, request, cache, cache_key, huella):
+        _en_curso.iniciar(cache_key)
+        try:
+            response = self.get_response(request)
+            if response.status_code >= 500 or response.streaming:
+                cache.delete(cache_key)
+            else:
+                cache.set(
+                    cache_key,
+                    {
+                        "estado": LISTO,
+                        "huella": huella,
+                        "status": response.status_code,
+                        "headers": [
+                            (nombre, valor)
+                            for nombre, valor in response.items()
+                            if nombre.lower() not in _NO_GUARDAR
+                        ],
+                        "content": response.content,
+                    },
+                    settings.IDEMPOTENCY_TTL,
+                )
+            registry.inc("idempotency_requests_total", {"result": "executed"})
+            return response
+        except BaseException:
+            cache.delete(cache_key)
+            raise
+        finally:
+            _en_curso.terminar(cache_key)
+
+    def replay(self, guardada):
+        response = HttpResponse(guardada["content"], status=guardada["status"])
+        for nombre, valor in guardada["headers"]:
+            response[nombre] = valor
+        response["Idempotent-Replayed"] = "true"
+        return response
@@ -0,0 +1,144 @@
+import contextvars
+import logging
+import random
+import time
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger("app_movil_escolar_api.perf")
+
+# Mediciones de la petición en curso (None cuando la petición no fue muestreada)
+_current = contextvars.ContextVar("request_timings", default=None)
+
+
+class RequestTimings:
+    """
+    Acumula los tiempos de una petición: consultas SQL, tiempo en base de
+    datos y secciones medidas con measure() (serializers, vista, etc.)
+    """
+
+    __slots__ = ("queries", "db", "spans", "view_start")
+
+    def __init__(self):
+        self.queries = 0
+        self.db = 0.0
+        self.spans = {}
+        self.view_start = None
+
+    def add(self, name, seconds):
+        self.spans[name] = self.spans.get(name, 0.0) + seconds
+
+
+def current_timings():
+    return _current.get()
+
+
+@contextmanager
+def measure(name):
+    """
+    Suma el tiempo del bloque a la sección `name` de la petición actual.
+    No hace nada si la petición no se está midiendo.
+    """
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - inicio)
+
+
+class QueryTimer:
+    """
+    execute_wrapper que cuenta las consultas y el tiempo en base de datos
+    """
+
+    def __init__(self, timings):
+        self.timings = timings
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.timings.queries += 1
+            self.timings.db += time.perf_counter() - inicio
+
+
+class ServerTimingMiddleware:
+    """
+    Mide una muestra de las peticiones (PERF_SAMPLE_RATE) y reporta número
+    de consultas, tiempo en DB, serializers y vista en el header Server-Timing
+    y en un log estructurado. Las peticiones no muestreadas no pagan nada.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = settings.PERF_SAMPLE_RATE
+
+    def __call__(self, request):
+        if self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            return self.get_response(request)
+
+        timings = RequestTimings()
+        token = _current.set(timings)
+        inicio = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(
+                        connections[alias].execute_wrapper(QueryTimer(timings))
+                    )
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        fin = time.perf_counter()
+        total = fin - inicio
+        if timings.view_start is not None:
+            # Desde que se resolvió la vista hasta tener la respuesta renderizada
+            timings.add("view", fin - timings.view_start)
+
+        metricas = {
+            "db": timings.db,
+            "ser": timings.spans.get("ser", 0.0),
+            "view": timings.spans.get("view", 0.0),
+            "total": total,
+        }
+        secciones = ["ser", "view", "total"]
+        if "cmp" in timings.spans:
+            # Compresión del cuerpo (solo si se comprimió)
+            metricas["cmp"] = timings.spans["cmp"]
+            secciones.insert(2, "cmp")
+        response["Server-Timing"] = ", ".join(
+            [f'db;dur={metricas["db"] * 1000:.1f};desc="{timings.queries} queries"']
+            + [f"{n};dur={metricas[n] * 1000:.1f}" for n in secciones]
+        )
+
+        match = getattr(request, "resolver_match", None)
+        campos = {
+            "method": request.method,
+            "path": request.path,
+            "view": match.view_name if match else None,
+            "status": response.status_code,
+            "queries": timings.queries,
+            "db_ms": round(metricas["db"] * 1000, 2),
+            "ser_ms": round(metricas["ser"] * 1000, 2),
+            "view_ms": round(metricas["view"] * 1000, 2),
+            "cmp_ms": round(metricas.get("cmp", 0.0) * 1000, 2),
+            "total_ms": round(total * 1000, 2),
+        }
+        logger.info(
+            " ".join(f"{k}={v}" for k, v in campos.items()),
+            extra={"perf": campos},
+        )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        timings = _current.get()
+        if timings is not None:
+            timings.view_start = time.perf_counter()
+        return None
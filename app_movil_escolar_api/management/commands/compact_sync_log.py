@@ -0,0 +1,21 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from app_movil_escolar_api.sync import compactar
+
+
+class Command(BaseCommand):
+    help = (
+        "Compacta la bitácora de changes-since: borra las filas que ya tienen "
+        "una más nueva del mismo objeto (queda una por objeto)"
+    )
+
+    def handle(self, *args, **options):
+        inicio = time.perf_counter()
+        borradas = compactar()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{borradas} filas compactadas en {time.perf_counter() - inicio:.1f} s"
+            )
+        )
@@ -0,0 +1,622 @@
+import io
+import logging
+import os
+import shutil
+import statistics
+import tempfile
+import time
+from io import StringIO
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.authtoken.models import Token
+
+from app_movil_escolar_api.models import (
+    Administradores,
+    Alumnos,
+    Archivo,
+    EventoAcademico,
+    Maestros,
+)
+
+DOMAIN = "budget.local"
+PASSWORD = "budget1234"
+METRICS_TOKEN = "budget"
+# Token fijo del usuario que hace logout (se vuelve a crear antes de cada uno)
+LOGOUT_TOKEN = "b" * 40
+# Video de media-stream: 1 MB en MEDIA_ROOT temporal
+VIDEO = "videos/budget.mp4"
+VIDEO_BYTES = 1024 * 1024
+
+# Vistas de urls.py sin caso y por qué
+EXCLUIDAS = {
+    "run_migrations": "ejecuta migrate; no es una vista de la app",
+}
+
+
+class Case:
+    """
+    Una petición con su presupuesto: número máximo de consultas SQL y tiempo
+    máximo (ms) = base_ms + ms_per_1k por cada mil filas de `rows`.
+    """
+
+    def __init__(
+        self,
+        name,
+        method,
+        path,
+        user="admin",
+        data=None,
+        status=200,
+        queries=0,
+        base_ms=50,
+        ms_per_1k=0,
+        rows=None,
+        json_contains=False,
+        headers=None,
+        multipart=False,
+    ):
+        self.name = name
+        self.method = method
+        self.path = path
+        self.user = user
+        self.data = data
+        self.status = status
+        self.queries = queries
+        self.base_ms = base_ms
+        self.ms_per_1k = ms_per_1k
+        self.rows = rows
+        # eventos-por-rol de alumnos y maestros filtra con JSONField contains
+        self.json_contains = json_contains
+        # Headers extra (HTTP_*) y cuerpo multipart en lugar de JSON
+        self.headers = headers or {}
+        self.multipart = multipart
+
+    def budget_ms(self, sizes, factor):
+        filas = sizes[self.rows] if self.rows else 0
+        return (self.base_ms + self.ms_per_1k * filas / 1000) * factor
+
+
+def alumno_payload(ctx, i):
+    email = f"nuevo.alumno.{i}@{DOMAIN}"
+    return {
+        "rol": "alumno",
+        "first_name": "Nuevo",
+        "last_name": "Alumno",
+        "email": email,
+        "password": PASSWORD,
+        # Únicos por petición (índices únicos de matrícula y CURP)
+        "matricula": f"NVO{i:06d}",
+        "curp": f"AAAA{i:06d}HPLXXX00",
+        "rfc": "AAAA000000XX0",
+        "fecha_nacimiento": "2004-01-01T00:00:00Z",
+        "edad": 21,
+        "telefono": "2220000000",
+        "ocupacion": "Estudiante",
+    }
+
+
+def maestro_payload(ctx, i):
+    return {
+        "rol": "maestro",
+        "first_name": "Nuevo",
+        "last_name": "Maestro",
+        "email": f"nuevo.maestro.{i}@{DOMAIN}",
+        "password": PASSWORD,
+        "id_trabajador": f"NVO{i:05d}",
+        "fecha_nacimiento": "1980-01-01T00:00:00Z",
+        "telefono": "2220000000",
+        "rfc": "AAAA000000XX0",
+        "cubiculo": "A-100",
+        "edad": 45,
+        "area_investigacion": "Redes",
+        "materias_json": ["Redes"],
+    }
+
+
+def admin_payload(ctx, i):
+    return {
+        "rol": "administrador",
+        "first_name": "Nuevo",
+        "last_name": "Admin",
+        "email": f"nuevo.admin.{i}@{DOMAIN}",
+        "password": PASSWORD,
+        "clave_admin": f"NVO{i:04d}",
+        "telefono": "2220000000",
+        "rfc": "AAAA000000XX0",
+        "edad": 40,
+        "ocupacion": "Coordinador",
+    }
+
+
+def evento_payload(ctx, i):
+    return {
+        "nombre_evento": f"Presupuesto {i}",
+        "tipo_evento": "Taller",
+        "fecha_realizacion": (date.today() + timedelta(days=30)).isoformat(),
+        "hora_inicio": "10:00",
+        "hora_fin": "12:00",
+        "lugar": "Auditorio",
+        "publico_objetivo": ["Estudiantes", "Público general"],
+        "programa_educativo": "Licenciatura en Ingeniería de Software",
+        "responsable_evento_id": ctx["admin"].id,
+        "descripcion_breve": "Evento del presupuesto de rendimiento.",
+        "cupo_maximo": 50,
+    }
+
+
+def evento_update(ctx, i):
+    return {"id": ctx["evento"].id, "cupo_maximo": 10 + i}
+
+
+def evento_temporal(ctx, i):
+    # Cada DELETE necesita su propio evento
+    evento = EventoAcademico.objects.create(
+        **dict(
+            evento_payload(ctx, i),
+            publico_objetivo=["Profesores"],
+            programa_educativo=None,
+            responsable_evento_id=ctx["admin"].id,
+        )
+    )
+    return f"/eventos-academicos/?id={evento.id}"
+
+
+def logout_path(ctx, i):
+    # El logout borra el token: uno nuevo (con la misma llave) cada vez
+    Token.objects.get_or_create(user=ctx["logout"], defaults={"key": LOGOUT_TOKEN})
+    return "/logout/"
+
+
+def foto_payload(ctx, i):
+    from PIL import Image
+
+    imagen = io.BytesIO()
+    Image.new("RGB", (64, 64), "navy").save(imagen, "PNG")
+    return {"archivo": SimpleUploadedFile("foto.png", imagen.getvalue())}
+
+
+def login_payload(rol):
+    def build(ctx, i):
+        return {"username": ctx[rol].email, "password": PASSWORD}
+
+    return build
+
+
+# Consultas de subir una foto: usuario del token, que exista el objeto, el
+# SAVEPOINT, las imágenes anteriores (leerlas y borrarlas) y el INSERT
+QUERIES_ARCHIVOS_POST = 8
+
+# Presupuestos por vista. Las consultas no deben depender del tamaño de la base;
+# los tiempos son holgados y se escalan con --time-factor según la máquina.
+# Las vistas con @transaction.atomic cuentan también su SAVEPOINT, porque cada
+# tamaño corre dentro de una transacción que se deshace al final. Cada
+# escritura de perfil o evento suma el INSERT de la bitácora de changes-since.
+# Los registros incluyen la búsqueda del grupo: el caché de registro.grupo_id
+# solo se llena al hacer commit y aquí nunca se hace.
+CASES = [
+    Case("warmup", "GET", "/_ah/warmup", user=None, queries=3, base_ms=100),
+    Case(
+        "lista_admins", "GET", "/lista-admins/", queries=2, ms_per_1k=400, rows="admins"
+    ),
+    Case(
+        "lista_alumnos",
+        "GET",
+        "/lista-alumnos/",
+        queries=2,
+        ms_per_1k=400,
+        rows="alumnos",
+    ),
+    Case(
+        "lista_maestros",
+        "GET",
+        "/lista-maestros/",
+        queries=2,
+        ms_per_1k=400,
+        rows="maestros",
+    ),
+    Case(
+        "total_usuarios",
+        "GET",
+        "/total-usuarios/",
+        queries=4,
+        base_ms=100,
+        ms_per_1k=5,
+        rows="alumnos",
+    ),
+    Case(
+        "admin (GET)",
+        "GET",
+        lambda ctx, i: f"/admin/?id={ctx['admin_perfil'].id}",
+        queries=3,
+    ),
+    Case(
+        "alumnos (GET)",
+        "GET",
+        lambda ctx, i: f"/alumnos/?id={ctx['alumno_perfil'].id}",
+        queries=3,
+    ),
+    Case(
+        "maestros (GET)",
+        "GET",
+        lambda ctx, i: f"/maestros/?id={ctx['maestro_perfil'].id}",
+        queries=3,
+    ),
+    Case(
+        "admin (POST)",
+        "POST",
+        "/admin/",
+        user=None,
+        data=admin_payload,
+        status=201,
+        queries=8,
+        base_ms=1500,
+    ),
+    Case(
+        "alumnos (POST)",
+        "POST",
+        "/alumnos/",
+        user=None,
+        data=alumno_payload,
+        status=201,
+        queries=8,
+        base_ms=1500,
+    ),
+    Case(
+        "maestros (POST)",
+        "POST",
+        "/maestros/",
+        user=None,
+        data=maestro_payload,
+        status=201,
+        queries=8,
+        base_ms=1500,
+    ),
+    Case(
+        "login (alumno)",
+        "POST",
+        "/login/",
+        user=None,
+        data=login_payload("alumno"),
+        queries=5,
+        base_ms=1500,
+    ),
+    Case(
+        "login (maestro)",
+        "POST",
+        "/login/",
+        user=None,
+        data=login_payload("maestro"),
+        queries=5,
+        base_ms=1500,
+    ),
+    Case(
+        "login (admin)",
+        "POST",
+        "/login/",
+        user=None,
+        data=login_payload("admin"),
+        queries=3,
+        base_ms=1500,
+    ),
+    Case(
+        "lista_eventos",
+        "GET",
+        "/lista-eventos/",
+        queries=2,
+        ms_per_1k=400,
+        rows="eventos",
+    ),
+    Case(
+        "eventos_por_rol (admin)",
+        "GET",
+        "/eventos-por-rol/",
+        queries=3,
+        ms_per_1k=400,
+        rows="eventos",
+    ),
+    Case(
+        "eventos_por_rol (maestro)",
+        "GET",
+        "/eventos-por-rol/",
+        user="maestro",
+        queries=3,
+        ms_per_1k=400,
+        rows="eventos",
+        json_contains=True,
+    ),
+    Case(
+        "eventos_por_rol (alumno)",
+        "GET",
+        "/eventos-por-rol/",
+        user="alumno",
+        queries=3,
+        ms_per_1k=400,
+        rows="eventos",
+        json_contains=True,
+    ),
+    Case(
+        "eventos_academicos (GET)",
+        "GET",
+        lambda ctx, i: f"/eventos-academicos/?id={ctx['evento'].id}",
+        queries=3,
+    ),
+    Case(
+        "eventos_academicos (POST)",
+        "POST",
+        "/eventos-academicos/",
+        data=evento_payload,
+        status=201,
+        queries=7,
+        base_ms=100,
+    ),
+    Case(
+        "eventos_academicos (PUT)",
+        "PUT",
+        "/eventos-academicos/",
+        data=evento_update,
+        queries=8,
+        base_ms=100,
+    ),
+    Case(
+        "eventos_academicos (DELETE)", "DELETE", evento_temporal, queries=7, base_ms=100
+    ),
+    Case("logout", "GET", logout_path, user="logout", queries=3),
+    # Sin autenticación de DRF: no toca la base
+    Case(
+        "metrics",
+        "GET",
+        "/metrics/",
+        user=None,
+        headers={"HTTP_X_METRICS_TOKEN": METRICS_TOKEN},
+        queries=0,
+    ),
+    Case(
+        "archivos (GET)",
+        "GET",
+        lambda ctx, i: f"/archivos/?tipo=foto&id={ctx['admin'].id}",
+        queries=2,
+    ),
+    # La miniatura y el borrado de la anterior van después del commit (aquí
+    # nunca pasa): se mide la validación, la copia al storage y las filas
+    Case(
+        "archivos (POST)",
+        "POST",
+        "/archivos/?tipo=foto",
+        data=foto_payload,
+        multipart=True,
+        status=201,
+        queries=QUERIES_ARCHIVOS_POST,
+        base_ms=150,
+    ),
+    # Solo la consulta del token: el archivo sale sin pasar por la base
+    Case("media_stream", "GET", f"/media-stream/{VIDEO}", queries=1),
+    Case(
+        "media_stream (Range)",
+        "GET",
+        f"/media-stream/{VIDEO}",
+        headers={"HTTP_RANGE": "bytes=1000-65535"},
+        status=206,
+        queries=1,
+    ),
+    # Una página (SYNC_PAGE_SIZE filas) sin importar el tamaño de la base; una
+    # sola entidad para que el número de consultas no dependa de qué entidades
+    # caen en la primera página
+    Case(
+        "changes_since",
+        "GET",
+        "/changes-since/?cursor=0&entities=eventos",
+        queries=3,
+        base_ms=250,
+    ),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Presupuesto de rendimiento: mide consultas SQL y tiempo de cada vista "
+        "de urls.py con varios tamaños de base y falla si alguna se pasa o si "
+        "sus consultas crecen con el número de filas. Sin caso: "
+        + "; ".join(f"{vista} ({razon})" for vista, razon in EXCLUIDAS.items())
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            default="100,1000,5000",
+            help="Alumnos por tamaño de base, separados por coma (el resto escala)",
+        )
+        parser.add_argument("--repeat", type=int, default=3)
+        parser.add_argument(
+            "--time-factor",
+            type=float,
+            default=1.0,
+            help="Multiplica los presupuestos de tiempo (máquinas lentas o CI)",
+        )
+        parser.add_argument(
+            "--no-time",
+            action="store_true",
+            help="Solo revisa consultas SQL, no tiempos",
+        )
+        parser.add_argument(
+            "--only", help="Ejecuta solo los casos que contengan este texto"
+        )
+
+    def handle(self, *args, **options):
+        try:
+            sizes = [int(s) for s in options["sizes"].split(",") if s.strip()]
+        except ValueError:
+            raise CommandError("--sizes debe ser una lista de enteros")
+        if User.objects.filter(email__endswith="@" + DOMAIN).exists():
+            raise CommandError(f"Ya existen usuarios @{DOMAIN} en la base")
+
+        self.options = options
+        cases = [c for c in CASES if not options["only"] or options["only"] in c.name]
+        fallas = []
+        # caso -> consultas en cada tamaño
+        consultas = {}
+
+        # Cada petición ya se reporta aquí; el log por petición solo estorba
+        perf_logger = logging.getLogger("app_movil_escolar_api.perf")
+        nivel = perf_logger.level
+        perf_logger.setLevel(logging.WARNING)
+        try:
+            # Sin margen de visibilidad: changes-since ve los datos recién
+            # sembrados. Sin límite de peticiones: todos los POST salen de la
+            # misma IP. Sin caché de listas: se mide la vista, no el caché
+            # Imágenes y videos en un MEDIA_ROOT que se borra al final
+            media = tempfile.mkdtemp(prefix="perf_budget_")
+            with override_settings(
+                SYNC_SAFETY_LAG_SECONDS=0,
+                RATELIMIT_ENABLED=False,
+                CACHE_HELPER_ENABLED=False,
+                METRICS_TOKEN=METRICS_TOKEN,
+                MEDIA_ROOT=media,
+            ):
+                os.makedirs(os.path.join(media, os.path.dirname(VIDEO)))
+                with open(os.path.join(media, VIDEO), "wb") as video:
+                    video.write(os.urandom(VIDEO_BYTES))
+                for alumnos in sizes:
+                    self.run_dataset(alumnos, cases, fallas, consultas)
+        finally:
+            perf_logger.setLevel(nivel)
+            shutil.rmtree(media, ignore_errors=True)
+
+        for case in cases:
+            distintos = sorted(set(consultas.get(case.name, [])))
+            if len(distintos) > 1:
+                fallas.append(
+                    f"{case.name}: las consultas crecen con las filas {consultas[case.name]}"
+                )
+
+        if fallas:
+            raise CommandError(
+                "Presupuesto de rendimiento excedido:\n  " + "\n  ".join(fallas)
+            )
+        self.stdout.write(self.style.SUCCESS("Todas las vistas dentro del presupuesto"))
+
+    def run_dataset(self, alumnos, cases, fallas, consultas):
+        dataset = {
+            "alumnos": alumnos,
+            "maestros": max(2, alumnos // 10),
+            "admins": max(2, alumnos // 100),
+            "eventos": max(2, alumnos // 2),
+        }
+        self.stdout.write(self.style.MIGRATE_HEADING(f"Tamaño: {dataset}"))
+        # Los datos de cada tamaño se deshacen al terminar de medirlo
+        with transaction.atomic():
+            fallas += self.run_size(cases, dataset, consultas)
+            transaction.set_rollback(True)
+
+    def run_size(self, cases, dataset, consultas):
+        call_command(
+            "seed_data",
+            alumnos=dataset["alumnos"],
+            maestros=dataset["maestros"],
+            admins=dataset["admins"],
+            eventos=dataset["eventos"],
+            domain=DOMAIN,
+            password=PASSWORD,
+            stdout=StringIO(),
+        )
+        ctx = self.context()
+        clients = {None: Client(HTTP_HOST="localhost")}
+        for rol in ("admin", "maestro", "alumno"):
+            token, _ = Token.objects.get_or_create(user=ctx[rol])
+            clients[rol] = Client(
+                HTTP_HOST="localhost", HTTP_AUTHORIZATION=f"Bearer {token.key}"
+            )
+        clients["logout"] = Client(
+            HTTP_HOST="localhost", HTTP_AUTHORIZATION=f"Bearer {LOGOUT_TOKEN}"
+        )
+
+        fallas = []
+        iteracion = 0
+        for case in cases:
+            if (
+                case.json_contains
+                and not connection.features.supports_json_field_contains
+            ):
+                self.stdout.write(f"  {case.name:<30} omitido (requiere JSON contains)")
+                continue
+            tiempos = []
+            queries = None
+            # La primera corrida calienta cachés; las siguientes se miden
+            for _ in range(self.options["repeat"] + 1):
+                iteracion += 1
+                status, n, ms = self.request(clients[case.user], case, ctx, iteracion)
+                if status != case.status:
+                    fallas.append(
+                        f"{case.name}: status {status}, se esperaba {case.status}"
+                    )
+                    break
+                queries = n if queries is None else max(queries, n)
+                tiempos.append(ms)
+            else:
+                ms = statistics.median(tiempos[1:])
+                limite = case.budget_ms(dataset, self.options["time_factor"])
+                consultas.setdefault(case.name, []).append(queries)
+                estado = "ok"
+                if queries > case.queries:
+                    estado = "FALLA"
+                    fallas.append(
+                        f"{case.name} ({dataset['alumnos']}): {queries} consultas, presupuesto {case.queries}"
+                    )
+                if not self.options["no_time"] and ms > limite:
+                    estado = "FALLA"
+                    fallas.append(
+                        f"{case.name} ({dataset['alumnos']}): {ms:.1f} ms, presupuesto {limite:.0f} ms"
+                    )
+                self.stdout.write(
+                    f"  {case.name:<30} {queries:>3}/{case.queries:<3} consultas "
+                    f"{ms:>9.1f}/{limite:.0f} ms  {estado}"
+                )
+        return fallas
+
+    def context(self):
+        usuarios = User.objects.filter(email__endswith="@" + DOMAIN)
+        ctx = {
+            "admin": usuarios.get(email=f"administrador.0@{DOMAIN}"),
+            "maestro": usuarios.get(email=f"maestro.0@{DOMAIN}"),
+            "alumno": usuarios.get(email=f"alumno.0@{DOMAIN}"),
+            # Otro admin: su logout no invalida el token de los demás casos
+            "logout": usuarios.get(email=f"administrador.1@{DOMAIN}"),
+        }
+        ctx["admin_perfil"] = Administradores.objects.get(user=ctx["admin"])
+        ctx["maestro_perfil"] = Maestros.objects.get(user=ctx["maestro"])
+        ctx["alumno_perfil"] = Alumnos.objects.get(user=ctx["alumno"])
+        ctx["evento"] = EventoAcademico.objects.filter(
+            responsable_evento__in=usuarios
+        ).first()
+        # La foto vigente del admin (solo la fila: el GET no lee el archivo)
+        Archivo.objects.create(
+            tipo="foto",
+            objeto_id=ctx["admin"].id,
+            nombre=f"fotos/{ctx['admin'].id}/budget.png",
+            content_type="image/png",
+            tamano=1,
+        )
+        return ctx
+
+    def request(self, client, case, ctx, i):
+        path = case.path(ctx, i) if callable(case.path) else case.path
+        data = case.data(ctx, i) if case.data else None
+        metodo = getattr(client, case.method.lower())
+        kwargs = dict(case.headers)
+        if data is not None and not case.multipart:
+            kwargs["content_type"] = "application/json"
+        with CaptureQueriesContext(connection) as capturadas:
+            inicio = time.perf_counter()
+            response = (
+                metodo(path, data, **kwargs)
+                if data is not None
+                else metodo(path, **kwargs)
+            )
+            ms = (time.perf_counter() - inicio) * 1000
+        return response.status_code, len(capturadas), ms
@@ -0,0 +1,69 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from app_movil_escolar_api import scheduler
+
+
+class Command(BaseCommand):
+    help = (
+        "Corre los trabajos periódicos (scheduler.py) hasta recibir SIGTERM, "
+        "o una sola vez con --once"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--only",
+            help="Trabajos a correr, separados por coma (por defecto todos)",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Corre cada trabajo una vez (respetando los candados) y sale",
+        )
+        parser.add_argument(
+            "--list", action="store_true", help="Lista los trabajos y sus intervalos"
+        )
+
+    def handle(self, *args, **options):
+        trabajos = scheduler.trabajos()
+        nombres = None
+        if options["only"]:
+            nombres = [n.strip() for n in options["only"].split(",") if n.strip()]
+            desconocidos = [n for n in nombres if n not in trabajos]
+            if desconocidos:
+                raise CommandError(
+                    f"Trabajos desconocidos: {', '.join(desconocidos)}. "
+                    f"Trabajos: {', '.join(trabajos)}"
+                )
+
+        if options["list"]:
+            for nombre, t in trabajos.items():
+                cada = f"cada {t.intervalo} s" if t.intervalo > 0 else "apagado"
+                self.stdout.write(f"  {nombre:<20} {cada}")
+            return
+
+        if options["once"]:
+            for nombre, t in trabajos.items():
+                # Los apagados solo si se piden con --only
+                if nombre not in (nombres or []) and (
+                    nombres is not None or t.intervalo <= 0
+                ):
+                    continue
+                inicio = time.perf_counter()
+                resultado = scheduler.ejecutar(t)
+                self.stdout.write(
+                    f"  {nombre:<20} {resultado:<8} "
+                    f"{(time.perf_counter() - inicio) * 1000:.1f} ms"
+                )
+            return
+
+        corredor = scheduler.Scheduler(nombres)
+        if not corredor.trabajos:
+            raise CommandError("No hay trabajos activos (ver SCHEDULER_JOBS)")
+        scheduler.instalar_senales(corredor)
+        self.stdout.write(
+            "Scheduler: " + ", ".join(t.nombre for t in corredor.trabajos)
+        )
+        corredor.correr()
+        self.stdout.write("Scheduler detenido")
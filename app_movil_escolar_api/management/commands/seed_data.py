@@ -0,0 +1,302 @@
+import json
+import random
+import time
+from datetime import date, datetime, time as dtime, timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import Group, User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from app_movil_escolar_api.models import (
+    Administradores,
+    Alumnos,
+    EventoAcademico,
+    Maestros,
+)
+from app_movil_escolar_api.sync import cambios_en_lote, registrar
+
+NOMBRES = (
+    "Ana Luis María José Carlos Fernanda Jorge Sofía Miguel Valeria Diego "
+    "Camila Andrés Daniela Ricardo Paola Javier Regina Emilio Ximena Raúl "
+    "Lucía"
+).split()
+APELLIDOS = (
+    "García Hernández López Martínez González Pérez Rodríguez Sánchez "
+    "Ramírez Cruz Flores Gómez Morales Vázquez Reyes Jiménez Torres Díaz "
+    "Ruiz Mendoza"
+).split()
+OCUPACIONES_ALUMNO = ["Estudiante", "Estudiante y trabajador", "Becario"]
+OCUPACIONES_ADMIN = ["Director", "Coordinador", "Secretario académico"]
+AREAS = ["Desarrollo Web", "Bases de datos", "Redes", "Inteligencia Artificial"]
+MATERIAS = [
+    "Aplicaciones Web",
+    "Programación 1",
+    "Bases de datos",
+    "Desarrollo móvil",
+    "Estructuras de datos",
+    "Redes",
+    "Sistemas operativos",
+    "Ingeniería de software",
+]
+LUGARES = [
+    "Auditorio",
+    "Aula Magna",
+    "Laboratorio 3",
+    "Sala de juntas",
+    "Edificio CCO1",
+]
+TEMAS = ["Python", "Datos", "Seguridad", "Nube", "Robotica", "Moviles", "IA", "Redes"]
+
+# Mezcla de público objetivo (peso relativo) parecida a la de producción
+PUBLICOS = [
+    (["Estudiantes"], 35),
+    (["Profesores"], 15),
+    (["Público general"], 15),
+    (["Estudiantes", "Profesores"], 20),
+    (["Estudiantes", "Público general"], 10),
+    (["Estudiantes", "Profesores", "Público general"], 5),
+]
+
+CARACTERES = "ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"
+
+
+class Command(BaseCommand):
+    help = (
+        "Genera datos sintéticos (alumnos, maestros, administradores con sus "
+        "usuarios y grupos, y eventos académicos) para pruebas de escala"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--alumnos", type=int, default=1000)
+        parser.add_argument("--maestros", type=int, default=100)
+        parser.add_argument("--admins", type=int, default=10)
+        parser.add_argument("--eventos", type=int, default=500)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument(
+            "--password",
+            default="seed1234",
+            help="Contraseña de todos los usuarios generados",
+        )
+        parser.add_argument(
+            "--domain",
+            default="seed.local",
+            help="Dominio de los correos generados (identifica los datos sintéticos)",
+        )
+        parser.add_argument(
+            "--clear",
+            action="store_true",
+            help="Borra antes los datos sintéticos previos del mismo dominio",
+        )
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options["seed"])
+        self.batch_size = options["batch_size"]
+        self.domain = options["domain"]
+        inicio = time.perf_counter()
+
+        usuarios = User.objects.filter(email__endswith="@" + self.domain)
+        if options["clear"]:
+            # Una tombstone por objeto borrado, escritas en lote
+            with transaction.atomic(), cambios_en_lote():
+                EventoAcademico.objects.filter(responsable_evento__in=usuarios).delete()
+                for modelo in (Alumnos, Maestros, Administradores):
+                    modelo.objects.filter(user__in=usuarios).delete()
+                borrados, _ = usuarios.delete()
+            self.stdout.write(f"Datos sintéticos previos borrados ({borrados} filas)")
+        elif usuarios.exists():
+            raise CommandError(
+                f"Ya existen usuarios @{self.domain}; usa --clear o --domain"
+            )
+
+        # Un solo hash para todos: el hasher (PBKDF2) es lo más caro por usuario
+        self.password_hash = make_password(options["password"])
+
+        with transaction.atomic():
+            admins = self.create_profiles(
+                "administrador", options["admins"], Administradores, self.admin_fields
+            )
+            maestros = self.create_profiles(
+                "maestro", options["maestros"], Maestros, self.maestro_fields
+            )
+            self.create_profiles(
+                "alumno", options["alumnos"], Alumnos, self.alumno_fields
+            )
+            self.create_eventos(options["eventos"], admins + maestros)
+            # bulk_create no manda señales: se anotan para changes-since
+            self.register_changes(usuarios)
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Listo en {time.perf_counter() - inicio:.1f} s")
+        )
+
+    def register_changes(self, usuarios):
+        for entidad, queryset in (
+            ("admins", Administradores.objects.filter(user__in=usuarios)),
+            ("maestros", Maestros.objects.filter(user__in=usuarios)),
+            ("alumnos", Alumnos.objects.filter(user__in=usuarios)),
+            (
+                "eventos",
+                EventoAcademico.objects.filter(responsable_evento__in=usuarios),
+            ),
+        ):
+            ids = list(queryset.order_by("id").values_list("id", flat=True))
+            registrar(entidad, ids)
+
+    def batches(self, total):
+        for desde in range(0, total, self.batch_size):
+            yield range(desde, min(desde + self.batch_size, total))
+
+    def create_profiles(self, rol, total, modelo, build_fields):
+        """
+        Crea usuarios, su grupo (rol) y su perfil en lotes con bulk_create.
+        Regresa los ids de usuario creados.
+        """
+        if total <= 0:
+            return []
+        inicio = time.perf_counter()
+        group, _ = Group.objects.get_or_create(name=rol)
+        membership = User.groups.through
+        user_ids = []
+        # Matrícula e id_trabajador son únicos: se numeran después del último
+        # perfil para no chocar con siembras anteriores de otro dominio
+        desplazamiento = modelo.objects.aggregate(Max("id"))["id__max"] or 0
+
+        for lote in self.batches(total):
+            users = []
+            for i in lote:
+                email = f"{rol}.{i}@{self.domain}"
+                users.append(
+                    User(
+                        username=email,
+                        email=email,
+                        first_name=self.rng.choice(NOMBRES),
+                        last_name=f"{self.rng.choice(APELLIDOS)} {self.rng.choice(APELLIDOS)}",
+                        password=self.password_hash,
+                        is_active=True,
+                    )
+                )
+            User.objects.bulk_create(users, batch_size=self.batch_size)
+            ids = self.user_ids(users)
+            user_ids.extend(ids)
+
+            membership.objects.bulk_create(
+                [membership(user_id=uid, group_id=group.id) for uid in ids],
+                batch_size=self.batch_size,
+            )
+            modelo.objects.bulk_create(
+                [
+                    modelo(user_id=uid, **build_fields(desplazamiento + i))
+                    for uid, i in zip(ids, lote)
+                ],
+                batch_size=self.batch_size,
+            )
+
+        self.stdout.write(
+            f"{total} perfiles de {rol} en {time.perf_counter() - inicio:.1f} s"
+        )
+        return user_ids
+
+    def user_ids(self, users):
+        # Postgres y SQLite regresan el id en bulk_create; MySQL no
+        if connection.features.can_return_rows_from_bulk_insert:
+            return [u.pk for u in users]
+        ids = dict(
+            User.objects.filter(username__in=[u.username for u in users]).values_list(
+                "username", "id"
+            )
+        )
+        return [ids[u.username] for u in users]
+
+    def random_code(self, length):
+        return "".join(self.rng.choices(CARACTERES, k=length))
+
+    def birth_date(self, min_age, max_age):
+        edad = self.rng.randint(min_age, max_age)
+        nacimiento = datetime(date.today().year - edad, 1, 1) + timedelta(
+            days=self.rng.randint(0, 364)
+        )
+        return timezone.make_aware(nacimiento), edad
+
+    def alumno_fields(self, i):
+        nacimiento, edad = self.birth_date(17, 30)
+        return {
+            "matricula": f"{self.rng.randint(2018, 2025)}{i:05d}",
+            "curp": self.random_code(18),
+            "rfc": self.random_code(13),
+            "fecha_nacimiento": nacimiento,
+            "edad": edad,
+            "telefono": f"222{self.rng.randint(0, 9999999):07d}",
+            "ocupacion": self.rng.choice(OCUPACIONES_ALUMNO),
+        }
+
+    def maestro_fields(self, i):
+        nacimiento, edad = self.birth_date(28, 70)
+        return {
+            "id_trabajador": f"MTR{i:05d}",
+            "fecha_nacimiento": nacimiento,
+            "edad": edad,
+            "telefono": f"222{self.rng.randint(0, 9999999):07d}",
+            "rfc": self.random_code(13),
+            "cubiculo": f"{self.rng.choice('ABCDE')}-{self.rng.randint(100, 399)}",
+            "area_investigacion": self.rng.choice(AREAS),
+            "materias_json": json.dumps(self.rng.sample(MATERIAS, 3)),
+        }
+
+    def admin_fields(self, i):
+        return {
+            "clave_admin": f"ADM{i:04d}",
+            "telefono": f"222{self.rng.randint(0, 9999999):07d}",
+            "rfc": self.random_code(13),
+            "edad": self.rng.randint(30, 65),
+            "ocupacion": self.rng.choice(OCUPACIONES_ADMIN),
+        }
+
+    def create_eventos(self, total, responsables):
+        if total <= 0:
+            return
+        if not responsables:
+            raise CommandError(
+                "Los eventos necesitan al menos un maestro o administrador"
+            )
+        inicio = time.perf_counter()
+        publicos = [p for p, _ in PUBLICOS]
+        pesos = [w for _, w in PUBLICOS]
+        programas = [p for p, _ in EventoAcademico.PROGRAMA_EDUCATIVO_CHOICES]
+        tipos = [t for t, _ in EventoAcademico.TIPO_EVENTO_CHOICES]
+        hoy = date.today()
+
+        for lote in self.batches(total):
+            eventos = []
+            for i in lote:
+                publico = self.rng.choices(publicos, weights=pesos)[0]
+                hora = self.rng.randint(7, 18)
+                eventos.append(
+                    EventoAcademico(
+                        nombre_evento=f"{self.rng.choice(tipos)} de {self.rng.choice(TEMAS)} {i}",
+                        tipo_evento=self.rng.choice(tipos),
+                        # Un año hacia atrás y uno hacia adelante
+                        fecha_realizacion=hoy
+                        + timedelta(days=self.rng.randint(-365, 365)),
+                        hora_inicio=dtime(hora),
+                        hora_fin=dtime(min(hora + self.rng.randint(1, 4), 23)),
+                        lugar=self.rng.choice(LUGARES),
+                        publico_objetivo=list(publico),
+                        programa_educativo=(
+                            self.rng.choice(programas)
+                            if "Estudiantes" in publico
+                            else None
+                        ),
+                        responsable_evento_id=self.rng.choice(responsables),
+                        descripcion_breve="Evento generado para pruebas de escala.",
+                        cupo_maximo=self.rng.randint(10, 999),
+                    )
+                )
+                # bulk_create() no pasa por save()
+                eventos[-1].calcular_horario()
+            EventoAcademico.objects.bulk_create(eventos, batch_size=self.batch_size)
+
+        self.stdout.write(f"{total} eventos en {time.perf_counter() - inicio:.1f} s")
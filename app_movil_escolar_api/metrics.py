@@ -0,0 +1,308 @@
+import glob
+import json
+import os
+import threading
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from .instrumentation import QueryTimer, RequestTimings
+
+# Buckets (segundos) para las latencias de las vistas
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Buckets para el número de consultas SQL por petición
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+HELP = {
+    "http_requests_total": "Peticiones atendidas por vista, método y status",
+    "http_request_errors_total": "Peticiones que terminaron en 5xx",
+    "http_request_duration_seconds": "Latencia de la petición en segundos",
+    "http_request_db_queries": "Consultas SQL por petición",
+    "http_response_uncompressed_bytes_total": "Bytes de las respuestas antes de comprimir",
+    "http_response_compressed_bytes_total": "Bytes de las respuestas ya comprimidas",
+    "ratelimit_requests_total": "POST con límite de peticiones por ruta y resultado (allowed, limited_ip, limited_account)",
+    "db_route_requests_total": "Peticiones por base de lectura (replica, sticky, primary)",
+    "db_pool_connections": "Conexiones del pool por estado (in_use, idle)",
+    "db_pool_wait_seconds": "Espera por una conexión del pool en segundos",
+    "db_pool_exhausted_total": "Veces que no había conexión libre en el pool y hubo que esperar",
+    "db_pool_timeouts_total": "Esperas por una conexión del pool que se agotaron",
+    "db_pool_health_check_failures_total": "Conexiones del pool descartadas por fallar el SELECT 1",
+    "cache_requests_total": "Lecturas de caching.get_or_compute por grupo y resultado (hit, miss, early, stale, wait, timeout, refresh)",
+    "cache_compute_seconds": "Tiempo de recálculo de un valor del caché en segundos",
+    "cache_verify_total": "Aciertos del caché comparados contra la base (match, mismatch)",
+    "scheduler_job_runs_total": "Corridas de trabajos periódicos por resultado (ok, error, locked, skipped)",
+    "scheduler_job_seconds": "Duración de cada trabajo periódico en segundos",
+    "scheduler_job_last_success_timestamp": "Hora (epoch) de la última corrida exitosa de cada trabajo",
+    "uploads_total": "Imágenes subidas por tipo (foto, banner)",
+    "upload_seconds": "Tiempo de copiar una imagen subida al storage en segundos",
+    "thumbnail_jobs_total": "Miniaturas generadas por el pool por resultado (ok, error)",
+    "thumbnail_seconds": "Tiempo de generar una miniatura en segundos",
+    "url_checks_total": "URLs revisadas por DataUtils.is_url_image por resultado (image, not_image, error, cached)",
+    "url_check_seconds": "Tiempo de revisar una URL remota en segundos",
+    "media_requests_total": "Archivos servidos por media-stream por resultado (full, partial, not_modified, precondition_failed, unsatisfiable, redirect)",
+    "media_bytes_total": "Bytes servidos por media-stream por resultado (full, partial)",
+    "sync_late_commits_total": "Transacciones que hicieron commit de cambios de sincronización pasada la mitad de SYNC_SAFETY_LAG_SECONDS (se vuelven a anotar)",
+    "idempotency_requests_total": "POST con Idempotency-Key por resultado (executed, replayed, conflict, mismatch)",
+}
+
+
+class MetricsRegistry:
+    """
+    Registro en memoria de contadores, gauges e histogramas.
+
+    Con METRICS_MULTIPROC_DIR cada proceso (worker de gunicorn) vuelca su
+    registro a un archivo propio y el endpoint de scrape suma todos los
+    archivos, así las métricas cuadran sin importar qué worker atienda el scrape.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        # Incluye el arranque del proceso por si el pid se reutiliza
+        self._file_id = f"{self._pid}-{time.time_ns()}"
+        self._dirty = False
+        self._flusher = None
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+
+    def _check_fork(self):
+        # Tras un fork (gunicorn --preload) cada worker empieza su registro
+        if os.getpid() != self._pid:
+            self._reset()
+        self._dirty = True
+
+    def inc(self, name, labels, value=1):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._check_fork()
+            self.counters[key] = self.counters.get(key, 0) + value
+        self._ensure_flusher()
+
+    def set(self, name, labels, value):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._check_fork()
+            self.gauges[key] = value
+        self._ensure_flusher()
+
+    def observe(self, name, labels, value, buckets=LATENCY_BUCKETS):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._check_fork()
+            hist = self.histograms.get(key)
+            if hist is None:
+                hist = self.histograms[key] = {
+                    "buckets": list(buckets),
+                    "counts": [0] * len(buckets),
+                    "sum": 0.0,
+                    "count": 0,
+                }
+            for i, limite in enumerate(hist["buckets"]):
+                if value <= limite:
+                    hist["counts"][i] += 1
+                    break
+            hist["sum"] += value
+            hist["count"] += 1
+        self._ensure_flusher()
+
+    def snapshot(self):
+        with self._lock:
+            if os.getpid() != self._pid:
+                self._reset()
+            return {
+                "pid": self._pid,
+                "counters": [[n, list(l), v] for (n, l), v in self.counters.items()],
+                "gauges": [[n, list(l), v] for (n, l), v in self.gauges.items()],
+                "histograms": [
+                    [n, list(l), dict(h, counts=list(h["counts"]))]
+                    for (n, l), h in self.histograms.items()
+                ],
+            }
+
+    def _ensure_flusher(self):
+        """
+        En modo multiproceso arranca (una vez por proceso) un hilo que vuelca
+        el registro cada METRICS_FLUSH_INTERVAL segundos si hubo cambios
+        """
+        if self._flusher is not None or not settings.METRICS_MULTIPROC_DIR:
+            return
+        with self._lock:
+            if self._flusher is not None:
+                return
+            self._flusher = threading.Thread(
+                target=self._flush_loop, name="metrics-flush", daemon=True
+            )
+            self._flusher.start()
+
+    def _flush_loop(self):
+        pid = os.getpid()
+        while os.getpid() == pid:
+            time.sleep(settings.METRICS_FLUSH_INTERVAL)
+            if self._dirty:
+                self._dirty = False
+                try:
+                    self.flush(settings.METRICS_MULTIPROC_DIR)
+                except OSError:
+                    self._dirty = True
+
+    def flush(self, directorio):
+        """
+        Escribe el registro del proceso de forma atómica (tmp + rename)
+        """
+        ruta = os.path.join(directorio, f"metrics-{self._file_id}.json")
+        tmp = f"{ruta}.{threading.get_ident()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.snapshot(), f)
+        os.replace(tmp, ruta)
+
+    def collect(self):
+        """
+        Regresa las métricas de todos los procesos ya sumadas
+        """
+        directorio = settings.METRICS_MULTIPROC_DIR
+        if not directorio:
+            return merge_snapshots([self.snapshot()])
+        self.flush(directorio)
+        snapshots = []
+        for ruta in glob.glob(os.path.join(directorio, "metrics-*.json")):
+            try:
+                with open(ruta) as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return merge_snapshots(snapshots)
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def merge_snapshots(snapshots):
+    """
+    Suma contadores e histogramas de todos los procesos. Los gauges solo se
+    suman para procesos vivos (un worker muerto no tiene conexiones abiertas).
+    """
+    counters, gauges, histograms = {}, {}, {}
+    for snap in snapshots:
+        for name, labels, value in snap["counters"]:
+            key = (name, tuple(tuple(l) for l in labels))
+            counters[key] = counters.get(key, 0) + value
+        if _pid_alive(snap["pid"]):
+            for name, labels, value in snap["gauges"]:
+                key = (name, tuple(tuple(l) for l in labels))
+                gauges[key] = gauges.get(key, 0) + value
+        for name, labels, hist in snap["histograms"]:
+            key = (name, tuple(tuple(l) for l in labels))
+            total = histograms.get(key)
+            if total is None or total["buckets"] != hist["buckets"]:
+                histograms[key] = dict(hist, counts=list(hist["counts"]))
+                continue
+            total["counts"] = [a + b for a, b in zip(total["counts"], hist["counts"])]
+            total["sum"] += hist["sum"]
+            total["count"] += hist["count"]
+    return counters, gauges, histograms
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels, extra=()):
+    pares = list(labels) + list(extra)
+    if not pares:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pares) + "}"
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render_prometheus(counters, gauges, histograms):
+    """
+    Formato de exposición de texto de Prometheus (versión 0.0.4)
+    """
+    lineas = []
+    vistos = set()
+
+    def header(name, tipo):
+        if name in vistos:
+            return
+        vistos.add(name)
+        if name in HELP:
+            lineas.append(f"# HELP {name} {HELP[name]}")
+        lineas.append(f"# TYPE {name} {tipo}")
+
+    for (name, labels), value in sorted(counters.items()):
+        header(name, "counter")
+        lineas.append(f"{name}{_labels(labels)} {_number(value)}")
+    for (name, labels), value in sorted(gauges.items()):
+        header(name, "gauge")
+        lineas.append(f"{name}{_labels(labels)} {_number(value)}")
+    for (name, labels), hist in sorted(histograms.items()):
+        header(name, "histogram")
+        acumulado = 0
+        for limite, cuenta in zip(hist["buckets"], hist["counts"]):
+            acumulado += cuenta
+            lineas.append(
+                f"{name}_bucket{_labels(labels, [('le', _number(limite))])} {acumulado}"
+            )
+        lineas.append(
+            f"{name}_bucket{_labels(labels, [('le', '+Inf')])} {hist['count']}"
+        )
+        lineas.append(f"{name}_sum{_labels(labels)} {_number(hist['sum'])}")
+        lineas.append(f"{name}_count{_labels(labels)} {hist['count']}")
+    return "\n".join(lineas) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+class MetricsMiddleware:
+    """
+    Registra conteo, latencia, errores y consultas SQL de cada petición,
+    agrupados por el nombre de la URL (p. ej. lista_eventos, login, alumnos)
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timings = RequestTimings()
+        inicio = time.perf_counter()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(
+                    connections[alias].execute_wrapper(QueryTimer(timings))
+                )
+            response = self.get_response(request)
+        duracion = time.perf_counter() - inicio
+
+        match = getattr(request, "resolver_match", None)
+        view = (match.url_name or match.route) if match else "unmatched"
+        labels = {"view": view, "method": request.method}
+
+        registry.inc(
+            "http_requests_total", dict(labels, status=str(response.status_code))
+        )
+        if response.status_code >= 500:
+            registry.inc("http_request_errors_total", labels)
+        registry.observe("http_request_duration_seconds", labels, duracion)
+        registry.observe(
+            "http_request_db_queries", labels, timings.queries, buckets=QUERY_BUCKETS
+        )
+        return response
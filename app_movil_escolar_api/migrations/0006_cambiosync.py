@@ -0,0 +1,52 @@
+# Generated by Django 5.0.2 on 2026-10-18 23:08
+
+import django.utils.timezone
+from django.db import migrations, models
+
+# Modelo -> entidad de changes-since (ver sync.ENTIDAD_POR_MODELO)
+ENTIDADES = {
+    'Administradores': 'admins',
+    'Alumnos': 'alumnos',
+    'Maestros': 'maestros',
+    'EventoAcademico': 'eventos',
+}
+
+
+def registrar_existentes(apps, schema_editor):
+    # Los datos previos a la bitácora se anotan una vez para que cursor=0
+    # entregue todo
+    CambioSync = apps.get_model('app_movil_escolar_api', 'CambioSync')
+    for modelo, entidad in ENTIDADES.items():
+        ids = apps.get_model('app_movil_escolar_api', modelo).objects.order_by('id')
+        lote = []
+        for objeto_id in ids.values_list('id', flat=True).iterator(chunk_size=5000):
+            lote.append(CambioSync(entidad=entidad, objeto_id=objeto_id))
+            if len(lote) == 5000:
+                CambioSync.objects.bulk_create(lote)
+                lote = []
+        CambioSync.objects.bulk_create(lote)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_movil_escolar_api', '0005_maestros_edad'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CambioSync',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('entidad', models.CharField(max_length=20)),
+                ('objeto_id', models.BigIntegerField()),
+                ('eliminado', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'db_table': 'cambios_sync',
+                'indexes': [models.Index(fields=['entidad', 'objeto_id'], name='cambios_syn_entidad_11054b_idx'), models.Index(fields=['entidad', 'id'], name='cambios_sync_entidad_id_idx')],
+            },
+        ),
+        migrations.RunPython(registrar_existentes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,115 @@
+# Generated by Django 5.0.2 on 2026-10-18 23:13
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+# (app, modelo, campo) que pasan a ser únicos
+CAMPOS_UNICOS = [
+    ('auth', 'User', 'email'),
+    ('app_movil_escolar_api', 'Alumnos', 'matricula'),
+    ('app_movil_escolar_api', 'Alumnos', 'curp'),
+    ('app_movil_escolar_api', 'Maestros', 'id_trabajador'),
+]
+
+# Valores duplicados que se muestran por campo en el reporte
+MAX_REPORTE = 20
+
+# auth_user.email es NOT NULL y los usuarios creados sin email (superusuarios)
+# lo guardan vacío: la unicidad solo aplica a los no vacíos. Donde el índice
+# parcial no sirve para buscar por email (SQLite) o no existe (MySQL) se agrega
+# además un índice normal para User.objects.filter(email=...).
+INDICE_EMAIL = {
+    'postgresql': [
+        "CREATE UNIQUE INDEX auth_user_email_unico ON auth_user (email) WHERE email <> ''",
+    ],
+    'sqlite': [
+        "CREATE UNIQUE INDEX auth_user_email_unico ON auth_user (email) WHERE email <> ''",
+        'CREATE INDEX auth_user_email_idx ON auth_user (email)',
+    ],
+    'mysql': [
+        "CREATE UNIQUE INDEX auth_user_email_unico ON auth_user ((NULLIF(email, '')))",
+        'CREATE INDEX auth_user_email_idx ON auth_user (email)',
+    ],
+}
+
+
+def reportar_duplicados(apps, schema_editor):
+    # Un identificador vacío no identifica a nadie: se guarda como NULL, que
+    # no choca con los índices únicos
+    for app, modelo, campo in CAMPOS_UNICOS[1:]:
+        apps.get_model(app, modelo).objects.filter(**{campo: ''}).update(**{campo: None})
+
+    reporte = []
+    for app, modelo, campo in CAMPOS_UNICOS:
+        repetidos = (
+            apps.get_model(app, modelo).objects
+            .exclude(**{campo + '__isnull': True})
+            .exclude(**{campo: ''})
+            .values(campo)
+            .annotate(total=Count('id'))
+            .filter(total__gt=1)
+            .order_by('-total', campo)
+        )
+        total = repetidos.count()
+        if not total:
+            continue
+        reporte.append(f'{modelo}.{campo}: {total} valores repetidos')
+        for fila in repetidos[:MAX_REPORTE]:
+            ids = list(
+                apps.get_model(app, modelo).objects
+                .filter(**{campo: fila[campo]})
+                .order_by('id')
+                .values_list('id', flat=True)
+            )
+            reporte.append(f'  {fila[campo]!r}: {fila["total"]} registros (ids {ids})')
+        if total > MAX_REPORTE:
+            reporte.append(f'  ... y {total - MAX_REPORTE} más')
+
+    if reporte:
+        raise RuntimeError(
+            'No se pueden crear los índices únicos porque hay duplicados. '
+            'Corrígelos (o borra los registros sobrantes) y vuelve a correr '
+            'migrate:\n' + '\n'.join(reporte)
+        )
+
+
+def crear_indice_email(apps, schema_editor):
+    for sql in INDICE_EMAIL.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql)
+
+
+def borrar_indice_email(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    for nombre in ('auth_user_email_unico', 'auth_user_email_idx'):
+        if nombre not in ' '.join(INDICE_EMAIL.get(vendor, [])):
+            continue
+        if vendor == 'mysql':
+            schema_editor.execute(f'DROP INDEX {nombre} ON auth_user')
+        else:
+            schema_editor.execute(f'DROP INDEX {nombre}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_movil_escolar_api', '0006_cambiosync'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(reportar_duplicados, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='alumnos',
+            constraint=models.UniqueConstraint(fields=('matricula',), name='alumnos_matricula_unica'),
+        ),
+        migrations.AddConstraint(
+            model_name='alumnos',
+            constraint=models.UniqueConstraint(fields=('curp',), name='alumnos_curp_unica'),
+        ),
+        migrations.AddConstraint(
+            model_name='maestros',
+            constraint=models.UniqueConstraint(fields=('id_trabajador',), name='maestros_id_trabajador_unico'),
+        ),
+        migrations.RunPython(crear_indice_email, borrar_indice_email),
+    ]
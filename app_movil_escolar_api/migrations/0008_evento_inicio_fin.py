@@ -0,0 +1,75 @@
+# Generated by Django 5.0.2 on 2026-10-18 23:40
+
+from datetime import datetime
+
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+# Eventos que se leen y actualizan por vuelta al llenar inicio y fin
+LOTE = 2000
+
+
+def llenar_horario(apps, schema_editor):
+    # Igual que EventoAcademico.calcular_horario() (el modelo histórico no
+    # tiene sus métodos)
+    EventoAcademico = apps.get_model('app_movil_escolar_api', 'EventoAcademico')
+    zona = timezone.get_default_timezone()
+
+    def combinar(fecha, hora):
+        valor = datetime.combine(fecha, hora)
+        return timezone.make_aware(valor, zona) if settings.USE_TZ else valor
+
+    ultimo = 0
+    while True:
+        eventos = list(
+            EventoAcademico.objects.filter(id__gt=ultimo)
+            .order_by('id')
+            .only('id', 'fecha_realizacion', 'hora_inicio', 'hora_fin')[:LOTE]
+        )
+        if not eventos:
+            break
+        for evento in eventos:
+            evento.inicio = combinar(evento.fecha_realizacion, evento.hora_inicio)
+            evento.fin = combinar(evento.fecha_realizacion, evento.hora_fin)
+        EventoAcademico.objects.bulk_update(eventos, ['inicio', 'fin'])
+        ultimo = eventos[-1].id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_movil_escolar_api', '0007_unicidad'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='eventoacademico',
+            name='inicio',
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='eventoacademico',
+            name='fin',
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+        migrations.RunPython(llenar_horario, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='eventoacademico',
+            name='inicio',
+            field=models.DateTimeField(editable=False),
+        ),
+        migrations.AlterField(
+            model_name='eventoacademico',
+            name='fin',
+            field=models.DateTimeField(editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='eventoacademico',
+            index=models.Index(fields=['inicio', 'id'], name='eventos_inicio_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='eventoacademico',
+            index=models.Index(fields=['fin'], name='eventos_fin_idx'),
+        ),
+    ]
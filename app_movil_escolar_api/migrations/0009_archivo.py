@@ -0,0 +1,35 @@
+# Generated by Django 5.0.2 on 2026-10-18 23:42
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_movil_escolar_api', '0008_evento_inicio_fin'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Archivo',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('tipo', models.CharField(choices=[('foto', 'Foto de perfil'), ('banner', 'Banner de evento')], max_length=10)),
+                ('objeto_id', models.BigIntegerField()),
+                ('nombre', models.CharField(max_length=255)),
+                ('miniatura', models.CharField(blank=True, default='', max_length=255)),
+                ('content_type', models.CharField(max_length=50)),
+                ('tamano', models.BigIntegerField()),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('subido_por', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'archivos',
+                'indexes': [models.Index(fields=['tipo', 'objeto_id'], name='archivos_tipo_objeto_idx')],
+            },
+        ),
+    ]
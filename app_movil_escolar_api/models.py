@@ -4,13 +4,14 @@ from django.dispatch import receiver
 from rest_framework.authentication import TokenAuthentication
 from django.contrib.auth.models import AbstractUser, User
 from django.conf import settings
+from django.utils import timezone
 
 from django.db import models
 from django.contrib.auth.models import User
 
 from rest_framework.authentication import TokenAuthentication
 from django.core.validators import MinValueValidator, MaxValueValidator
-from datetime import date
+from datetime import date, datetime, timedelta
 
 
 class BearerTokenAuthentication(TokenAuthentication):
@@ -49,6 +50,16 @@ class Alumnos(models.Model):
     creation = models.DateTimeField(auto_now_add=True, null=True, blank=True)
     update = models.DateTimeField(null=True, blank=True)
 
+    class Meta:
+        # Índices únicos: búsqueda por identificador y registro sin duplicados
+        # aunque dos altas lleguen al mismo tiempo
+        constraints = [
+            models.UniqueConstraint(
+                fields=["matricula"], name="alumnos_matricula_unica"
+            ),
+            models.UniqueConstraint(fields=["curp"], name="alumnos_curp_unica"),
+        ]
+
     def __str__(self):
         return "Perfil del alumno " + self.user.first_name + " " + self.user.last_name
 
@@ -69,10 +80,55 @@ class Maestros(models.Model):
     creation = models.DateTimeField(auto_now_add=True, null=True, blank=True)
     update = models.DateTimeField(null=True, blank=True)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["id_trabajador"], name="maestros_id_trabajador_unico"
+            ),
+        ]
+
     def __str__(self):
         return "Perfil del maestro " + self.user.first_name + " " + self.user.last_name
 
 
+# Un evento empieza y termina el mismo día: dura menos que esto
+DURACION_MAXIMA = timedelta(days=1)
+
+# Duración de un evento calculada por la base (ver EventoQuerySet.con_duracion)
+DURACION = models.ExpressionWrapper(
+    models.F("fin") - models.F("inicio"), output_field=models.DurationField()
+)
+
+
+class EventoQuerySet(models.QuerySet):
+    """
+    Filtros por estado con las columnas indexadas `inicio` y `fin`, para no
+    cargar todos los eventos y revisar cada uno en Python
+    """
+
+    def proximos(self, ahora=None):
+        return self.filter(inicio__gt=ahora or timezone.now())
+
+    def pasados(self, ahora=None):
+        ahora = ahora or timezone.now()
+        # inicio < fin: la condición sobre inicio no cambia el resultado,
+        # deja recorrer el índice de inicio hacia atrás desde ahora
+        return self.filter(inicio__lt=ahora, fin__lte=ahora)
+
+    def en_curso(self, ahora=None):
+        ahora = ahora or timezone.now()
+        # La cota inferior deja la búsqueda en un tramo del índice de inicio
+        return self.filter(
+            inicio__gt=ahora - DURACION_MAXIMA, inicio__lte=ahora, fin__gt=ahora
+        )
+
+    def con_duracion(self):
+        """
+        Anota `duracion` (timedelta) calculada por la base
+        """
+        return self.annotate(duracion=DURACION)
+
+
 class EventoAcademico(models.Model):
     """
     Modelo para almacenar eventos académicos de la Facultad.
@@ -134,10 +190,17 @@ class EventoAcademico(models.Model):
         blank=False,
     )
 
+    # Fecha y hora de inicio y fin como un solo valor, para filtrar y
+    # ordenar en la base; se calculan al guardar (ver calcular_horario)
+    inicio = models.DateTimeField(editable=False)
+    fin = models.DateTimeField(editable=False)
+
     # Campos de auditoría
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = EventoQuerySet.as_manager()
+
     class Meta:
         db_table = "eventos_academicos"
         ordering = ["-fecha_realizacion", "-hora_inicio"]
@@ -145,11 +208,43 @@ class EventoAcademico(models.Model):
             models.Index(fields=["fecha_realizacion"]),
             models.Index(fields=["tipo_evento"]),
             models.Index(fields=["responsable_evento"]),
+            # Listas y páginas por inicio (el id desempata el cursor)
+            models.Index(fields=["inicio", "id"], name="eventos_inicio_id_idx"),
+            models.Index(fields=["fin"], name="eventos_fin_idx"),
         ]
 
     def __str__(self):
         return f"{self.nombre_evento} - {self.fecha_realizacion}"
 
+    def calcular_horario(self):
+        """
+        Llena `inicio` y `fin` a partir de fecha_realizacion, hora_inicio y
+        hora_fin (hora local de TIME_ZONE). save() lo llama; bulk_create()
+        no, quien cree eventos así debe llamarlo antes.
+        """
+        zona = timezone.get_default_timezone()
+        # to_python(): create() también acepta fecha y horas como texto
+        fecha = self._meta.get_field("fecha_realizacion").to_python(
+            self.fecha_realizacion
+        )
+        for campo, origen in (("inicio", "hora_inicio"), ("fin", "hora_fin")):
+            hora = self._meta.get_field(origen).to_python(getattr(self, origen))
+            valor = datetime.combine(fecha, hora)
+            if settings.USE_TZ:
+                valor = timezone.make_aware(valor, zona)
+            setattr(self, campo, valor)
+
+    def save(self, *args, **kwargs):
+        self.calcular_horario()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and {
+            "fecha_realizacion",
+            "hora_inicio",
+            "hora_fin",
+        } & set(update_fields):
+            kwargs["update_fields"] = {*update_fields, "inicio", "fin"}
+        super().save(*args, **kwargs)
+
     def clean(self):
         """
         Validaciones personalizadas del modelo
@@ -184,12 +279,10 @@ class EventoAcademico(models.Model):
         """
         Calcula la duración del evento en horas
         """
-        from datetime import datetime, timedelta
-
-        inicio = datetime.combine(date.today(), self.hora_inicio)
-        fin = datetime.combine(date.today(), self.hora_fin)
-        duracion = fin - inicio
-        return duracion.total_seconds() / 3600
+        if self.inicio is None or self.fin is None:
+            # Aún sin guardar
+            self.calcular_horario()
+        return (self.fin - self.inicio).total_seconds() / 3600
 
     @property
     def esta_activo(self):
@@ -197,3 +290,70 @@ class EventoAcademico(models.Model):
         Verifica si el evento está activo (fecha >= hoy)
         """
         return self.fecha_realizacion >= date.today()
+
+
+class CambioSync(models.Model):
+    """
+    Bitácora de cambios para la sincronización incremental (changes-since).
+
+    El id autoincremental es el cursor: un cliente guarda el último que vio y
+    pide lo posterior. Cada cambio agrega una fila (un solo INSERT al
+    escribir) y `manage.py compact_sync_log` borra las que ya tienen una más
+    nueva del mismo objeto. Las filas con eliminado=True son las tombstones
+    de los objetos borrados.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    entidad = models.CharField(max_length=20, null=False, blank=False)
+    objeto_id = models.BigIntegerField(null=False, blank=False)
+    eliminado = models.BooleanField(default=False)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = "cambios_sync"
+        indexes = [
+            models.Index(fields=["entidad", "objeto_id"]),
+            # changes-since de algunas entidades: recorre solo sus filas
+            # posteriores al cursor, ya en orden de id
+            models.Index(fields=["entidad", "id"], name="cambios_sync_entidad_id_idx"),
+        ]
+
+    def __str__(self):
+        accion = "eliminado" if self.eliminado else "cambio"
+        return f"{self.entidad} {self.objeto_id} ({accion}) #{self.id}"
+
+
+class Archivo(models.Model):
+    """
+    Imagen subida (foto de perfil o banner de evento). El archivo vive en el
+    storage por defecto (disco local o GCS); aquí solo su nombre, el de su
+    miniatura (vacío hasta que el pool de uploads.py la genera) y a qué
+    objeto pertenece. El más reciente de cada (tipo, objeto_id) es el vigente.
+    """
+
+    TIPO_CHOICES = [
+        ("foto", "Foto de perfil"),
+        ("banner", "Banner de evento"),
+    ]
+
+    id = models.BigAutoField(primary_key=True)
+    tipo = models.CharField(max_length=10, choices=TIPO_CHOICES)
+    # id del User (foto) o del EventoAcademico (banner)
+    objeto_id = models.BigIntegerField()
+    nombre = models.CharField(max_length=255)
+    miniatura = models.CharField(max_length=255, blank=True, default="")
+    content_type = models.CharField(max_length=50)
+    tamano = models.BigIntegerField()
+    subido_por = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True, related_name="+"
+    )
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = "archivos"
+        indexes = [
+            models.Index(fields=["tipo", "objeto_id"], name="archivos_tipo_objeto_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.tipo} {self.objeto_id}: {self.nombre}"
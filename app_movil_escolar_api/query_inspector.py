@@ -0,0 +1,158 @@
+import logging
+import re
+import time
+import traceback
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger("app_movil_escolar_api.queries")
+
+# Literales y listas IN que cambian entre consultas con la misma forma
+_IN_LIST = re.compile(r"\bIN\s*\((?:\s*%s\s*,?)+\)", re.IGNORECASE)
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+
+
+class QueryProblemsError(Exception):
+    """
+    Se lanza cuando QUERY_INSPECTOR_RAISE está activo y una petición
+    (o un bloque inspect_queries()) tiene consultas repetidas o lentas
+    """
+
+
+def query_shape(sql):
+    """
+    Normaliza una consulta para agrupar las que solo cambian en sus parámetros
+    """
+    sql = _IN_LIST.sub("IN (...)", sql)
+    sql = _STRING.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    return " ".join(sql.split())
+
+
+def _app_stack():
+    """
+    Frames del proyecto (sin Django, librerías ni middlewares) que llevaron
+    a la consulta
+    """
+    base = str(settings.BASE_DIR)
+    frames = [
+        f
+        for f in traceback.extract_stack()[:-3]
+        if f.filename.startswith(base)
+        and "site-packages" not in f.filename
+        and f.name != "__call__"
+    ]
+    return traceback.format_list(frames[-8:])
+
+
+class QueryInspector:
+    """
+    execute_wrapper que agrupa las consultas por forma y detecta:
+    - N+1: la misma forma ejecutada QUERY_INSPECTOR_REPEAT veces o más
+    - consultas que tardan más de QUERY_INSPECTOR_SLOW_MS
+    """
+
+    def __init__(self, repeat=None, slow_ms=None):
+        self.repeat = repeat or settings.QUERY_INSPECTOR_REPEAT
+        self.slow = (slow_ms or settings.QUERY_INSPECTOR_SLOW_MS) / 1000
+        self.counts = {}
+        # forma -> stack de la consulta que cruzó el umbral
+        self.repeated = {}
+        self.slow_queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duracion = time.perf_counter() - inicio
+            shape = query_shape(sql)
+            count = self.counts.get(shape, 0) + 1
+            self.counts[shape] = count
+            if count == self.repeat:
+                self.repeated[shape] = _app_stack()
+            if duracion >= self.slow:
+                self.slow_queries.append((shape, duracion, _app_stack()))
+
+    @property
+    def has_problems(self):
+        return bool(self.repeated or self.slow_queries)
+
+    def report(self, view):
+        """
+        Escribe en el log cada problema encontrado; regresa el resumen
+        """
+        lineas = []
+        for shape, stack in self.repeated.items():
+            lineas.append(
+                f"N+1 en {view}: {self.counts[shape]} veces -> {shape}\n"
+                + "".join(stack)
+            )
+        for shape, duracion, stack in self.slow_queries:
+            lineas.append(
+                f"Consulta lenta en {view}: {duracion * 1000:.1f} ms -> {shape}\n"
+                + "".join(stack)
+            )
+        for linea in lineas:
+            logger.warning(linea)
+        return "\n".join(lineas)
+
+
+@contextmanager
+def _watch(inspector):
+    with ExitStack() as stack:
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(inspector))
+        yield inspector
+
+
+def _check(inspector, view, raise_errors):
+    if not inspector.has_problems:
+        return
+    resumen = inspector.report(view)
+    if raise_errors is None:
+        raise_errors = settings.QUERY_INSPECTOR_RAISE
+    if raise_errors:
+        raise QueryProblemsError(resumen)
+
+
+@contextmanager
+def inspect_queries(view="bloque", repeat=None, slow_ms=None, raise_errors=None):
+    """
+    Inspecciona las consultas del bloque. Pensado para pruebas y comandos:
+    con raise_errors (por defecto QUERY_INSPECTOR_RAISE) lanza
+    QueryProblemsError al salir si hubo N+1 o consultas lentas.
+    """
+    with _watch(QueryInspector(repeat=repeat, slow_ms=slow_ms)) as inspector:
+        yield inspector
+    _check(inspector, view, raise_errors)
+
+
+class QueryInspectorMiddleware:
+    """
+    Inspecciona las consultas de cada petición cuando QUERY_INSPECTOR_ENABLED
+    (por defecto solo en DEBUG; pensado para desarrollo y staging). Con
+    QUERY_INSPECTOR_RAISE la petición falla, lo que hace fallar las pruebas.
+    """
+
+    def __init__(self, get_response):
+        if not settings.QUERY_INSPECTOR_ENABLED:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with _watch(QueryInspector()) as inspector:
+            response = self.get_response(request)
+
+        if inspector.has_problems:
+            match = getattr(request, "resolver_match", None)
+            view = match.view_name if match else request.path
+            _check(inspector, f"{request.method} {view}", None)
+            response["X-Query-Problems"] = (
+                f"n+1={len(inspector.repeated)}; slow={len(inspector.slow_queries)}"
+            )
+        return response
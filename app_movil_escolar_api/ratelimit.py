@@ -0,0 +1,185 @@
+import hashlib
+import json
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import JsonResponse
+
+from .metrics import registry
+
+
+def _recargar(estado, capacidad, por_segundo, ahora):
+    """
+    Fichas de un bucket al momento `ahora`. `estado` es (fichas, cuándo) o
+    None para un bucket que nunca se usó (lleno).
+    """
+    if estado is None:
+        return float(capacidad)
+    fichas, antes = estado
+    return min(float(capacidad), fichas + (ahora - antes) * por_segundo)
+
+
+def _tomar(estado, capacidad, por_segundo, ahora):
+    """
+    Intenta gastar una ficha. Regresa (nuevo estado, permitido, fichas).
+    """
+    fichas = _recargar(estado, capacidad, por_segundo, ahora)
+    permitido = fichas >= 1
+    if permitido:
+        fichas -= 1
+    return (fichas, ahora), permitido, fichas
+
+
+class MemoriaBackend:
+    """
+    Buckets en la memoria del proceso: sin red ni consultas, pero cada
+    worker lleva su propia cuenta. Guarda a lo más `max_keys` buckets; al
+    llenarse se descarta el que lleva más tiempo sin usarse (un bucket
+    olvidado equivale a uno lleno).
+    """
+
+    def __init__(self, max_keys):
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._buckets = OrderedDict()
+
+    def tomar(self, clave, capacidad, por_segundo):
+        ahora = time.monotonic()
+        with self._lock:
+            estado, permitido, fichas = _tomar(
+                self._buckets.get(clave), capacidad, por_segundo, ahora
+            )
+            self._buckets[clave] = estado
+            self._buckets.move_to_end(clave)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return permitido, fichas
+
+
+class CacheBackend:
+    """
+    Buckets en un caché de Django (RATELIMIT_CACHE): con Redis o Memcached
+    la cuenta es la misma para todos los workers e instancias. Lectura y
+    escritura no son atómicas: peticiones simultáneas de la misma clave
+    pueden pasar unas cuantas de más, nunca bloquear de más.
+    """
+
+    def __init__(self, alias):
+        self.alias = alias
+
+    def tomar(self, clave, capacidad, por_segundo):
+        cache = caches[self.alias]
+        # Reloj de pared: el estado se comparte entre máquinas
+        ahora = time.time()
+        estado, permitido, fichas = _tomar(
+            cache.get(clave), capacidad, por_segundo, ahora
+        )
+        # Expira cuando ya se habría llenado de nuevo
+        cache.set(clave, estado, math.ceil(capacidad / por_segundo) + 1)
+        return permitido, fichas
+
+
+def get_backend():
+    if settings.RATELIMIT_BACKEND == "cache":
+        return CacheBackend(settings.RATELIMIT_CACHE)
+    return MemoriaBackend(settings.RATELIMIT_MAX_KEYS)
+
+
+def client_ip(request):
+    """
+    IP del cliente. Detrás de un proxy REMOTE_ADDR es la del proxy: con
+    RATELIMIT_IP_HEADER (p. ej. HTTP_X_APPENGINE_USER_IP en App Engine,
+    que el balanceador sobrescribe) se usa ese header.
+    """
+    if settings.RATELIMIT_IP_HEADER:
+        ip = request.META.get(settings.RATELIMIT_IP_HEADER, "").strip()
+        if ip:
+            return ip
+    return request.META.get("REMOTE_ADDR", "")
+
+
+def _cuenta(request, campo):
+    # Mismo campo que lee la vista; un cuerpo inválido no tiene cuenta (la
+    # vista responderá 400 sin cifrar nada)
+    if request.content_type == "application/json":
+        try:
+            datos = json.loads(request.body or b"{}")
+        except ValueError:
+            return ""
+        valor = datos.get(campo) if isinstance(datos, dict) else None
+    else:
+        valor = request.POST.get(campo)
+    return valor.strip().lower() if isinstance(valor, str) else ""
+
+
+class RateLimitMiddleware:
+    """
+    Token bucket para los POST de RATELIMIT_RULES (login y registros), que
+    cifran o comprueban una contraseña con PBKDF2 y pueden acaparar los
+    workers. Cada petición gasta una ficha del bucket de su IP y otra del de
+    la cuenta (username o email del cuerpo); sin fichas responde 429 antes
+    de llegar a la vista, es decir, antes de cualquier hash.
+
+    Las respuestas llevan RateLimit-Limit, RateLimit-Remaining y
+    RateLimit-Reset del bucket más cerca de agotarse; las 429 además
+    Retry-After.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.backend = get_backend()
+
+    def __call__(self, request):
+        regla = settings.RATELIMIT_RULES.get(request.path)
+        if regla is None or request.method != "POST" or not settings.RATELIMIT_ENABLED:
+            return self.get_response(request)
+
+        claves = [("ip", client_ip(request))]
+        cuenta = _cuenta(request, regla["field"])
+        if cuenta:
+            claves.append(("account", cuenta))
+
+        # (fichas, capacidad, por_segundo) del bucket más cerca de agotarse
+        limite = None
+        for tipo, valor in claves:
+            capacidad, por_minuto = regla[tipo]
+            por_segundo = por_minuto / 60
+            permitido, fichas = self.backend.tomar(
+                self.bucket_key(request.path, tipo, valor), capacidad, por_segundo
+            )
+            if limite is None or fichas < limite[0]:
+                limite = (fichas, capacidad, por_segundo)
+            if not permitido:
+                registry.inc(
+                    "ratelimit_requests_total",
+                    {"path": request.path, "result": f"limited_{tipo}"},
+                )
+                response = JsonResponse(
+                    {"message": "Demasiados intentos, espera un momento"},
+                    status=429,
+                )
+                response["Retry-After"] = str(math.ceil((1 - fichas) / por_segundo))
+                self.headers(response, *limite)
+                return response
+
+        registry.inc(
+            "ratelimit_requests_total", {"path": request.path, "result": "allowed"}
+        )
+        response = self.get_response(request)
+        self.headers(response, *limite)
+        return response
+
+    def bucket_key(self, path, tipo, valor):
+        # Emails e IPs no quedan en claro en el caché
+        resumen = hashlib.sha256(f"{path}\n{tipo}\n{valor}".encode()).hexdigest()
+        return f"rl:{resumen}"
+
+    def headers(self, response, fichas, capacidad, por_segundo):
+        response["RateLimit-Limit"] = str(capacidad)
+        response["RateLimit-Remaining"] = str(math.floor(fichas))
+        # Segundos para que el bucket vuelva a estar lleno
+        response["RateLimit-Reset"] = str(math.ceil((capacidad - fichas) / por_segundo))
@@ -0,0 +1,100 @@
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import Group, User
+from django.db import IntegrityError, transaction
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import Alumnos, Maestros
+
+# Identificadores únicos de cada perfil (UniqueConstraint en models.py) y el
+# mensaje cuando ya los usa otro registro
+IDENTIFICADORES = {
+    Alumnos: {
+        "matricula": "La matrícula {} ya está registrada",
+        "curp": "La CURP {} ya está registrada",
+    },
+    Maestros: {
+        "id_trabajador": "El ID de trabajador {} ya está registrado",
+    },
+}
+
+
+# nombre del grupo (rol) -> id; los grupos casi nunca cambian
+_grupos = {}
+
+
+def grupo_id(nombre):
+    """
+    Id del grupo `nombre`, creándolo si no existe. Se guarda por proceso:
+    solo el primer registro de cada rol paga la consulta.
+    """
+    try:
+        return _grupos[nombre]
+    except KeyError:
+        grupo, _ = Group.objects.get_or_create(name=nombre)
+        # Solo se guarda si la transacción que lo vio hace commit; un grupo
+        # creado en una transacción deshecha no debe quedar en el caché
+        transaction.on_commit(lambda: _grupos.__setitem__(nombre, grupo.id))
+        return grupo.id
+
+
+def registrar_perfil(modelo, datos, perfil):
+    """
+    Da de alta un usuario con su rol y su perfil `modelo` con un INSERT por
+    tabla (usuario con la contraseña ya cifrada, membresía del grupo y
+    perfil) en una sola transacción. `datos` trae rol, first_name,
+    last_name, email y password; `perfil` los campos del perfil.
+
+    Regresa el perfil creado. Lanza IntegrityError si el email o un
+    identificador ya están registrados (ver respuesta_duplicados).
+    """
+    email = datos["email"]
+    # El hash (PBKDF2) es lo más caro del registro: fuera de la transacción
+    password = make_password(datos["password"])
+    grupo = grupo_id(datos["rol"])
+    try:
+        with transaction.atomic():
+            user = User.objects.create(
+                username=email,
+                email=email,
+                first_name=datos["first_name"],
+                last_name=datos["last_name"],
+                password=password,
+                is_active=True,
+            )
+            User.groups.through.objects.create(user_id=user.id, group_id=grupo)
+            return modelo.objects.create(user=user, **perfil)
+    except IntegrityError:
+        # También puede ser un grupo borrado desde el admin: se vuelve a
+        # buscar en el siguiente registro
+        _grupos.pop(datos["rol"], None)
+        raise
+
+
+def duplicados(modelo, valores, email=None, excluir_id=None):
+    """
+    {campo: mensaje} de los valores que ya usa otro registro. Se consulta
+    solo después de un IntegrityError, para decir qué campo chocó: el camino
+    normal no paga estas consultas.
+    """
+    errores = {}
+    if email and User.objects.filter(email=email).exists():
+        errores["email"] = f"El email {email} ya está registrado"
+    otros = modelo.objects.exclude(id=excluir_id) if excluir_id else modelo.objects
+    for campo, mensaje in IDENTIFICADORES.get(modelo, {}).items():
+        valor = valores.get(campo)
+        if valor and otros.filter(**{campo: valor}).exists():
+            errores[campo] = mensaje.format(valor)
+    return errores
+
+
+def respuesta_duplicados(modelo, valores, email=None, excluir_id=None):
+    """
+    Respuesta 400 para un IntegrityError por índice único (dos altas
+    simultáneas con el mismo email o identificador)
+    """
+    errores = duplicados(modelo, valores, email=email, excluir_id=excluir_id)
+    mensaje = " / ".join(errores.values()) or "Ya existe un registro con esos datos"
+    return Response(
+        {"message": mensaje, "errors": errores}, status=status.HTTP_400_BAD_REQUEST
+    )
@@ -0,0 +1,104 @@
+import io
+
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - sin orjson se usa el json de la stdlib
+    orjson = None
+
+# Fechas y horas en ISO 8601 con "Z" para UTC, igual que el JSONEncoder de DRF
+ORJSON_OPTIONS = (orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS) if orjson else 0
+
+# Para buscar números en un cuerpo JSON todos los dígitos se vuelven "0":
+# translate() y `in` corren en C, un regex \d{20} tardaba más que orjson
+_DIGITOS_A_CERO = bytes.maketrans(b"123456789", b"000000000")
+
+# orjson convierte a float los enteros fuera de int64/uint64 (desde
+# -9223372036854775809, de 19 dígitos, o desde 18446744073709551616); json los
+# conserva exactos, así que los cuerpos con 19 dígitos seguidos los decodifica
+# DRF
+_BIG_INT = b"0" * 19
+
+# Floats que orjson escribe distinto que json (repr): 1e16 y 1e-7 contra
+# 1e+16 y 1e-07, y de 1e-5 a 1e-4 sin exponente (0.00003 contra 3e-05).
+# Con los dígitos vueltos "0" y el signo y lo que puede ir antes de un número
+# (: , [ y las comillas de una llave) vueltos ":", quedan como 0e0, 0e:0 o
+# :0.0000. Si la salida trae una de esas formas (también dentro de un texto,
+# p. ej. un hash) se usa el render de DRF. Las horas (12:04.5) no coinciden:
+# sus segundos llevan dos dígitos
+_NUMEROS_A_CERO = bytes.maketrans(b'123456789-,["', b"000000000::::")
+_FORMAS_DISTINTAS = (b"0e0", b"0e:0", b":0.0000")
+
+# U+2028 y U+2029 en UTF-8; DRF siempre los escapa
+_LINE_SEPARATOR = b"\xe2\x80\xa8"
+_PARAGRAPH_SEPARATOR = b"\xe2\x80\xa9"
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer que codifica con orjson y produce los mismos bytes que el de
+    DRF: salida compacta en UTF-8, fechas y horas en ISO 8601 y el resto de
+    tipos (Decimal como float, UUID, lazy strings, ...) con el JSONEncoder de
+    DRF. Usa el render de DRF si orjson no está instalado, si se pide
+    indentación, si orjson no puede con el dato (p. ej. enteros de más de
+    64 bits) o si la salida trae floats que json escribiría distinto.
+
+    Única diferencia: NaN e infinito salen como null, donde DRF lanza
+    ValueError (error 500). Detectarlos exige recorrer todo el dato en Python,
+    que cuesta más de lo que ahorra orjson; ningún campo de la API los produce.
+    """
+
+    _default = JSONEncoder().default
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None
+            or data is None
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=self._default, option=ORJSON_OPTIONS)
+        except TypeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        numeros = ret.translate(_NUMEROS_A_CERO)
+        if any(forma in numeros for forma in _FORMAS_DISTINTAS):
+            return super().render(data, accepted_media_type, renderer_context)
+        if b"\xe2\x80" in ret:
+            ret = ret.replace(_LINE_SEPARATOR, b"\\u2028").replace(
+                _PARAGRAPH_SEPARATOR, b"\\u2029"
+            )
+        return ret
+
+
+class FastJSONParser(JSONParser):
+    """
+    JSONParser que decodifica con orjson. Si orjson rechaza el cuerpo (JSON
+    inválido, NaN) o este trae enteros enormes, lo decodifica el parser de
+    DRF, que acepta lo mismo que antes y da el mismo mensaje de error.
+    """
+
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+
+        encoding = (parser_context or {}).get("encoding", "utf-8")
+        raw = stream.read()
+        try:
+            body = raw
+            if encoding.lower().replace("_", "-") not in ("utf-8", "utf8"):
+                body = raw.decode(encoding).encode()
+            if _BIG_INT not in body.translate(_DIGITOS_A_CERO):
+                return orjson.loads(body)
+        except (orjson.JSONDecodeError, UnicodeError, LookupError):
+            pass
+        return super().parse(io.BytesIO(raw), media_type, parser_context)
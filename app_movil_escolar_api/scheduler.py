@@ -0,0 +1,256 @@
+import logging
+import os
+import random
+import signal
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import close_old_connections
+
+from .metrics import registry
+
+logger = logging.getLogger(__name__)
+
+# Buckets (segundos) para la duración de un trabajo
+JOB_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+# Trabajos registrados: nombre -> Trabajo, en orden de registro
+_trabajos = {}
+
+
+class Trabajo:
+    """
+    Un trabajo periódico. Cada SCHEDULER_JOBS[nombre] segundos (0 = apagado),
+    con ±SCHEDULER_JITTER de variación para que las instancias no coincidan.
+    Con `usa_cache` solo tiene sentido si el caché es compartido: con el
+    LocMem de cada proceso se omite fuera de los workers web.
+    """
+
+    def __init__(self, nombre, funcion, usa_cache=False):
+        self.nombre = nombre
+        self.funcion = funcion
+        self.usa_cache = usa_cache
+        self.siguiente = None
+
+    @property
+    def intervalo(self):
+        return settings.SCHEDULER_JOBS.get(self.nombre, 0)
+
+    def programar(self, ahora, primera=False):
+        # La primera vez en algún punto del primer intervalo (no todas las
+        # instancias al arrancar); después cada intervalo ± jitter
+        jitter = settings.SCHEDULER_JITTER
+        if primera:
+            espera = self.intervalo * random.uniform(0, max(jitter, 0.0))
+        else:
+            espera = self.intervalo * random.uniform(1 - jitter, 1 + jitter)
+        self.siguiente = ahora + espera
+
+
+def trabajo(nombre, usa_cache=False):
+    """
+    Decorador para registrar un trabajo periódico
+    """
+
+    def decorator(func):
+        _trabajos[nombre] = Trabajo(nombre, func, usa_cache)
+        return func
+
+    return decorator
+
+
+def trabajos():
+    return dict(_trabajos)
+
+
+def _candado(nombre):
+    return f"scheduler:{nombre}"
+
+
+def ejecutar(t, en_proceso=False):
+    """
+    Corre un trabajo si nadie más lo corrió en este intervalo. El candado en
+    SCHEDULER_LOCK_CACHE se toma con add() y dura el intervalo mínimo (no se
+    suelta al terminar): otra instancia que lo intente antes lo encuentra y
+    lo salta. Si el trabajo falla se suelta para reintentarlo en la
+    siguiente vuelta. Regresa "ok", "error", "locked" o "skipped".
+    """
+    if t.usa_cache and not en_proceso and _cache_local():
+        resultado = "skipped"
+        registry.inc("scheduler_job_runs_total", {"job": t.nombre, "result": resultado})
+        return resultado
+
+    cache = caches[settings.SCHEDULER_LOCK_CACHE]
+    dueno = uuid.uuid4().hex
+    duracion = max(1, int(t.intervalo * (1 - settings.SCHEDULER_JITTER)))
+    if not cache.add(_candado(t.nombre), dueno, duracion):
+        resultado = "locked"
+        registry.inc("scheduler_job_runs_total", {"job": t.nombre, "result": resultado})
+        return resultado
+
+    inicio = time.perf_counter()
+    close_old_connections()
+    try:
+        t.funcion()
+        resultado = "ok"
+    except Exception:
+        logger.exception("Trabajo '%s' falló", t.nombre)
+        resultado = "error"
+        # No es atómico: si el candado ya venció y otro lo tomó, se borra el
+        # suyo (a lo más corre una vez de más)
+        if cache.get(_candado(t.nombre)) == dueno:
+            cache.delete(_candado(t.nombre))
+    finally:
+        close_old_connections()
+    segundos = time.perf_counter() - inicio
+
+    registry.inc("scheduler_job_runs_total", {"job": t.nombre, "result": resultado})
+    registry.observe(
+        "scheduler_job_seconds", {"job": t.nombre}, segundos, buckets=JOB_BUCKETS
+    )
+    if resultado == "ok":
+        registry.set(
+            "scheduler_job_last_success_timestamp", {"job": t.nombre}, time.time()
+        )
+    if segundos > duracion:
+        logger.warning(
+            "Trabajo '%s' tardó %.1f s, más que su candado (%s s)",
+            t.nombre,
+            segundos,
+            duracion,
+        )
+    return resultado
+
+
+def _cache_local():
+    return isinstance(caches[settings.CACHE_HELPER_ALIAS], LocMemCache)
+
+
+class Scheduler:
+    """
+    Corre los trabajos activos (intervalo > 0) cuando les toca, uno a la vez,
+    hasta que se llama detener()
+    """
+
+    def __init__(self, nombres=None, en_proceso=False):
+        self.trabajos = [
+            t
+            for nombre, t in _trabajos.items()
+            if t.intervalo > 0 and (nombres is None or nombre in nombres)
+        ]
+        self.en_proceso = en_proceso
+        self._alto = threading.Event()
+
+    def detener(self, *args):
+        self._alto.set()
+
+    def correr(self):
+        ahora = time.monotonic()
+        for t in self.trabajos:
+            t.programar(ahora, primera=True)
+        while self.trabajos and not self._alto.is_set():
+            t = min(self.trabajos, key=lambda t: t.siguiente)
+            espera = t.siguiente - time.monotonic()
+            if espera > 0:
+                self._alto.wait(espera)
+                continue
+            ejecutar(t, self.en_proceso)
+            t.programar(time.monotonic())
+
+
+_hilo = None
+_hilo_pid = None
+_hilo_lock = threading.Lock()
+
+
+def iniciar_en_hilo():
+    """
+    Arranca el scheduler en un hilo del proceso (SCHEDULER_IN_PROCESS). Cada
+    worker corre el suyo; el candado evita que un trabajo se repita entre
+    workers si el caché es compartido. wsgi.py lo llama en cada petición y
+    solo la primera de cada proceso lo arranca: con gunicorn --preload la
+    app se carga en el master, que no atiende peticiones, y un hilo no
+    sobrevive al fork.
+    """
+    global _hilo, _hilo_pid
+    if _hilo_pid == os.getpid():
+        return
+    with _hilo_lock:
+        if _hilo_pid == os.getpid():
+            return
+        scheduler = Scheduler(en_proceso=True)
+        _hilo = threading.Thread(target=scheduler.correr, name="scheduler", daemon=True)
+        _hilo.start()
+        _hilo_pid = os.getpid()
+
+
+def instalar_senales(scheduler):
+    # SIGTERM/SIGINT terminan el trabajo en curso y salen
+    signal.signal(signal.SIGTERM, scheduler.detener)
+    signal.signal(signal.SIGINT, scheduler.detener)
+
+
+# ---------------------------------------------------------------------------
+# Trabajos
+# ---------------------------------------------------------------------------
+
+
+@trabajo("expirar_tokens")
+def expirar_tokens():
+    """
+    Borra los tokens con más de TOKEN_MAX_AGE_DAYS días (0 = no expiran)
+    """
+    from datetime import timedelta
+
+    from django.utils import timezone
+    from rest_framework.authtoken.models import Token
+
+    if settings.TOKEN_MAX_AGE_DAYS <= 0:
+        return
+    limite = timezone.now() - timedelta(days=settings.TOKEN_MAX_AGE_DAYS)
+    borrados, _ = Token.objects.filter(created__lt=limite).delete()
+    if borrados:
+        logger.info("%s tokens expirados", borrados)
+
+
+@trabajo("estadisticas", usa_cache=True)
+def recalcular_estadisticas():
+    # Los conteos de total-usuarios listos en caché antes de que alguien los
+    # pida
+    from .caching import refrescar
+    from .views.users import TotalUsers
+
+    refrescar(
+        "estadisticas", "totales", TotalUsers.conteos, settings.ESTADISTICAS_CACHE_TTL
+    )
+
+
+@trabajo("calentar_eventos", usa_cache=True)
+def calentar_eventos():
+    # Listas de eventos sin parámetros (las que pide la app al abrir), por
+    # rol, recalculadas antes de que venzan
+    from .views.eventos import calentar_listas
+
+    calentar_listas()
+
+
+@trabajo("compactar_sync")
+def compactar_sync():
+    from .sync import compactar
+
+    borradas = compactar()
+    if borradas:
+        logger.info("%s filas de la bitácora compactadas", borradas)
+
+
+@trabajo("limpiar_archivos")
+def limpiar_archivos():
+    from .uploads import limpiar_huerfanos
+
+    borrados = limpiar_huerfanos()
+    if borrados:
+        logger.info("%s imágenes huérfanas borradas", borrados)
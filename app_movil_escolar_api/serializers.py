@@ -1,11 +1,59 @@
+from django.conf import settings
 from django.contrib.auth.models import User
+from django.utils import timezone
 from rest_framework import serializers
-from .models import *
+from .instrumentation import measure
+from .models import DURACION, Administradores, Alumnos, Maestros, EventoAcademico
 from datetime import date
 import json
+from operator import itemgetter
 
 
-class UserSerializer(serializers.ModelSerializer):
+class TimedListSerializer(serializers.ListSerializer):
+    """
+    ListSerializer que reporta el tiempo de serialización (sección "ser" de Server-Timing)
+    """
+
+    @property
+    def data(self):
+        with measure("ser"):
+            return super().data
+
+
+class TimedSerializerMixin:
+    """
+    Mide el tiempo que tarda `.data` y hace que many=True use TimedListSerializer.
+    Los serializers anidados no pasan por `.data`, así que no se cuentan dos veces.
+    """
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        meta = cls.__dict__.get("Meta")
+        if meta is not None and not hasattr(meta, "list_serializer_class"):
+            meta.list_serializer_class = TimedListSerializer
+
+    @property
+    def data(self):
+        with measure("ser"):
+            return super().data
+
+
+class SparseFieldsMixin:
+    """
+    Acepta `fields=` con las llaves de primer nivel a incluir (la selección de
+    ValuesSerializer.select() para ?fields= y ?expand=) y quita los demás
+    campos de lectura, así no se serializan los anidados que no se pidieron
+    """
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in list(self.fields):
+                if name not in fields and not self.fields[name].write_only:
+                    self.fields.pop(name)
+
+
+class UserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     id = serializers.IntegerField(read_only=True)
     first_name = serializers.CharField(required=True)
     last_name = serializers.CharField(required=True)
@@ -16,7 +64,9 @@ class UserSerializer(serializers.ModelSerializer):
         fields = ("id", "first_name", "last_name", "email")
 
 
-class AdminSerializer(serializers.ModelSerializer):
+class AdminSerializer(
+    SparseFieldsMixin, TimedSerializerMixin, serializers.ModelSerializer
+):
     user = UserSerializer(read_only=True)
 
     class Meta:
@@ -24,7 +74,9 @@ class AdminSerializer(serializers.ModelSerializer):
         fields = "__all__"
 
 
-class AlumnoSerializer(serializers.ModelSerializer):
+class AlumnoSerializer(
+    SparseFieldsMixin, TimedSerializerMixin, serializers.ModelSerializer
+):
     user = UserSerializer(read_only=True)
 
     class Meta:
@@ -32,7 +84,9 @@ class AlumnoSerializer(serializers.ModelSerializer):
         fields = "__all__"
 
 
-class MaestroSerializer(serializers.ModelSerializer):
+class MaestroSerializer(
+    SparseFieldsMixin, TimedSerializerMixin, serializers.ModelSerializer
+):
     user = UserSerializer(read_only=True)
 
     class Meta:
@@ -40,7 +94,7 @@ class MaestroSerializer(serializers.ModelSerializer):
         fields = "__all__"
 
 
-class ResponsableSerializer(serializers.ModelSerializer):
+class ResponsableSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     Serializer para mostrar información básica del responsable
     """
@@ -55,7 +109,9 @@ class ResponsableSerializer(serializers.ModelSerializer):
         return f"{obj.first_name} {obj.last_name}"
 
 
-class EventoAcademicoSerializer(serializers.ModelSerializer):
+class EventoAcademicoSerializer(
+    SparseFieldsMixin, TimedSerializerMixin, serializers.ModelSerializer
+):
     """
     Serializer para eventos académicos
     """
@@ -64,6 +120,7 @@ class EventoAcademicoSerializer(serializers.ModelSerializer):
     responsable_evento_id = serializers.PrimaryKeyRelatedField(
         queryset=User.objects.all(), source="responsable_evento", write_only=True
     )
+    duracion_horas = serializers.FloatField(read_only=True)
 
     class Meta:
         model = EventoAcademico
@@ -74,6 +131,7 @@ class EventoAcademicoSerializer(serializers.ModelSerializer):
             "fecha_realizacion",
             "hora_inicio",
             "hora_fin",
+            "duracion_horas",
             "lugar",
             "publico_objetivo",
             "programa_educativo",
@@ -221,7 +279,7 @@ class EventoAcademicoSerializer(serializers.ModelSerializer):
         representation = super().to_representation(instance)
 
         # Asegurar que publico_objetivo sea una lista (no string JSON)
-        if isinstance(representation["publico_objetivo"], str):
+        if isinstance(representation.get("publico_objetivo"), str):
             try:
                 representation["publico_objetivo"] = json.loads(
                     representation["publico_objetivo"]
@@ -230,7 +288,7 @@ class EventoAcademicoSerializer(serializers.ModelSerializer):
                 representation["publico_objetivo"] = []
 
         # Formatear la fecha en formato DD/MM/YYYY
-        if representation["fecha_realizacion"]:
+        if representation.get("fecha_realizacion"):
             fecha_obj = (
                 instance.fecha_realizacion
                 if hasattr(instance, "fecha_realizacion")
@@ -240,3 +298,327 @@ class EventoAcademicoSerializer(serializers.ModelSerializer):
                 representation["fecha_realizacion"] = fecha_obj.strftime("%d/%m/%Y")
 
         return representation
+
+
+# ---------------------------------------------------------------------------
+# Ruta rápida de solo lectura para las listas
+# ---------------------------------------------------------------------------
+
+
+def _datetime(tz):
+    """
+    Igual que serializers.DateTimeField en ISO 8601: convierte a la zona
+    actual y usa "Z" para UTC. La zona se resuelve una vez por lista, no por fila.
+    """
+
+    def convert(value):
+        if tz is not None and timezone.is_aware(value):
+            value = value.astimezone(tz)
+        value = value.isoformat()
+        if value.endswith("+00:00"):
+            value = value[:-6] + "Z"
+        return value
+
+    return convert
+
+
+def _isoformat(value):
+    return value.isoformat()
+
+
+def _horas(value):
+    # Igual que EventoAcademico.duracion_horas
+    return value.total_seconds() / 3600
+
+
+def _none(row):
+    return None
+
+
+def _is_nested(source):
+    return isinstance(source, type) and issubclass(source, ValuesSerializer)
+
+
+def _split_param(request, name):
+    # Vacío (?fields=) cuenta como no mandado: todos los campos, no ninguno
+    value = request.query_params.get(name)
+    if value is None:
+        return None
+    return [v.strip() for v in value.split(",") if v.strip()] or None
+
+
+def _getter(index, convert):
+    if convert is None:
+        return itemgetter(index)
+
+    def get(row):
+        value = row[index]
+        return None if value is None else convert(value)
+
+    return get
+
+
+class ValuesSerializer:
+    """
+    Serializer de solo lectura para listas grandes. En lugar de instanciar
+    modelos y campos de DRF por fila, lee tuplas con values_list() y arma
+    cada dict con conversiones precalculadas. La salida debe ser idéntica
+    (mismas llaves, orden y formato) a la del ModelSerializer equivalente.
+
+    `fields` es una lista de (llave, origen) donde origen puede ser:
+    - "campo" o ("campo", conversión): columna leída con values_list();
+      la conversión "datetime" equivale a serializers.DateTimeField
+    - otra subclase de ValuesSerializer: objeto anidado por la FK `llave`
+    - una función que recibe el dict ya armado (campos calculados)
+
+    `selected` (ver select()) limita la salida y las columnas leídas a
+    algunas llaves de primer nivel.
+
+    `annotations` son columnas que calcula la base: nombre -> (expresión,
+    campos del modelo que usa). Se anotan solo si la selección las incluye.
+    """
+
+    fields = ()
+    annotations = {}
+
+    def __init__(self, queryset, selected=None):
+        self.queryset = queryset
+        self.selected = selected
+
+    @classmethod
+    def select(cls, fields=None, expand=None):
+        """
+        Llaves de primer nivel a incluir para ?fields= y ?expand=.
+        Sin ninguno de los dos regresa None (todo, como siempre). Con alguno,
+        los campos simples son los de `fields` (o todos si no viene) y los
+        objetos anidados solo se incluyen si se piden en `expand` o en `fields`.
+        """
+        if fields is None and expand is None:
+            return None
+        nested = {key for key, source in cls.fields if _is_nested(source)}
+        validos = [key for key, _ in cls.fields]
+        desconocidos = [f for f in (fields or []) if f not in validos]
+        desconocidos += [e for e in (expand or []) if e not in nested]
+        if desconocidos:
+            raise serializers.ValidationError(
+                {
+                    "fields": f"Campos desconocidos: {', '.join(desconocidos)}. "
+                    f"Campos: {', '.join(validos)}; expandibles: {', '.join(sorted(nested))}"
+                }
+            )
+        pedidos = set(fields or ()) | set(expand or ())
+        return tuple(
+            key
+            for key in validos
+            if key in pedidos or (fields is None and key not in nested)
+        )
+
+    @classmethod
+    def select_from(cls, request):
+        """
+        select() con los parámetros ?fields=a,b y ?expand=c de la petición
+        """
+        return cls.select(
+            _split_param(request, "fields"), _split_param(request, "expand")
+        )
+
+    @classmethod
+    def narrow(cls, queryset, selected=None):
+        """
+        Para los detalles con ModelSerializer: select_related() solo de los
+        anidados incluidos y only() con las columnas de la selección
+        """
+        relations = [
+            key
+            for key, source in cls.fields
+            if _is_nested(source) and (selected is None or key in selected)
+        ]
+        if relations:
+            queryset = queryset.select_related(*relations)
+        if selected is None:
+            return queryset
+        columns = []
+        for column in cls.plan(selected)[0]:
+            if column in cls.annotations:
+                # El ModelSerializer la calcula con los campos de los que sale
+                columns.extend(cls.annotations[column][1])
+            else:
+                columns.append(column)
+        return queryset.only(*columns)
+
+    @classmethod
+    def _compile(cls, prefix, columns, tz, selected=None):
+        """
+        Regresa una función fila -> dict. Cada campo queda como un getter
+        precalculado (itemgetter si no hay conversión) y el dict se arma de
+        una vez con zip() para conservar el orden de `fields`.
+        """
+        keys = []
+        getters = []
+        computed = []
+        for key, source in cls.fields:
+            if selected is not None and key not in selected:
+                continue
+            keys.append(key)
+            if _is_nested(source):
+                getters.append(source._compile(f"{prefix}{key}__", columns, tz))
+            elif callable(source):
+                # Se llena cuando el resto del dict ya existe
+                getters.append(_none)
+                computed.append((key, source))
+            else:
+                lookup, convert = (
+                    source if isinstance(source, tuple) else (source, None)
+                )
+                if convert == "datetime":
+                    convert = _datetime(tz)
+                columns.append(prefix + lookup)
+                getters.append(_getter(len(columns) - 1, convert))
+
+        def build(row):
+            obj = dict(zip(keys, [get(row) for get in getters]))
+            for key, source in computed:
+                obj[key] = source(obj)
+            return obj
+
+        return build
+
+    @classmethod
+    def plan(cls, selected=None):
+        # Se compila una sola vez por clase, zona horaria y selección de campos
+        tz = timezone.get_current_timezone() if settings.USE_TZ else None
+        plans = cls.__dict__.get("_plans")
+        if plans is None:
+            plans = cls._plans = {}
+        plan = plans.get((tz, selected))
+        if plan is None:
+            columns = []
+            build = cls._compile("", columns, tz, selected)
+            plan = plans[(tz, selected)] = (columns, build)
+        return plan
+
+    def to_representation_list(self):
+        columns, build = self.plan(self.selected)
+        queryset = self.queryset
+        anotar = {
+            name: expression
+            for name, (expression, _) in self.annotations.items()
+            if name in columns
+        }
+        if anotar:
+            queryset = queryset.annotate(**anotar)
+        return [build(row) for row in queryset.values_list(*columns)]
+
+    @property
+    def data(self):
+        with measure("ser"):
+            return self.to_representation_list()
+
+
+class UserValuesSerializer(ValuesSerializer):
+    fields = (
+        ("id", "id"),
+        ("first_name", "first_name"),
+        ("last_name", "last_name"),
+        ("email", "email"),
+    )
+
+
+class AdminValuesSerializer(ValuesSerializer):
+    """
+    Equivalente de solo lectura de AdminSerializer(many=True)
+    """
+
+    fields = (
+        ("id", "id"),
+        ("user", UserValuesSerializer),
+        ("clave_admin", "clave_admin"),
+        ("telefono", "telefono"),
+        ("rfc", "rfc"),
+        ("edad", "edad"),
+        ("ocupacion", "ocupacion"),
+        ("creation", ("creation", "datetime")),
+        ("update", ("update", "datetime")),
+    )
+
+
+class AlumnoValuesSerializer(ValuesSerializer):
+    """
+    Equivalente de solo lectura de AlumnoSerializer(many=True)
+    """
+
+    fields = (
+        ("id", "id"),
+        ("user", UserValuesSerializer),
+        ("matricula", "matricula"),
+        ("curp", "curp"),
+        ("rfc", "rfc"),
+        ("fecha_nacimiento", ("fecha_nacimiento", "datetime")),
+        ("edad", "edad"),
+        ("telefono", "telefono"),
+        ("ocupacion", "ocupacion"),
+        ("creation", ("creation", "datetime")),
+        ("update", ("update", "datetime")),
+    )
+
+
+class MaestroValuesSerializer(ValuesSerializer):
+    """
+    Equivalente de solo lectura de MaestroSerializer(many=True)
+    """
+
+    fields = (
+        ("id", "id"),
+        ("user", UserValuesSerializer),
+        ("id_trabajador", "id_trabajador"),
+        ("fecha_nacimiento", ("fecha_nacimiento", "datetime")),
+        ("telefono", "telefono"),
+        ("rfc", "rfc"),
+        ("cubiculo", "cubiculo"),
+        ("edad", "edad"),
+        ("area_investigacion", "area_investigacion"),
+        ("materias_json", "materias_json"),
+        ("creation", ("creation", "datetime")),
+        ("update", ("update", "datetime")),
+    )
+
+
+class ResponsableValuesSerializer(ValuesSerializer):
+    fields = UserValuesSerializer.fields + (
+        ("nombre_completo", lambda obj: f"{obj['first_name']} {obj['last_name']}"),
+    )
+
+
+def _publico_objetivo(value):
+    # Igual que EventoAcademicoSerializer.to_representation
+    if isinstance(value, str):
+        try:
+            return json.loads(value)
+        except json.JSONDecodeError:
+            return []
+    return value
+
+
+class EventoAcademicoValuesSerializer(ValuesSerializer):
+    """
+    Equivalente de solo lectura de EventoAcademicoSerializer(many=True)
+    """
+
+    fields = (
+        ("id", "id"),
+        ("nombre_evento", "nombre_evento"),
+        ("tipo_evento", "tipo_evento"),
+        ("fecha_realizacion", ("fecha_realizacion", lambda d: d.strftime("%d/%m/%Y"))),
+        ("hora_inicio", ("hora_inicio", _isoformat)),
+        ("hora_fin", ("hora_fin", _isoformat)),
+        ("duracion_horas", ("duracion", _horas)),
+        ("lugar", "lugar"),
+        ("publico_objetivo", ("publico_objetivo", _publico_objetivo)),
+        ("programa_educativo", "programa_educativo"),
+        ("responsable_evento", ResponsableValuesSerializer),
+        ("descripcion_breve", "descripcion_breve"),
+        ("cupo_maximo", "cupo_maximo"),
+        ("created_at", ("created_at", "datetime")),
+        ("updated_at", ("updated_at", "datetime")),
+    )
+    annotations = {"duracion": (DURACION, ("inicio", "fin"))}
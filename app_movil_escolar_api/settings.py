@@ -1,6 +1,7 @@
 import os
 from pathlib import Path
 import dj_database_url
+from django.core.exceptions import ImproperlyConfigured
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -35,12 +36,25 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Primero para medir la petición completa (ver PERF_SAMPLE_RATE)
+    "app_movil_escolar_api.instrumentation.ServerTimingMiddleware",
+    "app_movil_escolar_api.metrics.MetricsMiddleware",
+    "app_movil_escolar_api.query_inspector.QueryInspectorMiddleware",
+    # Elige réplica o primaria antes de cualquier consulta de la petición
+    "app_movil_escolar_api.db_router.ReplicaMiddleware",
+    # Comprime el cuerpo ya terminado; dentro de los de medición para contar su costo
+    "app_movil_escolar_api.compression.CompressionMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.common.CommonMiddleware",
+    # Antes de idempotencia: un 429 no se guarda como respuesta de la clave
+    "app_movil_escolar_api.ratelimit.RateLimitMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    # Dentro de CORS y compresión: una respuesta repetida sale con sus
+    # headers. Después de la autenticación: la clave se separa por usuario
+    "app_movil_escolar_api.idempotency.IdempotencyMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -50,6 +64,16 @@ CORS_ALLOWED_ORIGINS = ["http://localhost:4200", os.environ.get("FRONTEND_URL",
 
 CORS_ALLOW_CREDENTIALS = True
 
+# El frontend web puede leer los tiempos de cada petición
+CORS_EXPOSE_HEADERS = [
+    "Server-Timing",
+    "RateLimit-Limit",
+    "RateLimit-Remaining",
+    "RateLimit-Reset",
+    "Retry-After",
+    "X-Next-Cursor",
+]
+
 ROOT_URLCONF = "app_movil_escolar_api.urls"
 
 TEMPLATES = [
@@ -75,9 +99,257 @@ WSGI_APPLICATION = "app_movil_escolar_api.wsgi.application"
 # ------------------------------
 DATABASES = {
     "default": dj_database_url.config(
-        default=os.environ.get("DATABASE_URL"), conn_max_age=600, ssl_require=True
+        default=os.environ.get("DATABASE_URL"),
+        conn_max_age=600,
+        # Prueba la conexión persistente antes de reutilizarla tras un error
+        # o al empezar cada petición (evita el fallo tras un rato inactiva)
+        conn_health_checks=True,
+        # Permite apuntar a una base local (sqlite/postgres sin TLS) para benchmarks
+        ssl_require=os.environ.get("DATABASE_SSL_REQUIRE", "True") == "True",
+    )
+}
+
+# Réplicas de lectura (URLs separadas por coma, p. ej. Cloud SQL read replicas).
+# Los GET leen de ellas y todo lo demás va a "default"; ver db_router.py
+DATABASE_REPLICA_URLS = [
+    url.strip()
+    for url in os.environ.get("DATABASE_REPLICA_URLS", "").split(",")
+    if url.strip()
+]
+for numero, url in enumerate(DATABASE_REPLICA_URLS, 1):
+    DATABASES[f"replica{numero}"] = dj_database_url.parse(
+        url,
+        conn_max_age=600,
+        conn_health_checks=True,
+        ssl_require=os.environ.get("DATABASE_SSL_REQUIRE", "True") == "True",
     )
+    # En pruebas la réplica es la misma base que default
+    DATABASES[f"replica{numero}"]["TEST"] = {"MIRROR": "default"}
+
+DATABASE_ROUTERS = ["app_movil_escolar_api.db_router.ReplicaRouter"]
+
+# Pool de conexiones por proceso (opcional). 0 = conexiones persistentes de
+# CONN_MAX_AGE, una por hilo. Con pool cada worker abre a lo más
+# DATABASE_POOL_SIZE conexiones por base y las comparte entre sus hilos.
+DATABASE_POOL_SIZE = int(os.environ.get("DATABASE_POOL_SIZE", "0"))
+# Segundos que una petición espera una conexión libre antes de fallar
+DATABASE_POOL_TIMEOUT = float(os.environ.get("DATABASE_POOL_TIMEOUT", "10"))
+# Inactiva más de estos segundos: SELECT 1 antes de reutilizarla (0 = siempre)
+DATABASE_POOL_CHECK_AFTER = float(os.environ.get("DATABASE_POOL_CHECK_AFTER", "30"))
+# Se cierran las libres sin uso por más de MAX_IDLE y todas tras MAX_LIFETIME
+DATABASE_POOL_MAX_IDLE = float(os.environ.get("DATABASE_POOL_MAX_IDLE", "300"))
+DATABASE_POOL_MAX_LIFETIME = float(os.environ.get("DATABASE_POOL_MAX_LIFETIME", "1800"))
+POOL_ENGINES = {
+    "django.db.backends.postgresql": "app_movil_escolar_api.db_pool.postgresql",
+    "django.db.backends.mysql": "app_movil_escolar_api.db_pool.mysql",
+    "django.db.backends.sqlite3": "app_movil_escolar_api.db_pool.sqlite3",
+}
+if DATABASE_POOL_SIZE:
+    for base in DATABASES.values():
+        base["ENGINE"] = POOL_ENGINES.get(base["ENGINE"], base["ENGINE"])
+        # Django suelta la conexión al terminar cada petición: vuelve al pool
+        base["CONN_MAX_AGE"] = 0
+
+# Segundos que un cliente lee de la primaria después de escribir: debe cubrir
+# el retraso de replicación
+REPLICA_STICKY_SECONDS = int(os.environ.get("REPLICA_STICKY_SECONDS", "5"))
+# Caché donde se marcan los clientes que escribieron (compartido = entre workers)
+REPLICA_STICKY_CACHE = os.environ.get("REPLICA_STICKY_CACHE", "default")
+
+# ------------------------------
+#     INSTRUMENTACIÓN / LOGS
+# ------------------------------
+# Fracción de peticiones que se miden (consultas, tiempo en DB, serializers y vista).
+# 1.0 mide todas; 0 lo desactiva.
+PERF_SAMPLE_RATE = float(os.environ.get("PERF_SAMPLE_RATE", "1.0" if DEBUG else "0.1"))
+
+# Métricas Prometheus (GET /metrics/). Con varios workers de gunicorn apunta
+# METRICS_MULTIPROC_DIR a un directorio compartido y vacío al arrancar.
+METRICS_MULTIPROC_DIR = os.environ.get("METRICS_MULTIPROC_DIR", "")
+METRICS_FLUSH_INTERVAL = float(os.environ.get("METRICS_FLUSH_INTERVAL", "1.0"))
+# Requerido para /metrics/ fuera de DEBUG (sin él responde 403)
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+
+# Detector de N+1 y consultas lentas (desarrollo / staging)
+QUERY_INSPECTOR_ENABLED = (
+    os.environ.get("QUERY_INSPECTOR_ENABLED", "True" if DEBUG else "False") == "True"
+)
+# Misma forma de consulta repetida este número de veces en una petición = N+1
+QUERY_INSPECTOR_REPEAT = int(os.environ.get("QUERY_INSPECTOR_REPEAT", "5"))
+QUERY_INSPECTOR_SLOW_MS = float(os.environ.get("QUERY_INSPECTOR_SLOW_MS", "100"))
+# Lanza QueryProblemsError en lugar de solo registrar (útil en pruebas/CI)
+QUERY_INSPECTOR_RAISE = os.environ.get("QUERY_INSPECTOR_RAISE", "False") == "True"
+
+# ------------------------------
+#     COMPRESIÓN
+# ------------------------------
+# Codificaciones que se ofrecen (br y zstd solo si brotli/zstandard están instalados)
+COMPRESSION_ENCODINGS = os.environ.get("COMPRESSION_ENCODINGS", "br,zstd,gzip").split(
+    ","
+)
+# Por debajo de este tamaño no vale la pena (cabe en un paquete TCP)
+COMPRESSION_MIN_SIZE = int(os.environ.get("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_CONTENT_TYPES = [
+    "application/json",
+    "text/",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+]
+# Niveles pensados para respuestas dinámicas: buena razón con poco CPU
+COMPRESSION_GZIP_LEVEL = int(os.environ.get("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI_QUALITY = int(os.environ.get("COMPRESSION_BROTLI_QUALITY", "4"))
+COMPRESSION_ZSTD_LEVEL = int(os.environ.get("COMPRESSION_ZSTD_LEVEL", "3"))
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {
+        "simple": {"format": "%(asctime)s %(levelname)s %(name)s %(message)s"},
+    },
+    "handlers": {
+        "console": {"class": "logging.StreamHandler", "formatter": "simple"},
+    },
+    "loggers": {
+        "app_movil_escolar_api": {
+            "handlers": ["console"],
+            "level": os.environ.get("LOG_LEVEL", "INFO"),
+            "propagate": False,
+        },
+    },
+}
+
+# ------------------------------
+#        ARRANQUE / WARMUP
+# ------------------------------
+# Ejecuta los pasos de calentamiento al cargar la app WSGI (útil con gunicorn --preload)
+WARMUP_ON_START = os.environ.get("WARMUP_ON_START", "False") == "True"
+
+# ------------------------------
+# CACHÉ
+# ------------------------------
+# Sin CACHE_URL: memoria de cada proceso. Con redis://... o memcached://host:puerto
+# el caché es compartido por todos los workers e instancias (requiere el
+# paquete redis o pymemcache)
+CACHE_URL = os.environ.get("CACHE_URL", "")
+if CACHE_URL.startswith(("redis://", "rediss://")):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": CACHE_URL,
+        }
+    }
+elif CACHE_URL.startswith("memcached://"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.memcached.PyMemcacheCache",
+            "LOCATION": CACHE_URL.removeprefix("memcached://"),
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "OPTIONS": {"MAX_ENTRIES": 5000},
+        }
+    }
+
+# caching.get_or_compute(): alias, candado de recálculo y cuánto se sirve un
+# valor vencido mientras otro lo recalcula
+CACHE_HELPER_ENABLED = os.environ.get("CACHE_HELPER_ENABLED", "True") == "True"
+CACHE_HELPER_ALIAS = os.environ.get("CACHE_HELPER_ALIAS", "default")
+CACHE_LOCK_SECONDS = int(os.environ.get("CACHE_LOCK_SECONDS", "10"))
+CACHE_STALE_SECONDS = int(os.environ.get("CACHE_STALE_SECONDS", "60"))
+# Listas de eventos (lista-eventos y eventos-por-rol); se invalidan al
+# guardar un evento, el TTL acota el retraso de las réplicas
+EVENTOS_CACHE_TTL = int(os.environ.get("EVENTOS_CACHE_TTL", "30"))
+# Detalles por id (?id=) de admins, alumnos, maestros y eventos; se invalidan
+# por objeto al guardarlo o borrarlo
+DETALLE_CACHE_TTL = int(os.environ.get("DETALLE_CACHE_TTL", "300"))
+# Fracción de aciertos que se comparan contra la base (cache_verify_total)
+CACHE_VERIFY_RATE = float(os.environ.get("CACHE_VERIFY_RATE", "0"))
+# Conteos de total-usuarios; se invalidan al cambiar un perfil o usuario
+ESTADISTICAS_CACHE_TTL = int(os.environ.get("ESTADISTICAS_CACHE_TTL", "300"))
+
+# ------------------------------
+# IDEMPOTENCIA (header Idempotency-Key)
+# ------------------------------
+# POST que aceptan Idempotency-Key (la app los reintenta en redes inestables)
+IDEMPOTENCY_PATHS = ["/admin/", "/alumnos/", "/maestros/", "/eventos-academicos/"]
+# Alias de CACHES donde se guardan las respuestas: acotado y con expiración.
+# Con un caché compartido (Redis, Memcached) la clave vale entre workers
+IDEMPOTENCY_CACHE = os.environ.get("IDEMPOTENCY_CACHE", "default")
+IDEMPOTENCY_TTL = int(os.environ.get("IDEMPOTENCY_TTL", str(24 * 3600)))
+# Lo más que se reserva una clave mientras se ejecuta la primera petición
+IDEMPOTENCY_LOCK_SECONDS = int(os.environ.get("IDEMPOTENCY_LOCK_SECONDS", "60"))
+# Lo que espera un duplicado a que termine la original antes de responder 409
+IDEMPOTENCY_WAIT_SECONDS = float(os.environ.get("IDEMPOTENCY_WAIT_SECONDS", "10"))
+
+# ------------------------------
+# LÍMITE DE PETICIONES (login y registros)
+# ------------------------------
+RATELIMIT_ENABLED = os.environ.get("RATELIMIT_ENABLED", "True") == "True"
+# "memory": por proceso, sin red. "cache": compartido vía RATELIMIT_CACHE
+RATELIMIT_BACKEND = os.environ.get("RATELIMIT_BACKEND", "memory")
+RATELIMIT_CACHE = os.environ.get("RATELIMIT_CACHE", "default")
+# Buckets que guarda el backend en memoria antes de descartar los más viejos
+RATELIMIT_MAX_KEYS = int(os.environ.get("RATELIMIT_MAX_KEYS", "10000"))
+# Header con la IP real del cliente detrás del proxy (vacío: REMOTE_ADDR).
+# En App Engine: HTTP_X_APPENGINE_USER_IP
+RATELIMIT_IP_HEADER = os.environ.get("RATELIMIT_IP_HEADER", "")
+# POST limitados: campo del cuerpo que identifica la cuenta y, por IP y por
+# cuenta, (ráfaga, fichas que se recuperan por minuto)
+RATELIMIT_RULES = {
+    "/login/": {"field": "username", "ip": (20, 10), "account": (5, 2)},
+    "/admin/": {"field": "email", "ip": (10, 5), "account": (3, 1)},
+    "/alumnos/": {"field": "email", "ip": (10, 5), "account": (3, 1)},
+    "/maestros/": {"field": "email", "ip": (10, 5), "account": (3, 1)},
+}
+
+# ------------------------------
+# SINCRONIZACIÓN INCREMENTAL
+# ------------------------------
+# changes-since solo entrega cambios con al menos estos segundos de antigüedad,
+# para no adelantar el cursor sobre transacciones que aún no hacen commit. Una
+# transacción que tarda más de la mitad en hacer commit vuelve a anotar sus
+# cambios al terminar (sync_late_commits_total): debe ser mayor que la
+# transacción más larga que escribe perfiles o eventos
+SYNC_SAFETY_LAG_SECONDS = float(os.environ.get("SYNC_SAFETY_LAG_SECONDS", "5"))
+SYNC_PAGE_SIZE = int(os.environ.get("SYNC_PAGE_SIZE", "500"))
+SYNC_MAX_PAGE_SIZE = int(os.environ.get("SYNC_MAX_PAGE_SIZE", "2000"))
+
+# ------------------------------
+# LISTAS DE EVENTOS
+# ------------------------------
+# Máximo de ?limit= en lista-eventos y eventos-por-rol (páginas por cursor)
+EVENTOS_MAX_PAGE_SIZE = int(os.environ.get("EVENTOS_MAX_PAGE_SIZE", "500"))
+
+# ------------------------------
+# TRABAJOS PERIÓDICOS (scheduler.py)
+# ------------------------------
+# Segundos entre corridas de cada trabajo; 0 lo apaga
+SCHEDULER_JOBS = {
+    "expirar_tokens": 3600,
+    # Antes de que venzan ESTADISTICAS_CACHE_TTL y EVENTOS_CACHE_TTL
+    "estadisticas": 240,
+    "calentar_eventos": 25,
+    "compactar_sync": 86400,
+    # Fotos y banners de usuarios o eventos borrados
+    "limpiar_archivos": 3600,
 }
+# Variación aleatoria de cada intervalo (0.1 = ±10 %)
+SCHEDULER_JITTER = float(os.environ.get("SCHEDULER_JITTER", "0.1"))
+# Caché de los candados: compartido para que un trabajo corra en una sola
+# instancia
+SCHEDULER_LOCK_CACHE = os.environ.get("SCHEDULER_LOCK_CACHE", "default")
+# Corre el scheduler en un hilo de cada worker web (sin proceso aparte);
+# arranca con la primera petición de cada worker, compatible con --preload
+SCHEDULER_IN_PROCESS = os.environ.get("SCHEDULER_IN_PROCESS", "False") == "True"
+# Días de vida de un token de sesión (lo borra expirar_tokens); 0 = no expiran.
+# El login reutiliza el token del usuario, así que cuentan desde el primer
+# login y no desde el último: con un valor > 0 la app cierra la sesión de
+# todos aunque la usen a diario
+TOKEN_MAX_AGE_DAYS = int(os.environ.get("TOKEN_MAX_AGE_DAYS", "0"))
 
 # ------------------------------
 #         REST FRAMEWORK
@@ -91,6 +363,16 @@ REST_FRAMEWORK = {
         "app_movil_escolar_api.models.BearerTokenAuthentication",
     ),
     "DEFAULT_FILTER_BACKENDS": ("django_filters.rest_framework.DjangoFilterBackend",),
+    # JSON con orjson (mismos bytes que el JSONRenderer de DRF; sin orjson usa json)
+    "DEFAULT_RENDERER_CLASSES": (
+        "app_movil_escolar_api.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "app_movil_escolar_api.renderers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
 }
 
 # ------------------------------
@@ -100,6 +382,61 @@ STATIC_URL = "/static/"
 STATIC_ROOT = BASE_DIR / "staticfiles"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
+# media-stream/: segundos que el dispositivo puede guardar un archivo sin
+# revalidarlo y tamaño de cada lectura cuando el servidor no usa sendfile
+MEDIA_STREAM_MAX_AGE = int(os.environ.get("MEDIA_STREAM_MAX_AGE", "86400"))
+MEDIA_STREAM_CHUNK_SIZE = int(
+    os.environ.get("MEDIA_STREAM_CHUNK_SIZE", str(256 * 1024))
+)
+
+# ------------------------------
+# ARCHIVOS (fotos de perfil y banners)
+# ------------------------------
+# Dónde se guardan: "local" (MEDIA_ROOT) o "gcs" (bucket GCS_BUCKET)
+STORAGE_BACKEND = os.environ.get("STORAGE_BACKEND", "local")
+# En App Engine el disco es de solo lectura: las subidas fallarían
+if os.environ.get("GAE_ENV", "").startswith("standard") and STORAGE_BACKEND != "gcs":
+    raise ImproperlyConfigured(
+        "En App Engine MEDIA_ROOT no es escribible: usa STORAGE_BACKEND=gcs"
+    )
+GCS_BUCKET = os.environ.get("GCS_BUCKET", "")
+# Base de las URLs públicas (por defecto https://storage.googleapis.com/<bucket>)
+GCS_BASE_URL = os.environ.get("GCS_BASE_URL", "")
+# Servidor compatible con la API de GCS (p. ej. un emulador); vacío = Google
+GCS_ENDPOINT = os.environ.get("GCS_ENDPOINT", "")
+# Tamaño de cada parte al subir o leer (múltiplo de 256 KB)
+GCS_CHUNK_SIZE = int(os.environ.get("GCS_CHUNK_SIZE", str(8 * 1024 * 1024)))
+STORAGES = {
+    "default": {
+        "BACKEND": (
+            "app_movil_escolar_api.storage.GCSStorage"
+            if STORAGE_BACKEND == "gcs"
+            else "django.core.files.storage.FileSystemStorage"
+        ),
+    },
+    "staticfiles": {
+        "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage",
+    },
+}
+# Límites de una imagen subida
+UPLOAD_MAX_BYTES = int(os.environ.get("UPLOAD_MAX_BYTES", str(5 * 1024 * 1024)))
+UPLOAD_MAX_PIXELS = int(os.environ.get("UPLOAD_MAX_PIXELS", "40000000"))
+# Miniaturas: tamaño máximo (ancho, alto) e hilos del pool que las genera
+# (0 = en la misma petición, después del commit)
+THUMBNAIL_SIZE = (320, 320)
+THUMBNAIL_WORKERS = int(os.environ.get("THUMBNAIL_WORKERS", "2"))
+
+# ------------------------------
+# URLS REMOTAS (DataUtils.is_url_image)
+# ------------------------------
+# Segundos para conectar y para esperar la respuesta de cada URL
+URL_CHECK_CONNECT_TIMEOUT = float(os.environ.get("URL_CHECK_CONNECT_TIMEOUT", "3"))
+URL_CHECK_READ_TIMEOUT = float(os.environ.get("URL_CHECK_READ_TIMEOUT", "5"))
+# Resultados recordados (los menos usados salen primero) y por cuántos segundos
+URL_CHECK_CACHE_SIZE = int(os.environ.get("URL_CHECK_CACHE_SIZE", "1024"))
+URL_CHECK_CACHE_TTL = int(os.environ.get("URL_CHECK_CACHE_TTL", "600"))
+# Hilos para revisar varias URLs a la vez (y conexiones por host en la sesión)
+URL_CHECK_WORKERS = int(os.environ.get("URL_CHECK_WORKERS", "8"))
 
 # ------------------------------
 # TIME / LANGUAGE
@@ -0,0 +1,79 @@
+import mimetypes
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files import File
+from django.core.files.storage import Storage
+from django.utils.deconstruct import deconstructible
+
+
+@deconstructible
+class GCSStorage(Storage):
+    """
+    Storage de Django sobre un bucket de Google Cloud Storage (o compatible,
+    con GCS_ENDPOINT). Sube y lee por partes de GCS_CHUNK_SIZE bytes: el
+    archivo nunca está completo en memoria. Las URLs son
+    GCS_BASE_URL/<nombre>, así que el bucket (o la ruta) debe ser de
+    lectura pública o estar detrás de un CDN.
+    """
+
+    def __init__(self, bucket=None, base_url=None, chunk_size=None):
+        try:
+            from google.cloud import storage as gcs
+        except ImportError as e:
+            raise ImproperlyConfigured(
+                "STORAGE_BACKEND=gcs requiere google-cloud-storage"
+            ) from e
+        self.bucket_name = bucket or settings.GCS_BUCKET
+        if not self.bucket_name:
+            raise ImproperlyConfigured("STORAGE_BACKEND=gcs requiere GCS_BUCKET")
+        self.base_url = (
+            base_url
+            or settings.GCS_BASE_URL
+            or f"https://storage.googleapis.com/{self.bucket_name}"
+        ).rstrip("/")
+        self.chunk_size = chunk_size or settings.GCS_CHUNK_SIZE
+        opciones = {}
+        if settings.GCS_ENDPOINT:
+            opciones["client_options"] = {"api_endpoint": settings.GCS_ENDPOINT}
+        self._bucket = gcs.Client(**opciones).bucket(self.bucket_name)
+
+    def _blob(self, name):
+        # chunk_size (múltiplo de 256 KB) activa la subida resumable por partes
+        return self._bucket.blob(name, chunk_size=self.chunk_size)
+
+    def _open(self, name, mode="rb"):
+        if "w" in mode:
+            raise ValueError("GCSStorage solo abre archivos para lectura")
+        return File(self._blob(name).open("rb", chunk_size=self.chunk_size), name)
+
+    def _save(self, name, content):
+        content_type = (
+            getattr(content, "content_type", None)
+            or mimetypes.guess_type(name)[0]
+            or "application/octet-stream"
+        )
+        if hasattr(content, "seek"):
+            content.seek(0)
+        self._blob(name).upload_from_file(content, content_type=content_type)
+        return name
+
+    def delete(self, name):
+        from google.api_core.exceptions import NotFound
+
+        try:
+            self._blob(name).delete()
+        except NotFound:
+            pass
+
+    def exists(self, name):
+        return self._blob(name).exists()
+
+    def size(self, name):
+        blob = self._bucket.get_blob(name)
+        if blob is None:
+            raise FileNotFoundError(name)
+        return blob.size
+
+    def url(self, name):
+        return f"{self.base_url}/{name}"
@@ -0,0 +1,252 @@
+import logging
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.db.models import Exists, OuterRef, Q
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .metrics import registry
+from .models import Administradores, Alumnos, CambioSync, EventoAcademico, Maestros
+from .serializers import (
+    AdminValuesSerializer,
+    AlumnoValuesSerializer,
+    EventoAcademicoValuesSerializer,
+    MaestroValuesSerializer,
+)
+
+# Entidad -> (queryset visible, serializer). Mismos filtros que las listas:
+# lo que ya no aparece en la lista viaja como eliminado.
+ENTIDADES = {
+    "admins": (
+        lambda: Administradores.objects.filter(user__is_active=1),
+        AdminValuesSerializer,
+    ),
+    "alumnos": (
+        lambda: Alumnos.objects.filter(user__is_active=1),
+        AlumnoValuesSerializer,
+    ),
+    "maestros": (
+        lambda: Maestros.objects.filter(user__is_active=1),
+        MaestroValuesSerializer,
+    ),
+    "eventos": (lambda: EventoAcademico.objects.all(), EventoAcademicoValuesSerializer),
+}
+
+ENTIDAD_POR_MODELO = {
+    Administradores: "admins",
+    Alumnos: "alumnos",
+    Maestros: "maestros",
+    EventoAcademico: "eventos",
+}
+
+# Los serializers anidan datos del usuario (nombre, email) en perfiles y
+# eventos. Un cambio del usuario se anota una vez como entidad "usuarios" y
+# al leer se expande a lo que lo anida: entidad -> campo con el usuario
+USUARIOS = "usuarios"
+USUARIO_ANIDADO = {
+    "admins": "user",
+    "alumnos": "user",
+    "maestros": "user",
+    "eventos": "responsable_evento",
+}
+
+logger = logging.getLogger(__name__)
+
+# Filas por DELETE al compactar
+_LOTE_SQL = 500
+
+_lote = threading.local()
+
+
+def registrar(entidad, ids, eliminado=False):
+    """
+    Anota en la bitácora que los objetos `ids` de `entidad` cambiaron (o se
+    borraron): un INSERT por llamada. Dentro de cambios_en_lote() solo se
+    acumula.
+    """
+    pendientes = getattr(_lote, "pendientes", None)
+    if pendientes is not None:
+        for objeto_id in ids:
+            # Si el objeto ya estaba pendiente queda su último estado
+            pendientes[(entidad, objeto_id)] = eliminado
+        return
+    _guardar({(entidad, objeto_id): eliminado for objeto_id in ids})
+
+
+def _guardar(cambios):
+    CambioSync.objects.bulk_create(
+        [
+            CambioSync(entidad=entidad, objeto_id=objeto_id, eliminado=eliminado)
+            for (entidad, objeto_id), eliminado in cambios.items()
+        ],
+        batch_size=1000,
+    )
+    if connection.in_atomic_block:
+        inicio = time.monotonic()
+        transaction.on_commit(lambda: _revisar_commit(cambios, inicio))
+
+
+def _revisar_commit(cambios, inicio):
+    """
+    changes-since da por hecho que una fila hace commit a menos de
+    SYNC_SAFETY_LAG_SECONDS de insertarse. Si la transacción tardó más, un
+    cliente pudo haber pasado el cursor sobre sus ids mientras no se veían:
+    se vuelven a anotar con ids nuevos (el cliente recibe el objeto de nuevo,
+    lo cual es inofensivo). La mitad del margen cubre el desfase de relojes
+    entre instancias.
+    """
+    tardanza = time.monotonic() - inicio
+    if tardanza < settings.SYNC_SAFETY_LAG_SECONDS / 2:
+        return
+    logger.warning(
+        "Transacción con %s cambios de sincronización hizo commit %.1f s "
+        "después de anotarlos; se vuelven a anotar",
+        len(cambios),
+        tardanza,
+    )
+    registry.inc("sync_late_commits_total", {})
+    _guardar(cambios)
+
+
+def compactar():
+    """
+    Borra las filas que ya tienen una más nueva del mismo objeto. Es seguro
+    en cualquier momento: la fila que queda tiene un id mayor, así que ningún
+    cursor se la salta. Regresa cuántas filas borró.
+    """
+    nuevas = CambioSync.objects.filter(
+        entidad=OuterRef("entidad"),
+        objeto_id=OuterRef("objeto_id"),
+        id__gt=OuterRef("id"),
+    )
+    viejas = list(
+        CambioSync.objects.filter(Exists(nuevas)).values_list("id", flat=True)
+    )
+    for desde in range(0, len(viejas), _LOTE_SQL):
+        CambioSync.objects.filter(id__in=viejas[desde : desde + _LOTE_SQL]).delete()
+    return len(viejas)
+
+
+@contextmanager
+def cambios_en_lote():
+    """
+    Junta los cambios registrados dentro del bloque y los escribe al salir
+    con un solo INSERT, una fila por objeto, en lugar de uno por cambio
+    (borrados en cascada, cargas masivas). Si el bloque falla no se escribe
+    nada, igual que la transacción que lo envuelve.
+    """
+    if getattr(_lote, "pendientes", None) is not None:
+        yield
+        return
+    _lote.pendientes = {}
+    try:
+        yield
+        pendientes = _lote.pendientes
+    finally:
+        _lote.pendientes = None
+    if pendientes:
+        _guardar(pendientes)
+
+
+@receiver(post_save)
+def _registrar_guardado(sender, instance, raw=False, **kwargs):
+    entidad = ENTIDAD_POR_MODELO.get(sender)
+    if entidad and not raw:
+        registrar(entidad, [instance.pk])
+
+
+@receiver(post_save, sender=User)
+def _registrar_usuario(
+    sender, instance, created, update_fields=None, raw=False, **kwargs
+):
+    # Un usuario nuevo aún no está anidado en nada y el login solo toca
+    # last_login (como caching._cambio_usuario)
+    if raw or created or set(update_fields or ()) == {"last_login"}:
+        return
+    registrar(USUARIOS, [instance.pk])
+
+
+@receiver(post_delete)
+def _registrar_borrado(sender, instance, **kwargs):
+    entidad = ENTIDAD_POR_MODELO.get(sender)
+    if entidad:
+        registrar(entidad, [instance.pk], eliminado=True)
+
+
+def cambios_desde(cursor, entidades, limite):
+    """
+    Cambios posteriores a `cursor` de las entidades pedidas, a lo más
+    `limite` filas de la bitácora. Regresa {"cursor", "has_more", "changes"}
+    donde changes trae por entidad los objetos creados o editados
+    ("upserted", serializados como en las listas) y los ids borrados
+    ("deleted"). Un cambio de un usuario vuelve a mandar los perfiles y
+    eventos que anidan sus datos.
+
+    Solo se entregan cambios con más de SYNC_SAFETY_LAG_SECONDS: un id menor
+    puede pertenecer a una transacción que aún no hace commit y el cursor no
+    debe brincárselo. Se corta en la primera fila demasiado reciente.
+    """
+    visible = timezone.now() - timedelta(seconds=settings.SYNC_SAFETY_LAG_SECONDS)
+    bitacora = CambioSync.objects.filter(id__gt=cursor)
+    if set(entidades) != set(ENTIDADES):
+        # Con todas las entidades se recorre la llave primaria desde el
+        # cursor; con algunas, el índice (entidad, id)
+        anotadas = list(entidades)
+        if any(entidad in USUARIO_ANIDADO for entidad in entidades):
+            anotadas.append(USUARIOS)
+        bitacora = bitacora.filter(entidad__in=anotadas)
+    filas = []
+    for fila in bitacora.order_by("id").values_list(
+        "id", "entidad", "objeto_id", "eliminado", "created_at"
+    )[: limite + 1]:
+        if fila[4] > visible:
+            break
+        filas.append(fila)
+
+    hay_mas = len(filas) > limite
+    filas = filas[:limite]
+
+    # Un objeto editado varias veces (aún sin compactar) viaja una vez, con
+    # su último estado
+    ultimo = {}
+    for _, entidad, objeto_id, eliminado, _ in filas:
+        ultimo[(entidad, objeto_id)] = eliminado
+
+    cambios = {entidad: {"upserted": [], "deleted": []} for entidad in entidades}
+    vigentes = defaultdict(list)
+    usuarios = []
+    for (entidad, objeto_id), eliminado in ultimo.items():
+        if entidad == USUARIOS:
+            usuarios.append(objeto_id)
+        elif eliminado:
+            cambios[entidad]["deleted"].append(objeto_id)
+        else:
+            vigentes[entidad].append(objeto_id)
+
+    for entidad in entidades:
+        ids = vigentes.get(entidad, [])
+        filtro = Q(id__in=ids)
+        if usuarios and entidad in USUARIO_ANIDADO:
+            filtro |= Q(**{f"{USUARIO_ANIDADO[entidad]}_id__in": usuarios})
+        elif not ids:
+            continue
+        queryset, serializer = ENTIDADES[entidad]
+        datos = serializer(queryset().filter(filtro).order_by("id")).data
+        cambios[entidad]["upserted"] = datos
+        # Borrado o desactivado después de anotarse: para el cliente ya no existe
+        encontrados = {dato["id"] for dato in datos}
+        cambios[entidad]["deleted"].extend(i for i in ids if i not in encontrados)
+
+    return {
+        "cursor": filas[-1][0] if filas else cursor,
+        "has_more": hay_mas,
+        "changes": cambios,
+    }
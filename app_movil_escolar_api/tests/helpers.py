@@ -0,0 +1,43 @@
+from django.contrib.auth.models import Group, User
+from django.test import Client
+from rest_framework.authtoken.models import Token
+
+
+def crear_usuario(rol="administrador", email=None):
+    """
+    Usuario activo con el grupo `rol`; regresa (user, token)
+    """
+    email = email or f"{rol}{User.objects.count() + 1}@prueba.mx"
+    user = User.objects.create_user(
+        username=email, email=email, password="secreta", first_name="Ana"
+    )
+    user.groups.add(Group.objects.get_or_create(name=rol)[0])
+    return user, Token.objects.create(user=user)
+
+
+def cliente(token=None, **headers):
+    if token is not None:
+        headers["HTTP_AUTHORIZATION"] = f"Bearer {token.key}"
+    return Client(HTTP_HOST="localhost", **headers)
+
+
+def crear_evento(responsable, **campos):
+    from datetime import date, timedelta
+
+    from ..models import EventoAcademico
+
+    datos = {
+        "nombre_evento": "Taller de pruebas",
+        "tipo_evento": "Taller",
+        "fecha_realizacion": date.today() + timedelta(days=30),
+        "hora_inicio": "10:00",
+        "hora_fin": "12:00",
+        "lugar": "Auditorio",
+        "publico_objetivo": ["Estudiantes"],
+        "programa_educativo": "Licenciatura en Ingeniería de Software",
+        "responsable_evento": responsable,
+        "descripcion_breve": "Evento de prueba.",
+        "cupo_maximo": 50,
+    }
+    datos.update(campos)
+    return EventoAcademico.objects.create(**datos)
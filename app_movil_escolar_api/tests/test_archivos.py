@@ -0,0 +1,47 @@
+import io
+import tempfile
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from .helpers import cliente, crear_usuario
+
+
+def png():
+    imagen = io.BytesIO()
+    Image.new("RGB", (64, 64), "navy").save(imagen, "PNG")
+    return SimpleUploadedFile("foto.png", imagen.getvalue())
+
+
+class ArchivoUrlTests(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        ajustes = override_settings(
+            MEDIA_ROOT=media.name, DEBUG=False, THUMBNAIL_WORKERS=0
+        )
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+        self.user, self.token = crear_usuario("alumno")
+
+    def test_con_storage_local_las_urls_van_a_media_stream(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            subida = cliente(self.token).post(
+                "/archivos/?tipo=foto", {"archivo": png()}
+            )
+        self.assertEqual(subida.status_code, 201)
+        datos = (
+            cliente(self.token).get(f"/archivos/?tipo=foto&id={self.user.id}").json()
+        )
+        for campo in ("url", "thumbnail_url"):
+            self.assertTrue(
+                datos[campo].startswith("http://localhost/media-stream/"), datos
+            )
+
+        ruta = datos["url"].removeprefix("http://localhost")
+        self.assertEqual(cliente().get(ruta).status_code, 403)
+        respuesta = cliente(self.token).get(ruta)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta["Content-Type"], "image/png")
+        respuesta.close()
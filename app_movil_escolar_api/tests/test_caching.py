@@ -0,0 +1,109 @@
+import threading
+import time
+
+from django.core.cache import caches
+from django.db import transaction
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from .. import caching
+from .helpers import crear_evento, crear_usuario
+
+
+class Calculo:
+    """
+    calcular() lento que cuenta sus llamadas
+    """
+
+    def __init__(self, segundos=0.2):
+        self.segundos = segundos
+        self.llamadas = 0
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            self.llamadas += 1
+            numero = self.llamadas
+        time.sleep(self.segundos)
+        return {"llamada": numero}
+
+
+@override_settings(CACHE_HELPER_ENABLED=True, CACHE_VERIFY_RATE=0)
+class SingleFlightTests(SimpleTestCase):
+    def setUp(self):
+        caches["default"].clear()
+
+    def en_paralelo(self, funcion, hilos=8):
+        resultados = [None] * hilos
+
+        def correr(i):
+            resultados[i] = funcion()
+
+        trabajadores = [
+            threading.Thread(target=correr, args=(i,)) for i in range(hilos)
+        ]
+        for hilo in trabajadores:
+            hilo.start()
+        for hilo in trabajadores:
+            hilo.join()
+        return resultados
+
+    def test_misses_concurrentes_calculan_una_vez(self):
+        calculo = Calculo()
+        resultados = self.en_paralelo(
+            lambda: caching.get_or_compute("prueba", "lista", calculo, 60)
+        )
+        self.assertEqual(calculo.llamadas, 1)
+        self.assertEqual(resultados, [{"llamada": 1}] * 8)
+
+    def test_mientras_se_recalcula_se_sirve_el_valor_anterior(self):
+        calculo = Calculo(0)
+        # ttl=0: vencido desde ya, pero dentro de CACHE_STALE_SECONDS
+        caching.get_or_compute("prueba", "lista", calculo, 0)
+        calculo.segundos = 0.3
+        resultados = self.en_paralelo(
+            lambda: caching.get_or_compute("prueba", "lista", calculo, 0)
+        )
+        self.assertEqual(calculo.llamadas, 2)
+        self.assertEqual(resultados.count({"llamada": 2}), 1)
+        self.assertEqual(resultados.count({"llamada": 1}), 7)
+
+    @override_settings(CACHE_LOCK_SECONDS=0)
+    def test_si_el_candado_no_se_suelta_se_calcula_aqui(self):
+        # Otro proceso tomó el candado y murió sin soltarlo
+        llave = caching._llave("prueba", "lista")
+        caches["default"].add(f"lock:{llave}", 1, 60)
+        calculo = Calculo(0)
+        valor = caching.get_or_compute("prueba", "lista", calculo, 60)
+        self.assertEqual(valor, {"llamada": 1})
+
+    def test_invalidar_el_grupo_fuerza_el_recalculo(self):
+        calculo = Calculo(0)
+        caching.get_or_compute("prueba", "lista", calculo, 60)
+        caching.get_or_compute("prueba", "lista", calculo, 60)
+        self.assertEqual(calculo.llamadas, 1)
+        caching.invalidar("prueba")
+        self.assertEqual(
+            caching.get_or_compute("prueba", "lista", calculo, 60), {"llamada": 2}
+        )
+
+
+class InvalidacionTests(TestCase):
+    def setUp(self):
+        caches["default"].clear()
+
+    def test_borrar_dentro_de_atomic_invalida_solo_ese_objeto(self):
+        admin, _ = crear_usuario("administrador")
+        borrado, otro = crear_evento(admin), crear_evento(admin)
+        borrado_id = borrado.id
+        antes = caching.versiones(
+            ("evento", None), ("evento", borrado_id), ("evento", otro.id)
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                borrado.delete()
+        despues = caching.versiones(
+            ("evento", None), ("evento", borrado_id), ("evento", otro.id)
+        )
+        self.assertEqual(despues[0], antes[0])
+        self.assertNotEqual(despues[1], antes[1])
+        self.assertEqual(despues[2], antes[2])
@@ -0,0 +1,128 @@
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.test import SimpleTestCase, override_settings
+
+from .. import data_utils
+from ..data_utils import DataUtils
+
+
+class Handler(BaseHTTPRequestHandler):
+    """
+    Servidor de imágenes de mentira; cuenta las peticiones por (método, ruta)
+    """
+
+    # ruta -> (status, headers)
+    RESPUESTAS = {
+        "/foto.png": (200, {"Content-Type": "image/png"}),
+        "/foto.jpg": (200, {"Content-Type": "image/jpeg; charset=binary"}),
+        "/pagina": (200, {"Content-Type": "text/html"}),
+        "/redirige": (302, {"Location": "/foto.png"}),
+        "/no-existe": (404, {"Content-Type": "text/html"}),
+    }
+
+    def do_HEAD(self):
+        self.server.peticiones[("HEAD", self.path)] += 1
+        if self.path.startswith("/sin-head"):
+            self.responder(405, {})
+        else:
+            self.responder(*self.respuesta())
+
+    def do_GET(self):
+        self.server.peticiones[("GET", self.path)] += 1
+        if self.path.startswith("/sin-head"):
+            self.responder(200, {"Content-Type": "image/jpeg"}, b"x" * 1024)
+        else:
+            self.responder(*self.respuesta())
+
+    def respuesta(self):
+        if self.path.startswith("/lenta"):
+            time.sleep(self.server.espera)
+            return 200, {"Content-Type": "image/png"}
+        return self.RESPUESTAS.get(self.path, (404, {}))
+
+    def responder(self, status, headers, cuerpo=b""):
+        self.send_response(status)
+        for nombre, valor in headers.items():
+            self.send_header(nombre, valor)
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        if self.command == "GET":
+            self.wfile.write(cuerpo)
+
+    def log_message(self, *args):
+        pass
+
+
+@override_settings(
+    URL_CHECK_CONNECT_TIMEOUT=1, URL_CHECK_READ_TIMEOUT=1, URL_CHECK_WORKERS=8
+)
+class IsUrlImageTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        cls.server.daemon_threads = True
+        cls.server.espera = 0
+        cls.server.peticiones = Counter()
+        cls.base = f"http://127.0.0.1:{cls.server.server_port}"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        data_utils._resultados = None
+        self.server.espera = 0
+        self.server.peticiones.clear()
+
+    def url(self, ruta):
+        return self.base + ruta
+
+    def test_content_type_de_imagen(self):
+        self.assertTrue(DataUtils.is_url_image(self.url("/foto.png")))
+        self.assertTrue(DataUtils.is_url_image(self.url("/foto.jpg")))
+        self.assertFalse(DataUtils.is_url_image(self.url("/pagina")))
+
+    def test_sin_head_usa_get(self):
+        self.assertTrue(DataUtils.is_url_image(self.url("/sin-head.jpg")))
+        self.assertEqual(self.server.peticiones[("GET", "/sin-head.jpg")], 1)
+
+    def test_sigue_redirecciones(self):
+        self.assertTrue(DataUtils.is_url_image(self.url("/redirige")))
+        self.assertEqual(self.server.peticiones[("HEAD", "/foto.png")], 1)
+
+    def test_404_no_es_imagen(self):
+        self.assertFalse(DataUtils.is_url_image(self.url("/no-existe")))
+
+    def test_el_resultado_queda_en_cache(self):
+        for _ in range(3):
+            self.assertTrue(DataUtils.is_url_image(self.url("/foto.png")))
+            self.assertFalse(DataUtils.is_url_image(self.url("/no-existe")))
+        self.assertEqual(self.server.peticiones[("HEAD", "/foto.png")], 1)
+        self.assertEqual(self.server.peticiones[("HEAD", "/no-existe")], 1)
+
+    @override_settings(URL_CHECK_READ_TIMEOUT=0.2)
+    def test_timeout_regresa_false_y_no_se_recuerda(self):
+        self.server.espera = 1
+        inicio = time.monotonic()
+        with self.assertLogs("app_movil_escolar_api.data_utils", "WARNING"):
+            self.assertFalse(DataUtils.is_url_image(self.url("/lenta.png")))
+        self.assertLess(time.monotonic() - inicio, 1)
+        self.server.espera = 0
+        self.assertTrue(DataUtils.is_url_image(self.url("/lenta.png")))
+
+    def test_varias_urls_se_revisan_a_la_vez(self):
+        self.server.espera = 0.3
+        urls = [self.url(f"/lenta-{i}.png") for i in range(6)]
+        urls.append(self.url("/pagina"))
+        inicio = time.monotonic()
+        resultado = DataUtils.are_urls_images(urls)
+        self.assertLess(time.monotonic() - inicio, 6 * 0.3)
+        self.assertEqual(list(resultado), urls)
+        self.assertEqual(list(resultado.values()), [True] * 6 + [False])
@@ -0,0 +1,136 @@
+import threading
+import time
+
+from django.test import SimpleTestCase
+
+from ..db_pool.pool import ConnectionPool, PoolTimeout
+from ..metrics import registry
+
+
+class Cursor:
+    def __init__(self, conexion):
+        self.conexion = conexion
+
+    def execute(self, sql):
+        if self.conexion.rota:
+            raise OSError("server closed the connection unexpectedly")
+
+    def fetchone(self):
+        return (1,)
+
+    def close(self):
+        pass
+
+
+class Conexion:
+    """
+    Conexión cruda de mentira: se puede "romper" para el SELECT 1
+    """
+
+    def __init__(self):
+        self.rota = False
+        self.cerrada = False
+
+    def cursor(self):
+        return Cursor(self)
+
+    def close(self):
+        self.cerrada = True
+
+
+class ConnectionPoolTests(SimpleTestCase):
+    def pool(self, **opciones):
+        # Un alias por prueba para que sus métricas no se mezclen
+        self.alias = f"{self._testMethodName}-{time.monotonic_ns()}"
+        valores = dict(size=1, timeout=5, check_after=60, max_idle=60, max_lifetime=600)
+        valores.update(opciones)
+        return ConnectionPool(self.alias, **valores)
+
+    def contador(self, nombre):
+        return registry.counters.get((nombre, (("alias", self.alias),)), 0)
+
+    def test_reutiliza_la_conexion_libre(self):
+        pool = self.pool()
+        primera = pool.get(Conexion)
+        pool.put(primera)
+        self.assertIs(pool.get(Conexion), primera)
+
+    def test_pool_lleno_lanza_pool_timeout(self):
+        pool = self.pool(timeout=0.05)
+        pool.get(Conexion)
+        inicio = time.monotonic()
+        with self.assertRaises(PoolTimeout):
+            pool.get(Conexion)
+        self.assertGreaterEqual(time.monotonic() - inicio, 0.05)
+        self.assertEqual(self.contador("db_pool_exhausted_total"), 1)
+        self.assertEqual(self.contador("db_pool_timeouts_total"), 1)
+
+    def test_el_que_espera_recibe_la_conexion_devuelta(self):
+        pool = self.pool()
+        prestada = pool.get(Conexion)
+        recibida = []
+        hilo = threading.Thread(target=lambda: recibida.append(pool.get(Conexion)))
+        hilo.start()
+        time.sleep(0.05)
+        pool.put(prestada)
+        hilo.join(1)
+        self.assertEqual(recibida, [prestada])
+        self.assertEqual(self.contador("db_pool_timeouts_total"), 0)
+
+    def test_conexion_no_reutilizable_libera_su_lugar(self):
+        pool = self.pool(timeout=0.05)
+        rota = pool.get(Conexion)
+        pool.put(rota, reutilizable=False)
+        self.assertTrue(rota.cerrada)
+        self.assertIsNot(pool.get(Conexion), rota)
+
+    def test_health_check_descarta_la_conexion_caida(self):
+        pool = self.pool(check_after=0)
+        caida = pool.get(Conexion)
+        pool.put(caida)
+        caida.rota = True
+        time.sleep(0.01)
+        nueva = pool.get(Conexion)
+        self.assertIsNot(nueva, caida)
+        self.assertTrue(caida.cerrada)
+        self.assertEqual(self.contador("db_pool_health_check_failures_total"), 1)
+
+    def test_health_check_conserva_la_conexion_sana(self):
+        pool = self.pool(check_after=0)
+        sana = pool.get(Conexion)
+        pool.put(sana)
+        time.sleep(0.01)
+        self.assertIs(pool.get(Conexion), sana)
+
+    def test_cierra_las_inactivas_y_las_viejas(self):
+        pool = self.pool(max_idle=0.01)
+        inactiva = pool.get(Conexion)
+        pool.put(inactiva)
+        time.sleep(0.02)
+        self.assertIsNot(pool.get(Conexion), inactiva)
+        self.assertTrue(inactiva.cerrada)
+
+        pool = self.pool(max_lifetime=0)
+        vieja = pool.get(Conexion)
+        time.sleep(0.01)
+        pool.put(vieja)
+        self.assertTrue(vieja.cerrada)
+
+    def test_error_al_conectar_no_ocupa_lugar(self):
+        pool = self.pool(timeout=0.05)
+
+        def falla():
+            raise OSError("connection refused")
+
+        with self.assertRaises(OSError):
+            pool.get(falla)
+        self.assertIsInstance(pool.get(Conexion), Conexion)
+
+    def test_cerrar_libres_cierra_solo_las_libres(self):
+        pool = self.pool(size=2)
+        libre, prestada = pool.get(Conexion), pool.get(Conexion)
+        pool.put(libre)
+        pool.cerrar_libres()
+        self.assertTrue(libre.cerrada)
+        self.assertFalse(prestada.cerrada)
+        self.assertIsNot(pool.get(Conexion), libre)
@@ -0,0 +1,75 @@
+from unittest import mock
+
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from .. import db_router
+from ..models import EventoAcademico
+
+
+class Vista:
+    """
+    get_response que anota a qué base leyó antes y después de escribir
+    """
+
+    def __init__(self, escribe=False):
+        self.escribe = escribe
+        self.lecturas = []
+
+    def __call__(self, request):
+        router = db_router.ReplicaRouter()
+        self.lecturas.append(router.db_for_read(EventoAcademico))
+        if self.escribe:
+            router.db_for_write(EventoAcademico)
+            self.lecturas.append(router.db_for_read(EventoAcademico))
+        return HttpResponse()
+
+
+@override_settings(REPLICA_STICKY_SECONDS=60, REPLICA_STICKY_CACHE="default")
+@mock.patch.object(db_router, "replicas", return_value=["replica1"])
+class ReplicaMiddlewareTests(SimpleTestCase):
+    def setUp(self):
+        caches["default"].clear()
+        self.factory = RequestFactory()
+
+    def pedir(self, metodo, token=None, ip="10.0.0.1", escribe=False):
+        vista = Vista(escribe)
+        headers = {"REMOTE_ADDR": ip}
+        if token:
+            headers["HTTP_AUTHORIZATION"] = f"Bearer {token}"
+        request = getattr(self.factory, metodo)("/lista-eventos/", **headers)
+        db_router.ReplicaMiddleware(vista)(request)
+        return vista.lecturas
+
+    def test_get_sin_escrituras_previas_lee_de_la_replica(self, _):
+        self.assertEqual(self.pedir("get", "a"), ["replica1"])
+
+    def test_get_despues_de_escribir_lee_de_la_primaria(self, _):
+        self.pedir("post", "a")
+        self.assertEqual(self.pedir("get", "a"), [DEFAULT_DB_ALIAS])
+        # Otro cliente, desde otra IP, sigue leyendo de la réplica
+        self.assertEqual(self.pedir("get", "b", ip="10.0.0.2"), ["replica1"])
+
+    def test_la_marca_vence(self, _):
+        self.pedir("post", "a")
+        caches["default"].clear()
+        self.assertEqual(self.pedir("get", "a"), ["replica1"])
+
+    def test_get_que_escribe_pasa_a_la_primaria_y_queda_marcado(self, _):
+        self.assertEqual(
+            self.pedir("get", "a", escribe=True), ["replica1", DEFAULT_DB_ALIAS]
+        )
+        self.assertEqual(self.pedir("get", "a"), [DEFAULT_DB_ALIAS])
+
+    def test_login_sin_token_marca_la_ip(self, _):
+        self.pedir("post")
+        # El primer GET con el token recién emitido sale de la misma IP
+        self.assertEqual(self.pedir("get", "nuevo"), [DEFAULT_DB_ALIAS])
+        self.assertEqual(self.pedir("get", "nuevo", ip="10.0.0.2"), ["replica1"])
+
+    def test_fuera_de_una_peticion_lee_de_la_primaria(self, _):
+        self.pedir("get", "a")
+        router = db_router.ReplicaRouter()
+        self.assertEqual(router.db_for_read(EventoAcademico), DEFAULT_DB_ALIAS)
@@ -0,0 +1,154 @@
+import json
+import threading
+import time
+from types import SimpleNamespace
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import caches
+from django.http import JsonResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+
+from ..idempotency import IdempotencyMiddleware
+from ..models import EventoAcademico
+from .helpers import cliente, crear_usuario
+
+
+class VistaLenta:
+    """
+    get_response que tarda `segundos` y cuenta cuántas veces se ejecutó
+    """
+
+    def __init__(self, segundos=0.2, status=201):
+        self.segundos = segundos
+        self.status = status
+        self.llamadas = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, request):
+        with self._lock:
+            self.llamadas += 1
+            numero = self.llamadas
+        time.sleep(self.segundos)
+        return JsonResponse({"id": numero}, status=self.status)
+
+
+class IdempotencyMiddlewareTests(SimpleTestCase):
+    def setUp(self):
+        caches["default"].clear()
+        self.factory = RequestFactory()
+
+    def post(self, clave="clave-1", cuerpo=None):
+        return self.factory.post(
+            "/eventos-academicos/",
+            json.dumps(cuerpo or {"nombre_evento": "Feria"}),
+            content_type="application/json",
+            HTTP_IDEMPOTENCY_KEY=clave,
+            HTTP_AUTHORIZATION="Bearer abc",
+        )
+
+    def test_duplicados_concurrentes_ejecutan_la_vista_una_vez(self):
+        vista = VistaLenta()
+        middleware = IdempotencyMiddleware(vista)
+        respuestas = [None] * 8
+
+        def enviar(i):
+            respuestas[i] = middleware(self.post())
+
+        hilos = [threading.Thread(target=enviar, args=(i,)) for i in range(8)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+
+        self.assertEqual(vista.llamadas, 1)
+        self.assertEqual({r.status_code for r in respuestas}, {201})
+        self.assertEqual({r.content for r in respuestas}, {b'{"id": 1}'})
+        repetidas = [r for r in respuestas if r.get("Idempotent-Replayed")]
+        self.assertEqual(len(repetidas), 7)
+
+    def sin_token(self, user, ip="10.0.0.1"):
+        request = self.factory.post(
+            "/alumnos/",
+            json.dumps({"email": "ana@prueba.mx", "password": "secreta"}),
+            content_type="application/json",
+            HTTP_IDEMPOTENCY_KEY="alta-1",
+            REMOTE_ADDR=ip,
+        )
+        request.user = user
+        return request
+
+    def test_dos_anonimos_con_la_misma_clave_no_comparten_respuesta(self):
+        vista = VistaLenta(0)
+        middleware = IdempotencyMiddleware(vista)
+        primera = middleware(self.sin_token(AnonymousUser(), "10.0.0.1"))
+        segunda = middleware(self.sin_token(AnonymousUser(), "10.0.0.2"))
+        self.assertEqual(vista.llamadas, 2)
+        self.assertNotEqual(primera.content, segunda.content)
+        self.assertFalse(segunda.has_header("Idempotent-Replayed"))
+        # El reintento del mismo anónimo sí recibe su respuesta
+        reintento = middleware(self.sin_token(AnonymousUser(), "10.0.0.1"))
+        self.assertEqual(reintento.content, primera.content)
+        self.assertEqual(vista.llamadas, 2)
+
+    def test_usuarios_de_sesion_tienen_claves_separadas(self):
+        vista = VistaLenta(0)
+        middleware = IdempotencyMiddleware(vista)
+        for pk in (1, 2):
+            middleware(self.sin_token(SimpleNamespace(is_authenticated=True, pk=pk)))
+        self.assertEqual(vista.llamadas, 2)
+
+    def test_misma_clave_con_otro_cuerpo_es_422(self):
+        middleware = IdempotencyMiddleware(VistaLenta(0))
+        middleware(self.post())
+        otra = middleware(self.post(cuerpo={"nombre_evento": "Otra"}))
+        self.assertEqual(otra.status_code, 422)
+
+    def test_un_5xx_no_se_guarda(self):
+        vista = VistaLenta(0, status=503)
+        middleware = IdempotencyMiddleware(vista)
+        middleware(self.post())
+        middleware(self.post())
+        self.assertEqual(vista.llamadas, 2)
+
+    @override_settings(IDEMPOTENCY_WAIT_SECONDS=0.05)
+    def test_duplicado_que_espera_de_mas_recibe_409(self):
+        middleware = IdempotencyMiddleware(VistaLenta(0.5))
+        original = threading.Thread(target=middleware, args=(self.post(),))
+        original.start()
+        time.sleep(0.05)
+        duplicado = middleware(self.post())
+        original.join()
+        self.assertEqual(duplicado.status_code, 409)
+        self.assertEqual(duplicado["Retry-After"], "1")
+
+
+class IdempotencyEndToEndTests(TestCase):
+    def setUp(self):
+        caches["default"].clear()
+
+    def test_reintento_de_alta_no_duplica_el_evento(self):
+        admin, token = crear_usuario("administrador")
+        datos = {
+            "nombre_evento": "Feria de ciencias",
+            "tipo_evento": "Taller",
+            "fecha_realizacion": "2030-05-10",
+            "hora_inicio": "10:00",
+            "hora_fin": "12:00",
+            "lugar": "Auditorio",
+            "publico_objetivo": ["Estudiantes"],
+            "programa_educativo": "Licenciatura en Ingeniería de Software",
+            "responsable_evento_id": admin.id,
+            "descripcion_breve": "Evento de prueba.",
+            "cupo_maximo": 50,
+        }
+        client = cliente(token, HTTP_IDEMPOTENCY_KEY="alta-1")
+        primera = client.post(
+            "/eventos-academicos/", datos, content_type="application/json"
+        )
+        segunda = client.post(
+            "/eventos-academicos/", datos, content_type="application/json"
+        )
+        self.assertEqual(primera.status_code, 201)
+        self.assertEqual(segunda.content, primera.content)
+        self.assertEqual(segunda["Idempotent-Replayed"], "true")
+        self.assertEqual(EventoAcademico.objects.count(), 1)
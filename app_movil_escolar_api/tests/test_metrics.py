@@ -0,0 +1,26 @@
+from django.test import TestCase, override_settings
+
+from .helpers import cliente
+
+
+class MetricsViewTests(TestCase):
+    @override_settings(METRICS_TOKEN="", DEBUG=False)
+    def test_sin_token_fuera_de_debug_no_expone_metricas(self):
+        self.assertEqual(cliente().get("/metrics/").status_code, 403)
+
+    @override_settings(METRICS_TOKEN="", DEBUG=True)
+    def test_sin_token_en_debug_responde(self):
+        self.assertEqual(cliente().get("/metrics/").status_code, 200)
+
+    @override_settings(METRICS_TOKEN="abc", DEBUG=True)
+    def test_con_token_lo_exige(self):
+        self.assertEqual(cliente().get("/metrics/").status_code, 403)
+        respuesta = cliente(HTTP_X_METRICS_TOKEN="abc").get("/metrics/")
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertIn(b"# TYPE", respuesta.content)
+
+    @override_settings(METRICS_TOKEN="abc", DEBUG=False)
+    def test_token_incorrecto_o_no_ascii(self):
+        for recibido in ("abd", "ab", "abcd", "ábc"):
+            respuesta = cliente(HTTP_X_METRICS_TOKEN=recibido).get("/metrics/")
+            self.assertEqual(respuesta.status_code, 403, recibido)
@@ -0,0 +1,55 @@
+import io
+
+from django.test import SimpleTestCase
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from ..renderers import FastJSONParser, FastJSONRenderer
+
+
+class FastJSONRendererTests(SimpleTestCase):
+    def assertIgualQueDRF(self, data):
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_floats_con_exponente(self):
+        for valor in (1e16, 1e-7, 1e-5, 3.1e-5, 1.5e300, -2.5e-10, 5e-324):
+            with self.subTest(valor=valor):
+                self.assertIgualQueDRF({"x": valor, "lista": [valor]})
+        self.assertIgualQueDRF({1e16: "llave", 3e-5: "otra"})
+
+    def test_floats_comunes_y_textos_con_forma_de_exponente(self):
+        self.assertIgualQueDRF(
+            {
+                "duracion_horas": [1.0, 0.1, 2.5, 1e15, 0.0001, -0.0],
+                "hash": "4e5f0e-1c",
+                "creado": "2026-10-19T00:09:04.000012Z",
+                "texto": "línea párrafo ",
+            }
+        )
+
+    def test_nan_e_infinito_salen_como_null(self):
+        # Diferencia conocida con DRF, que los rechaza (ver FastJSONRenderer)
+        for valor in (float("nan"), float("inf"), float("-inf")):
+            with self.subTest(valor=valor):
+                self.assertEqual(FastJSONRenderer().render({"x": valor}), b'{"x":null}')
+                with self.assertRaises(ValueError):
+                    JSONRenderer().render({"x": valor})
+
+
+class FastJSONParserTests(SimpleTestCase):
+    def test_enteros_en_los_bordes_de_64_bits_quedan_exactos(self):
+        for numero in (
+            9223372036854775807,
+            9223372036854775808,
+            -9223372036854775808,
+            -9223372036854775809,
+            18446744073709551615,
+            18446744073709551616,
+            -(10**30),
+        ):
+            with self.subTest(numero=numero):
+                cuerpo = f'{{"a":{numero}}}'.encode()
+                datos = FastJSONParser().parse(io.BytesIO(cuerpo))
+                self.assertEqual(datos, JSONParser().parse(io.BytesIO(cuerpo)))
+                self.assertIs(type(datos["a"]), int)
+                self.assertEqual(datos["a"], numero)
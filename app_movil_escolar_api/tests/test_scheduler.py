@@ -0,0 +1,52 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from .. import scheduler
+from ..scheduler import expirar_tokens
+from .helpers import crear_usuario
+
+
+class ExpirarTokensTests(TestCase):
+    def setUp(self):
+        _, self.token = crear_usuario("alumno")
+        Token.objects.filter(pk=self.token.pk).update(
+            created=timezone.now() - timedelta(days=90)
+        )
+
+    def test_por_defecto_no_expiran(self):
+        expirar_tokens()
+        self.assertTrue(Token.objects.filter(pk=self.token.pk).exists())
+
+    @override_settings(TOKEN_MAX_AGE_DAYS=30)
+    def test_con_limite_borra_los_viejos(self):
+        _, reciente = crear_usuario("alumno")
+        expirar_tokens()
+        self.assertFalse(Token.objects.filter(pk=self.token.pk).exists())
+        self.assertTrue(Token.objects.filter(pk=reciente.pk).exists())
+
+
+class IniciarEnHiloTests(TestCase):
+    def setUp(self):
+        self.addCleanup(setattr, scheduler, "_hilo_pid", scheduler._hilo_pid)
+        self.addCleanup(setattr, scheduler, "_hilo", scheduler._hilo)
+        scheduler._hilo_pid = None
+        self.hilo = mock.patch.object(scheduler.threading, "Thread").start()
+        mock.patch.object(scheduler, "Scheduler").start()
+        self.addCleanup(mock.patch.stopall)
+
+    def test_una_vez_por_proceso(self):
+        scheduler.iniciar_en_hilo()
+        scheduler.iniciar_en_hilo()
+        self.assertEqual(self.hilo.return_value.start.call_count, 1)
+
+    def test_otra_vez_en_el_proceso_hijo(self):
+        # Con --preload el master lo llamaría antes del fork
+        with mock.patch.object(scheduler.os, "getpid", return_value=1):
+            scheduler.iniciar_en_hilo()
+        with mock.patch.object(scheduler.os, "getpid", return_value=2):
+            scheduler.iniciar_en_hilo()
+        self.assertEqual(self.hilo.return_value.start.call_count, 2)
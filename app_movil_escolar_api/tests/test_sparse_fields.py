@@ -0,0 +1,30 @@
+from django.test import TestCase
+
+from .helpers import cliente, crear_evento, crear_usuario
+
+
+class CamposVaciosTests(TestCase):
+    def setUp(self):
+        admin, token = crear_usuario("administrador")
+        self.evento = crear_evento(admin)
+        self.client = cliente(token)
+
+    def test_fields_vacio_en_lista_trae_todos_los_campos(self):
+        completa = self.client.get("/lista-eventos/").json()
+        vacia = self.client.get("/lista-eventos/?fields=").json()
+        self.assertEqual(vacia, completa)
+        self.assertIn("nombre_evento", vacia[0])
+
+    def test_fields_vacio_en_detalle_trae_todos_los_campos(self):
+        url = f"/eventos-academicos/?id={self.evento.id}"
+        completo = self.client.get(url).json()
+        self.assertEqual(self.client.get(url + "&fields=&expand=").json(), completo)
+        self.assertIn("responsable_evento", completo)
+
+    def test_fields_desconocido_sigue_siendo_400(self):
+        respuesta = self.client.get("/lista-eventos/?fields=no_existe")
+        self.assertEqual(respuesta.status_code, 400)
+
+    def test_fields_con_valores_solo_trae_esos(self):
+        fila = self.client.get("/lista-eventos/?fields=id,nombre_evento").json()[0]
+        self.assertEqual(set(fila), {"id", "nombre_evento"})
@@ -0,0 +1,84 @@
+import time
+
+from django.db import connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from ..models import CambioSync
+from ..sync import ENTIDADES, USUARIOS, cambios_desde
+from .helpers import crear_evento, crear_usuario
+
+
+@override_settings(SYNC_SAFETY_LAG_SECONDS=0)
+class CambiosDesdeTests(TestCase):
+    def setUp(self):
+        self.admin, _ = crear_usuario("administrador")
+        self.eventos = [crear_evento(self.admin) for _ in range(3)]
+
+    def test_pagina_por_cursor_y_borrados(self):
+        primera = cambios_desde(0, ["eventos"], 2)
+        self.assertTrue(primera["has_more"])
+        self.assertEqual(len(primera["changes"]["eventos"]["upserted"]), 2)
+        borrado = self.eventos[0].id
+        self.eventos[0].delete()
+        resto = cambios_desde(primera["cursor"], ["eventos"], 10)
+        self.assertFalse(resto["has_more"])
+        self.assertEqual(resto["changes"]["eventos"]["deleted"], [borrado])
+
+    def test_cambio_del_usuario_vuelve_a_mandar_lo_que_lo_anida(self):
+        cursor = cambios_desde(0, list(ENTIDADES), 100)["cursor"]
+        self.admin.first_name = "Beatriz"
+        self.admin.save()
+        for entidades in (list(ENTIDADES), ["eventos"]):
+            with self.subTest(entidades=entidades):
+                cambios = cambios_desde(cursor, entidades, 100)["changes"]
+                eventos = cambios["eventos"]["upserted"]
+                self.assertEqual(
+                    [e["id"] for e in eventos], [e.id for e in self.eventos]
+                )
+                self.assertEqual(
+                    {e["responsable_evento"]["first_name"] for e in eventos},
+                    {"Beatriz"},
+                )
+                self.assertEqual(cambios["eventos"]["deleted"], [])
+
+    def test_login_y_usuario_nuevo_no_se_anotan(self):
+        total = CambioSync.objects.count()
+        self.admin.save(update_fields=["last_login"])
+        crear_usuario("alumno")
+        self.assertFalse(CambioSync.objects.filter(entidad=USUARIOS).exists())
+        self.assertEqual(CambioSync.objects.count(), total)
+
+    @override_settings(SYNC_SAFETY_LAG_SECONDS=0.2)
+    def test_commit_tardio_vuelve_a_anotar_con_ids_nuevos(self):
+        def anotadas(espera):
+            with self.captureOnCommitCallbacks(execute=True):
+                with transaction.atomic():
+                    evento = crear_evento(self.admin)
+                    time.sleep(espera)
+            return CambioSync.objects.filter(entidad="eventos", objeto_id=evento.id)
+
+        self.assertEqual(anotadas(0).count(), 1)
+        with self.assertLogs("app_movil_escolar_api.sync", "WARNING"):
+            filas = list(anotadas(0.15).order_by("id"))
+        self.assertEqual(len(filas), 2)
+        self.assertGreater(filas[1].created_at, filas[0].created_at)
+
+    def test_todas_las_entidades_no_filtran_por_entidad(self):
+        with CaptureQueriesContext(connection) as consultas:
+            cambios = cambios_desde(0, list(ENTIDADES), 10)
+        self.assertEqual(len(cambios["changes"]["eventos"]["upserted"]), 3)
+        bitacora = consultas.captured_queries[0]["sql"]
+        self.assertIn("cambios_sync", bitacora)
+        self.assertNotIn("entidad", bitacora.split("WHERE")[1])
+
+    def test_algunas_entidades_usan_el_indice_entidad_id(self):
+        if connection.vendor != "sqlite":
+            self.skipTest("plan de SQLite")
+        plan = (
+            CambioSync.objects.filter(id__gt=0, entidad__in=["eventos"])
+            .order_by("id")
+            .explain()
+        )
+        self.assertIn("cambios_sync_entidad_id_idx", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
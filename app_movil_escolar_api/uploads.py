@@ -0,0 +1,227 @@
+import io
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connections, transaction
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from .metrics import registry
+from .models import Archivo, EventoAcademico
+
+logger = logging.getLogger(__name__)
+
+# Formato según Pillow (el contenido, no el nombre) -> (extensión, content type)
+FORMATOS = {
+    "JPEG": ("jpg", "image/jpeg"),
+    "PNG": ("png", "image/png"),
+    "WEBP": ("webp", "image/webp"),
+}
+
+# Buckets (segundos) para guardar una imagen o generar su miniatura
+IMAGE_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class ImagenInvalida(Exception):
+    pass
+
+
+def validar_imagen(archivo):
+    """
+    Formato de una imagen subida según su contenido. Lee solo la cabecera
+    (verify() no decodifica los píxeles). Lanza ImagenInvalida si pesa o
+    mide de más, o si no es JPEG, PNG o WEBP.
+    """
+    if archivo.size > settings.UPLOAD_MAX_BYTES:
+        raise ImagenInvalida(
+            f"La imagen debe pesar máximo {settings.UPLOAD_MAX_BYTES // 2**20} MB"
+        )
+    try:
+        with Image.open(archivo) as img:
+            formato = img.format
+            ancho, alto = img.size
+            img.verify()
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError, SyntaxError):
+        raise ImagenInvalida("El archivo no es una imagen válida")
+    finally:
+        archivo.seek(0)
+    if formato not in FORMATOS:
+        raise ImagenInvalida("La imagen debe ser JPEG, PNG o WEBP")
+    if ancho * alto > settings.UPLOAD_MAX_PIXELS:
+        raise ImagenInvalida("La imagen tiene demasiados pixeles")
+    return formato
+
+
+def guardar(tipo, objeto_id, archivo, usuario=None):
+    """
+    Guarda una imagen subida como la vigente de (tipo, objeto_id) y regresa
+    su Archivo. El storage la copia por partes desde el archivo temporal de
+    la subida (FileSystemStorage con chunks(), GCS con subida resumable).
+    Después del commit se borran las anteriores y se encarga la miniatura
+    al pool.
+    """
+    formato = validar_imagen(archivo)
+    extension, content_type = FORMATOS[formato]
+    # El storage (GCS) guarda el tipo validado, no el que mandó el cliente
+    archivo.content_type = content_type
+    inicio = time.perf_counter()
+    nombre = default_storage.save(
+        f"{tipo}s/{objeto_id}/{uuid.uuid4().hex}.{extension}", archivo
+    )
+    registry.observe(
+        "upload_seconds",
+        {"tipo": tipo},
+        time.perf_counter() - inicio,
+        buckets=IMAGE_BUCKETS,
+    )
+    try:
+        with transaction.atomic():
+            anteriores = Archivo.objects.filter(tipo=tipo, objeto_id=objeto_id)
+            viejos = _nombres(anteriores)
+            anteriores.delete()
+            nuevo = Archivo.objects.create(
+                tipo=tipo,
+                objeto_id=objeto_id,
+                nombre=nombre,
+                content_type=content_type,
+                tamano=archivo.size,
+                subido_por=usuario,
+            )
+    except Exception:
+        default_storage.delete(nombre)
+        raise
+    registry.inc("uploads_total", {"tipo": tipo})
+    transaction.on_commit(lambda: enviar(generar_miniatura, nuevo.id))
+    if viejos:
+        transaction.on_commit(lambda: enviar(borrar, viejos))
+    return nuevo
+
+
+def _nombres(archivos):
+    return [
+        nombre
+        for par in archivos.values_list("nombre", "miniatura")
+        for nombre in par
+        if nombre
+    ]
+
+
+# ---------------------------------------------------------------------------
+# Pool de trabajo: miniaturas y borrados en el storage, fuera de la petición
+# ---------------------------------------------------------------------------
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def _executor():
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            # Tras un fork los hilos del padre no existen en el hijo
+            _pool = ThreadPoolExecutor(
+                max_workers=settings.THUMBNAIL_WORKERS,
+                thread_name_prefix="miniaturas",
+            )
+            _pool_pid = os.getpid()
+        return _pool
+
+
+def enviar(funcion, *args):
+    """
+    Corre `funcion(*args)` en el pool de THUMBNAIL_WORKERS hilos (Pillow
+    suelta el GIL al decodificar y redimensionar). Con 0 corre aquí mismo.
+    """
+    if settings.THUMBNAIL_WORKERS <= 0:
+        _correr(funcion, *args)
+    else:
+        _executor().submit(_en_hilo, funcion, *args)
+
+
+def _correr(funcion, *args):
+    try:
+        funcion(*args)
+    except Exception:
+        logger.exception("Trabajo de imágenes '%s' falló", funcion.__name__)
+
+
+def _en_hilo(funcion, *args):
+    try:
+        _correr(funcion, *args)
+    finally:
+        # Conexiones que abrió este hilo del pool
+        connections.close_all()
+
+
+def generar_miniatura(archivo_id):
+    """
+    Miniatura JPEG de a lo más THUMBNAIL_SIZE, guardada junto a la imagen
+    """
+    archivo = Archivo.objects.filter(id=archivo_id).first()
+    if archivo is None:
+        # Ya la reemplazó otra subida
+        return
+    inicio = time.perf_counter()
+    try:
+        with default_storage.open(archivo.nombre) as f, Image.open(f) as img:
+            # Un JPEG se decodifica ya reducido (1/2 a 1/8): menos trabajo y
+            # memoria que decodificarlo completo y luego reducirlo
+            img.draft("RGB", settings.THUMBNAIL_SIZE)
+            mini = ImageOps.exif_transpose(img)
+            mini.thumbnail(settings.THUMBNAIL_SIZE)
+            if mini.mode in ("RGBA", "LA", "P"):
+                # JPEG no tiene transparencia: sobre fondo blanco
+                mini = mini.convert("RGBA")
+                fondo = Image.new("RGB", mini.size, "white")
+                fondo.paste(mini, mask=mini.getchannel("A"))
+                mini = fondo
+            elif mini.mode != "RGB":
+                mini = mini.convert("RGB")
+            salida = io.BytesIO()
+            mini.save(salida, "JPEG", quality=85, optimize=True)
+    except Exception:
+        registry.inc("thumbnail_jobs_total", {"result": "error"})
+        raise
+    base = archivo.nombre.rsplit(".", 1)[0]
+    nombre = default_storage.save(f"{base}_mini.jpg", ContentFile(salida.getvalue()))
+    if not Archivo.objects.filter(id=archivo_id).update(miniatura=nombre):
+        # Se borró mientras se generaba
+        default_storage.delete(nombre)
+    registry.inc("thumbnail_jobs_total", {"result": "ok"})
+    registry.observe(
+        "thumbnail_seconds",
+        {},
+        time.perf_counter() - inicio,
+        buckets=IMAGE_BUCKETS,
+    )
+
+
+def borrar(nombres):
+    for nombre in nombres:
+        default_storage.delete(nombre)
+
+
+def limpiar_huerfanos():
+    """
+    Borra las imágenes de usuarios y eventos que ya no existen. Corre como
+    trabajo periódico (scheduler.py) para no sumar una consulta a cada
+    borrado. Regresa cuántas borró.
+    """
+    total = 0
+    for tipo, modelo in (("foto", User), ("banner", EventoAcademico)):
+        huerfanos = Archivo.objects.filter(tipo=tipo).exclude(
+            objeto_id__in=modelo.objects.values("id")
+        )
+        nombres = _nombres(huerfanos)
+        if nombres:
+            total += huerfanos.delete()[0]
+            borrar(nombres)
+    return total
@@ -9,6 +9,9 @@ from app_movil_escolar_api.views import alumnos
 from app_movil_escolar_api.views import maestros
 from app_movil_escolar_api.views import auth
 from app_movil_escolar_api.views import eventos
+from app_movil_escolar_api.views import sync
+from app_movil_escolar_api.views import archivos
+from app_movil_escolar_api.views import media
 from django.core.management import call_command
 from django.http import HttpResponse
 
@@ -25,27 +28,31 @@ def run_migrations(request):
 
 
 urlpatterns = [
+    # Warmup de App Engine (inbound_services: warmup)
+    path("_ah/warmup", bootstrap.WarmupView.as_view(), name="warmup"),
+    # Métricas en formato Prometheus
+    path("metrics/", bootstrap.MetricsView.as_view(), name="metrics"),
     # Create Admin
-    path("admin/", users.AdminView.as_view()),
-    path("run-migrations/", run_migrations),
+    path("admin/", users.AdminView.as_view(), name="admin"),
+    path("run-migrations/", run_migrations, name="run_migrations"),
     # Admin Data
-    path("lista-admins/", users.AdminAll.as_view()),
+    path("lista-admins/", users.AdminAll.as_view(), name="lista_admins"),
     # Edit Admin
     # path('admins-edit/', users.AdminsViewEdit.as_view())
     # Create Alumno
-    path("alumnos/", alumnos.AlumnosView.as_view()),
+    path("alumnos/", alumnos.AlumnosView.as_view(), name="alumnos"),
     # Alumnos Data
-    path("lista-alumnos/", alumnos.AlumnosAll.as_view()),
+    path("lista-alumnos/", alumnos.AlumnosAll.as_view(), name="lista_alumnos"),
     # Create Maestro
-    path("maestros/", maestros.MaestrosView.as_view()),
+    path("maestros/", maestros.MaestrosView.as_view(), name="maestros"),
     # Maestro Data
-    path("lista-maestros/", maestros.MaestrosAll.as_view()),
+    path("lista-maestros/", maestros.MaestrosAll.as_view(), name="lista_maestros"),
     # Total Users
-    path("total-usuarios/", users.TotalUsers.as_view()),
+    path("total-usuarios/", users.TotalUsers.as_view(), name="total_usuarios"),
     # Login
-    path("login/", auth.CustomAuthToken.as_view()),
+    path("login/", auth.CustomAuthToken.as_view(), name="login"),
     # Logout
-    path("logout/", auth.Logout.as_view()),
+    path("logout/", auth.Logout.as_view(), name="logout"),
     # CRUD de eventos académicos
     # POST: Registrar evento (solo admin)
     # GET: Obtener evento por ID (?id=X)
@@ -62,6 +69,13 @@ urlpatterns = [
     path(
         "eventos-por-rol/", eventos.EventosPorRolView.as_view(), name="eventos_por_rol"
     ),
+    # GET: Cambios desde un cursor (sincronización incremental, con borrados)
+    path("changes-since/", sync.CambiosDesdeView.as_view(), name="changes_since"),
+    # GET: URLs de la foto de un usuario o el banner de un evento
+    # POST: Subir foto (propia) o banner (solo admin), multipart
+    path("archivos/", archivos.ArchivoView.as_view(), name="archivos"),
+    # GET: Archivo del storage (videos, fotos, banners) con soporte de Range
+    path("media-stream/<path:nombre>", media.MediaView.as_view(), name="media_stream"),
 ]
 
 if settings.DEBUG:
@@ -1,13 +1,14 @@
-from django.db.models import *
-from django.db import transaction
+from django.db import IntegrityError, transaction
 from app_movil_escolar_api.serializers import UserSerializer
-from app_movil_escolar_api.serializers import *
-from app_movil_escolar_api.models import *
+from app_movil_escolar_api.serializers import AlumnoSerializer, AlumnoValuesSerializer
+from app_movil_escolar_api.models import Alumnos
+from app_movil_escolar_api.caching import detalle, usuario_en
+from app_movil_escolar_api.registro import registrar_perfil, respuesta_duplicados
 from rest_framework import permissions
 from rest_framework import generics
 from rest_framework import status
 from rest_framework.response import Response
-from django.contrib.auth.models import Group
+from django.contrib.auth.models import User
 from django.shortcuts import get_object_or_404
 
 #Esta funcion regresa todos los alumnos registrados 
@@ -16,7 +17,10 @@ class AlumnosAll(generics.CreateAPIView):
     permission_classes = (permissions.IsAuthenticated,)
     def get(self, request, *args, **kwargs):
         alumnos = Alumnos.objects.filter(user__is_active = 1).order_by("id")
-        lista = AlumnoSerializer(alumnos, many=True).data
+        # ?fields=id,matricula&expand=user limita columnas y anidados
+        seleccion = AlumnoValuesSerializer.select_from(request)
+        # Solo lectura: values_list() en lugar de AlumnoSerializer(many=True)
+        lista = AlumnoValuesSerializer(alumnos, seleccion).data
         
         return Response(lista, 200)
     
@@ -30,76 +34,67 @@ class AlumnosView(generics.CreateAPIView):
     
     # Obtener alumno por ID
     def get(self, request, *args, **kwargs):
-        alumno = get_object_or_404(Alumnos, id=request.GET.get("id"))
-        alumno_data = AlumnoSerializer(alumno, many=False).data
+        seleccion = AlumnoValuesSerializer.select_from(request)
+        alumnos = AlumnoValuesSerializer.narrow(Alumnos.objects.all(), seleccion)
+        # En caché por id y selección hasta que cambie el alumno o su usuario
+        alumno_data = detalle("alumno", request.GET.get("id"), seleccion, lambda: AlumnoSerializer(
+            get_object_or_404(alumnos, id=request.GET.get("id")), many=False, fields=seleccion
+        ).data, dependencias=usuario_en("user"))
         return Response(alumno_data, 200)
     
     #Registrar nuevo usuario
-    @transaction.atomic
     def post(self, request, *args, **kwargs):
 
         user = UserSerializer(data=request.data)
         if user.is_valid():
-            #Grab user data
-            role = request.data['rol']
-            first_name = request.data['first_name']
-            last_name = request.data['last_name']
             email = request.data['email']
-            password = request.data['password']
-            #Valida si existe el usuario o bien el email registrado
-            existing_user = User.objects.filter(email=email).first()
-
-            if existing_user:
+            #Valida si existe el usuario o bien el email registrado (antes de cifrar la contraseña)
+            if User.objects.filter(email=email).exists():
                 return Response({"message":"Username "+email+", is already taken"},400)
 
-            user = User.objects.create( username = email,
-                                        email = email,
-                                        first_name = first_name,
-                                        last_name = last_name,
-                                        is_active = 1)
-
-
-            user.save()
-            user.set_password(password)
-            user.save()
-
-            group, created = Group.objects.get_or_create(name=role)
-            group.user_set.add(user)
-            user.save()
-
-            #Create a profile for the user
-            alumno = Alumnos.objects.create(user=user,
-                                            matricula= request.data["matricula"],
-                                            curp= request.data["curp"].upper(),
-                                            rfc= request.data["rfc"].upper(),
-                                            fecha_nacimiento= request.data["fecha_nacimiento"],
-                                            edad= request.data["edad"],
-                                            telefono= request.data["telefono"],
-                                            ocupacion= request.data["ocupacion"])
-            alumno.save()
+            # Vacíos como NULL: no chocan con los índices únicos
+            identificadores = {"matricula": request.data["matricula"] or None,
+                               "curp": request.data["curp"].upper() or None}
+            try:
+                # Usuario, rol y perfil con un INSERT cada uno. Los índices únicos
+                # resuelven dos altas simultáneas con el mismo email, matrícula o CURP
+                alumno = registrar_perfil(Alumnos, request.data, {
+                    "rfc": request.data["rfc"].upper(),
+                    "fecha_nacimiento": request.data["fecha_nacimiento"],
+                    "edad": request.data["edad"],
+                    "telefono": request.data["telefono"],
+                    "ocupacion": request.data["ocupacion"],
+                    **identificadores,
+                })
+            except IntegrityError:
+                return respuesta_duplicados(Alumnos, identificadores, email=email)
 
             return Response({"Alumno creado con ID= ": alumno.id }, 201)
 
         return Response(user.errors, status=status.HTTP_400_BAD_REQUEST)
 
     # Actualizar datos del alumno
-    @transaction.atomic
     def put(self, request, *args, **kwargs):
         # Primero obtenemos el alumno a actualizar
         alumno = get_object_or_404(Alumnos, id=request.data["id"])
-        alumno.matricula = request.data["matricula"]
-        alumno.curp = request.data["curp"].upper()
+        alumno.matricula = request.data["matricula"] or None
+        alumno.curp = request.data["curp"].upper() or None
         alumno.rfc = request.data["rfc"].upper()
         alumno.fecha_nacimiento = request.data["fecha_nacimiento"]
         alumno.edad = request.data["edad"]
         alumno.telefono = request.data["telefono"]
         alumno.ocupacion = request.data["ocupacion"]
-        alumno.save()
-        # Actualizamos los datos del usuario asociado (tabla auth_user de Django)
-        user = alumno.user
-        user.first_name = request.data["first_name"]
-        user.last_name = request.data["last_name"]
-        user.save()
+        try:
+            with transaction.atomic():
+                alumno.save()
+                # Actualizamos los datos del usuario asociado (tabla auth_user de Django)
+                user = alumno.user
+                user.first_name = request.data["first_name"]
+                user.last_name = request.data["last_name"]
+                user.save()
+        except IntegrityError:
+            # La matrícula o CURP nueva ya es de otro alumno
+            return respuesta_duplicados(Alumnos, {"matricula": alumno.matricula, "curp": alumno.curp}, excluir_id=alumno.id)
         
         return Response({"message": "Alumno actualizado correctamente", "alumno": AlumnoSerializer(alumno).data}, 200)
     
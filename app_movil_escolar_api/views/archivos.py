@@ -0,0 +1,138 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.files.storage import default_storage
+from django.urls import reverse
+from rest_framework import generics
+from rest_framework import permissions
+from rest_framework import status
+from rest_framework.parsers import MultiPartParser
+from rest_framework.response import Response
+
+from ..models import Archivo, EventoAcademico
+from ..uploads import ImagenInvalida, guardar
+
+# Margen para los encabezados multipart sobre UPLOAD_MAX_BYTES
+MARGEN_MULTIPART = 64 * 1024
+
+
+def _es_admin(user):
+    return user.groups.filter(name="administrador").exists()
+
+
+def _url(request, nombre):
+    if not nombre:
+        return None
+    url = default_storage.url(nombre)
+    if url.startswith("/"):
+        # Storage local: MEDIA_URL solo se enruta con DEBUG; media-stream/
+        # está siempre y pide el token
+        return request.build_absolute_uri(reverse("media_stream", args=[nombre]))
+    return url
+
+
+def archivo_data(request, archivo):
+    return {
+        "id": archivo.id,
+        "tipo": archivo.tipo,
+        "objeto_id": archivo.objeto_id,
+        "url": _url(request, archivo.nombre),
+        # None hasta que el pool genera la miniatura
+        "thumbnail_url": _url(request, archivo.miniatura),
+        "content_type": archivo.content_type,
+        "tamano": archivo.tamano,
+    }
+
+
+class ArchivoView(generics.CreateAPIView):
+    """
+    Fotos de perfil y banners de eventos (multipart, campo "archivo")
+    - GET ?tipo=foto&id=<user_id> o ?tipo=banner&id=<evento_id>: URLs de la
+      imagen vigente y su miniatura
+    - POST ?tipo=foto: foto del usuario autenticado (un admin puede mandar
+      &id= de otro usuario)
+    - POST ?tipo=banner&id=<evento_id>: banner de un evento (solo admin)
+
+    Las respuestas traen URLs, no base64: la imagen se descarga aparte (y el
+    cliente puede cachearla).
+    """
+
+    permission_classes = (permissions.IsAuthenticated,)
+    parser_classes = (MultiPartParser,)
+
+    def get(self, request, *args, **kwargs):
+        tipo = request.GET.get("tipo")
+        objeto_id = request.GET.get("id")
+        if tipo not in ("foto", "banner") or not str(objeto_id or "").isdigit():
+            return Response(
+                {"message": "Se requieren 'tipo' (foto o banner) e 'id'"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        archivo = (
+            Archivo.objects.filter(tipo=tipo, objeto_id=objeto_id)
+            .order_by("-id")
+            .first()
+        )
+        if archivo is None:
+            return Response({"message": "Sin imagen"}, status=status.HTTP_404_NOT_FOUND)
+        return Response(archivo_data(request, archivo), status=status.HTTP_200_OK)
+
+    def post(self, request, *args, **kwargs):
+        # Antes de leer el cuerpo: una subida demasiado grande no llega a disco
+        largo = request.META.get("CONTENT_LENGTH") or "0"
+        if (
+            largo.isdigit()
+            and int(largo) > settings.UPLOAD_MAX_BYTES + MARGEN_MULTIPART
+        ):
+            return Response(
+                {
+                    "message": "La imagen debe pesar máximo "
+                    f"{settings.UPLOAD_MAX_BYTES // 2**20} MB"
+                },
+                status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            )
+
+        tipo = request.GET.get("tipo")
+        objeto_id = request.GET.get("id")
+        if tipo == "foto":
+            if objeto_id is None or str(objeto_id) == str(request.user.id):
+                objeto_id = request.user.id
+            elif not _es_admin(request.user):
+                return Response(
+                    {"message": "Solo puedes cambiar tu propia foto"},
+                    status=status.HTTP_403_FORBIDDEN,
+                )
+        elif tipo == "banner":
+            if not _es_admin(request.user):
+                return Response(
+                    {"message": "Solo los administradores pueden subir banners"},
+                    status=status.HTTP_403_FORBIDDEN,
+                )
+        else:
+            return Response(
+                {"message": "Se requiere 'tipo' (foto o banner)"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if not str(objeto_id or "").isdigit():
+            return Response(
+                {"message": "Se requiere el parámetro 'id'"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        objeto_id = int(objeto_id)
+        modelo = EventoAcademico if tipo == "banner" else User
+        if not modelo.objects.filter(id=objeto_id).exists():
+            return Response(
+                {"message": "No existe el objeto de la imagen"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        archivo = request.FILES.get("archivo")
+        if archivo is None:
+            return Response(
+                {"message": "Se requiere el archivo en el campo 'archivo'"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            nuevo = guardar(tipo, objeto_id, archivo, request.user)
+        except ImagenInvalida as e:
+            return Response({"message": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(archivo_data(request, nuevo), status=status.HTTP_201_CREATED)
@@ -1,6 +1,9 @@
-from django.db.models import *
-from app_movil_escolar_api.serializers import *
-from app_movil_escolar_api.models import *
+from app_movil_escolar_api.serializers import (
+    AlumnoSerializer,
+    MaestroSerializer,
+    UserSerializer,
+)
+from app_movil_escolar_api.models import Alumnos, Maestros
 from rest_framework import permissions
 from rest_framework import generics
 from rest_framework import status
@@ -1,5 +1,7 @@
+import hmac
 import os
 from django.conf import settings
+from django.http import HttpResponse
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import permissions
@@ -11,3 +13,49 @@ class VersionView(APIView):
     def get(self, request, *args, **kwargs):
         version = getattr(settings, "APP_VERSION", os.getenv("APP_VERSION", "1.0.0"))
         return Response({"version": version})
+
+
+class WarmupView(APIView):
+    """
+    Endpoint de calentamiento (App Engine llama GET /_ah/warmup antes de
+    mandar tráfico a una instancia nueva). Abre la conexión a la base de datos
+    y precarga módulos y cachés para que la primera petición real no pague
+    el arranque.
+    """
+
+    authentication_classes = []
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request, *args, **kwargs):
+        from app_movil_escolar_api.warmup import run_warmup
+
+        return Response({"warmup": run_warmup()})
+
+
+class MetricsView(APIView):
+    """
+    Scrape de Prometheus: métricas por vista de todos los workers.
+    Exige el header X-Metrics-Token con METRICS_TOKEN; sin token configurado
+    solo responde con DEBUG (expone rutas, errores y estado del pool).
+    """
+
+    authentication_classes = []
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request, *args, **kwargs):
+        from app_movil_escolar_api.metrics import registry, render_prometheus
+
+        token = settings.METRICS_TOKEN
+        if token:
+            # Comparación en tiempo constante: no filtra el token por latencia.
+            # En bytes, porque con str compare_digest falla si no es ASCII
+            recibido = request.headers.get("X-Metrics-Token", "")
+            if not hmac.compare_digest(recibido.encode(), token.encode()):
+                return HttpResponse(status=403)
+        elif not settings.DEBUG:
+            return HttpResponse(status=403)
+
+        return HttpResponse(
+            render_prometheus(*registry.collect()),
+            content_type="text/plain; version=0.0.4; charset=utf-8",
+        )
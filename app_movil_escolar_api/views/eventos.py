@@ -1,5 +1,6 @@
+from django.conf import settings
 from django.db.models import Q
-from django.db import transaction
+from django.db import NotSupportedError, transaction
 from rest_framework import permissions
 from rest_framework import generics
 from rest_framework import status
@@ -8,10 +9,189 @@ from django.shortcuts import get_object_or_404
 from django.contrib.auth.models import Group
 import json
 
+from datetime import datetime, timezone as dt_timezone
+from rest_framework import serializers
+
+from ..caching import (
+    clave_seleccion,
+    detalle,
+    get_or_compute,
+    refrescar,
+    usuario_en,
+)
 from ..models import EventoAcademico
-from ..serializers import EventoAcademicoSerializer
+from ..serializers import EventoAcademicoSerializer, EventoAcademicoValuesSerializer
 from django.contrib.auth.models import User
 
+# ?status= -> (método de EventoQuerySet, orden). Los próximos y en curso
+# empiezan por el más cercano; los pasados por el más reciente
+ESTADOS = {
+    "upcoming": ("proximos", ("inicio", "id")),
+    "now": ("en_curso", ("inicio", "id")),
+    "past": ("pasados", ("-inicio", "-id")),
+}
+# Sin ?status=: todos, del más nuevo al más viejo (como siempre)
+ORDEN_TODOS = ("-inicio", "-id")
+
+
+def parametros_lista(request):
+    """
+    (status, limit, cursor) de ?status=upcoming|past|now, ?limit=N y
+    ?cursor=; limit None es la lista completa. Lanza ValidationError (400)
+    con un valor inválido.
+    """
+    estado = request.query_params.get("status")
+    if estado is not None and estado not in ESTADOS:
+        raise serializers.ValidationError(
+            {"status": f"Debe ser uno de: {', '.join(ESTADOS)}"}
+        )
+    limite = request.query_params.get("limit")
+    if limite is not None:
+        if (
+            not limite.isdigit()
+            or not 1 <= int(limite) <= settings.EVENTOS_MAX_PAGE_SIZE
+        ):
+            raise serializers.ValidationError(
+                {
+                    "limit": "Debe ser un entero entre 1 y "
+                    f"{settings.EVENTOS_MAX_PAGE_SIZE}"
+                }
+            )
+        limite = int(limite)
+    cursor = request.query_params.get("cursor")
+    if cursor is not None:
+        if limite is None:
+            raise serializers.ValidationError({"cursor": "Requiere 'limit'"})
+        try:
+            cursor = _leer_cursor(cursor)
+        except ValueError:
+            raise serializers.ValidationError({"cursor": "Cursor inválido"})
+    return estado, limite, cursor
+
+
+def _cursor(inicio, evento_id):
+    # Inicio en UTC y el id que desempata: "2026-10-20T16:00:00Z_123"
+    inicio = inicio.astimezone(dt_timezone.utc).replace(tzinfo=None)
+    return f"{inicio.isoformat()}Z_{evento_id}"
+
+
+def _leer_cursor(cursor):
+    inicio, _, evento_id = cursor.rpartition("_")
+    if not inicio.endswith("Z"):
+        raise ValueError(cursor)
+    inicio = datetime.fromisoformat(inicio[:-1]).replace(tzinfo=dt_timezone.utc)
+    return inicio, int(evento_id)
+
+
+def lista_eventos(eventos, seleccion, estado, limite, cursor):
+    """
+    Eventos (ya filtrados por rol) con ?status= y, con `limite`, la página
+    después de `cursor`. Regresa (datos, cursor siguiente o None).
+
+    Filtros, orden y páginas van sobre el índice (inicio, id): la página se
+    busca recorriendo solo el índice desde el cursor, sin OFFSET, y luego
+    se leen esas filas por id.
+    """
+    if estado is None:
+        orden = ORDEN_TODOS
+    else:
+        metodo, orden = ESTADOS[estado]
+        eventos = getattr(eventos, metodo)()
+    eventos = eventos.order_by(*orden)
+    if limite is None:
+        return EventoAcademicoValuesSerializer(eventos, seleccion).data, None
+
+    if cursor is not None:
+        inicio, evento_id = cursor
+        if orden[0].startswith("-"):
+            despues = Q(inicio__lt=inicio) | Q(inicio=inicio, id__lt=evento_id)
+        else:
+            despues = Q(inicio__gt=inicio) | Q(inicio=inicio, id__gt=evento_id)
+        eventos = eventos.filter(despues)
+    # Uno de más para saber si hay otra página
+    llaves = list(eventos.values_list("inicio", "id")[: limite + 1])
+    siguiente = _cursor(*llaves[limite - 1]) if len(llaves) > limite else None
+    ids = [evento_id for _, evento_id in llaves[:limite]]
+    pagina = EventoAcademico.objects.filter(id__in=ids).order_by(*orden)
+    datos = EventoAcademicoValuesSerializer(pagina, seleccion).data if ids else []
+    return datos, siguiente
+
+
+def clave_lista(grupo_clave, seleccion, parametros):
+    estado, limite, cursor = parametros
+    return ":".join(
+        [
+            grupo_clave,
+            clave_seleccion(seleccion),
+            estado or "*",
+            str(limite or "*"),
+            "*" if cursor is None else _cursor(*cursor),
+        ]
+    )
+
+
+def respuesta_lista(grupo_clave, eventos, seleccion, parametros):
+    """
+    Response de una lista de eventos, en caché por selección y parámetros;
+    con página, el cursor siguiente va en el header X-Next-Cursor
+    """
+    datos, siguiente = get_or_compute(
+        "eventos",
+        clave_lista(grupo_clave, seleccion, parametros),
+        lambda: lista_eventos(eventos, seleccion, *parametros),
+        settings.EVENTOS_CACHE_TTL,
+    )
+    response = Response(datos, status=status.HTTP_200_OK)
+    if siguiente is not None:
+        response["X-Next-Cursor"] = siguiente
+    return response
+
+
+def eventos_de_rol(rol):
+    """
+    Eventos que ve cada rol, o None si el rol no se reconoce
+    """
+    if rol == "administrador":
+        # El admin ve todos los eventos
+        return EventoAcademico.objects.all()
+    elif rol == "maestro" or rol == "teacher":
+        # El maestro ve eventos para profesores y público general
+        return EventoAcademico.objects.filter(
+            Q(publico_objetivo__contains="Profesores")
+            | Q(publico_objetivo__contains="Público general")
+        )
+    elif rol == "alumno" or rol == "student":
+        # El alumno ve eventos para estudiantes y público general
+        return EventoAcademico.objects.filter(
+            Q(publico_objetivo__contains="Estudiantes")
+            | Q(publico_objetivo__contains="Público general")
+        )
+    return None
+
+
+def calentar_listas():
+    """
+    Recalcula en caché lista-eventos y eventos-por-rol sin parámetros (ver
+    scheduler.py)
+    """
+    sin_parametros = (None, None, None)
+    listas = [("lista", EventoAcademico.objects.all())]
+    listas += [
+        (f"rol:{rol}", eventos_de_rol(rol))
+        for rol in ("administrador", "maestro", "alumno")
+    ]
+    for grupo_clave, eventos in listas:
+        try:
+            refrescar(
+                "eventos",
+                clave_lista(grupo_clave, None, sin_parametros),
+                lambda eventos=eventos: lista_eventos(eventos, None, *sin_parametros),
+                settings.EVENTOS_CACHE_TTL,
+            )
+        except NotSupportedError:
+            # SQLite no soporta contains en JSONField (maestro y alumno)
+            pass
+
 
 class EventoAcademicoView(generics.CreateAPIView):
     """
@@ -39,6 +219,9 @@ class EventoAcademicoView(generics.CreateAPIView):
 
     # Obtener evento por ID
     def get(self, request, *args, **kwargs):
+        # ?fields=nombre_evento,fecha_realizacion&expand=responsable_evento
+        # (fuera del try: un campo desconocido responde 400 con el detalle)
+        seleccion = EventoAcademicoValuesSerializer.select_from(request)
         try:
             evento_id = request.GET.get("id")
             if not evento_id:
@@ -47,8 +230,22 @@ class EventoAcademicoView(generics.CreateAPIView):
                     status=status.HTTP_400_BAD_REQUEST,
                 )
 
-            evento = get_object_or_404(EventoAcademico, id=evento_id)
-            evento_data = EventoAcademicoSerializer(evento, many=False).data
+            eventos = EventoAcademicoValuesSerializer.narrow(
+                EventoAcademico.objects.all(), seleccion
+            )
+            # En caché por id y selección hasta que cambie el evento o su
+            # responsable
+            evento_data = detalle(
+                "evento",
+                evento_id,
+                seleccion,
+                lambda: EventoAcademicoSerializer(
+                    get_object_or_404(eventos, id=evento_id),
+                    many=False,
+                    fields=seleccion,
+                ).data,
+                dependencias=usuario_en("responsable_evento"),
+            )
 
             return Response(evento_data, status=status.HTTP_200_OK)
 
@@ -230,17 +427,17 @@ class ListaEventosView(generics.CreateAPIView):
     permission_classes = (permissions.IsAuthenticated,)
 
     def get(self, request, *args, **kwargs):
+        # ?fields=id,nombre_evento&expand=responsable_evento limita la salida;
+        # ?status=upcoming|past|now filtra y ?limit=&cursor= pagina
+        seleccion = EventoAcademicoValuesSerializer.select_from(request)
+        parametros = parametros_lista(request)
         try:
-            # Obtener todos los eventos ordenados por fecha
-            eventos = EventoAcademico.objects.all().order_by(
-                "-fecha_realizacion", "-hora_inicio"
+            # Serializar los eventos (solo lectura, con values_list()); la
+            # lista es igual para todos, se guarda en caché por selección
+            return respuesta_lista(
+                "lista", EventoAcademico.objects.all(), seleccion, parametros
             )
 
-            # Serializar los eventos
-            eventos_data = EventoAcademicoSerializer(eventos, many=True).data
-
-            return Response(eventos_data, status=status.HTTP_200_OK)
-
         except Exception as e:
             return Response(
                 {"message": "Error al obtener la lista de eventos", "error": str(e)},
@@ -271,6 +468,8 @@ class EventosPorRolView(generics.CreateAPIView):
             return None
 
     def get(self, request, *args, **kwargs):
+        seleccion = EventoAcademicoValuesSerializer.select_from(request)
+        parametros = parametros_lista(request)
         try:
             # Obtener el rol del usuario
             rol = self.get_user_role(request.user)
@@ -282,35 +481,17 @@ class EventosPorRolView(generics.CreateAPIView):
                 )
 
             # Filtrar eventos según el rol
-            if rol == "administrador":
-                # El admin ve todos los eventos
-                eventos = EventoAcademico.objects.all()
-            elif rol == "maestro" or rol == "teacher":
-                # El maestro ve eventos para profesores y público general
-                eventos = EventoAcademico.objects.filter(
-                    Q(publico_objetivo__contains="Profesores")
-                    | Q(publico_objetivo__contains="Público general")
-                )
-            elif rol == "alumno" or rol == "student":
-                # El alumno ve eventos para estudiantes y público general
-                eventos = EventoAcademico.objects.filter(
-                    Q(publico_objetivo__contains="Estudiantes")
-                    | Q(publico_objetivo__contains="Público general")
-                )
-            else:
+            eventos = eventos_de_rol(rol)
+            if eventos is None:
                 # Rol no reconocido
                 return Response(
                     {"message": f"Rol '{rol}' no reconocido"},
                     status=status.HTTP_400_BAD_REQUEST,
                 )
 
-            # Ordenar por fecha y hora
-            eventos = eventos.order_by("-fecha_realizacion", "-hora_inicio")
-
-            # Serializar
-            eventos_data = EventoAcademicoSerializer(eventos, many=True).data
-
-            return Response(eventos_data, status=status.HTTP_200_OK)
+            # Serializar (solo lectura, con values_list()); igual para todos
+            # los usuarios del mismo rol
+            return respuesta_lista(f"rol:{rol}", eventos, seleccion, parametros)
 
         except Exception as e:
             return Response(
@@ -1,13 +1,14 @@
-from django.db.models import *
-from django.db import transaction
+from django.db import IntegrityError, transaction
 from app_movil_escolar_api.serializers import UserSerializer
-from app_movil_escolar_api.serializers import *
-from app_movil_escolar_api.models import *
+from app_movil_escolar_api.serializers import MaestroSerializer, MaestroValuesSerializer
+from app_movil_escolar_api.models import Maestros
+from app_movil_escolar_api.caching import detalle, usuario_en
+from app_movil_escolar_api.registro import registrar_perfil, respuesta_duplicados
 from rest_framework import permissions
 from rest_framework import generics
 from rest_framework import status
 from rest_framework.response import Response
-from django.contrib.auth.models import Group
+from django.contrib.auth.models import User
 import json
 from django.shortcuts import get_object_or_404
 
@@ -17,7 +18,10 @@ class MaestrosAll(generics.CreateAPIView):
     permission_classes = (permissions.IsAuthenticated,)
     def get(self, request, *args, **kwargs):
         maestros = Maestros.objects.filter(user__is_active=1).order_by("id")
-        lista = MaestroSerializer(maestros, many=True).data
+        # ?fields=id,id_trabajador&expand=user limita columnas y anidados
+        seleccion = MaestroValuesSerializer.select_from(request)
+        # Solo lectura: values_list() en lugar de MaestroSerializer(many=True)
+        lista = MaestroValuesSerializer(maestros, seleccion).data
         for maestro in lista:
             if isinstance(maestro, dict) and "materias_json" in maestro:
                 try:
@@ -36,72 +40,74 @@ class MaestrosView(generics.CreateAPIView):
     
     # Obtener maestro por ID
     def get(self, request, *args, **kwargs):
-        maestro = get_object_or_404(Maestros, id=request.GET.get("id"))
-        maestro_data = MaestroSerializer(maestro, many=False).data
-        # Convertir materias_json a lista si existe
-        if maestro_data.get("materias_json"):
-            try:
-                maestro_data["materias_json"] = json.loads(maestro_data["materias_json"])
-            except Exception:
-                maestro_data["materias_json"] = []
+        seleccion = MaestroValuesSerializer.select_from(request)
+        maestros = MaestroValuesSerializer.narrow(Maestros.objects.all(), seleccion)
+
+        def serializar():
+            maestro = get_object_or_404(maestros, id=request.GET.get("id"))
+            maestro_data = MaestroSerializer(maestro, many=False, fields=seleccion).data
+            # Convertir materias_json a lista si existe
+            if maestro_data.get("materias_json"):
+                try:
+                    maestro_data["materias_json"] = json.loads(maestro_data["materias_json"])
+                except Exception:
+                    maestro_data["materias_json"] = []
+            return maestro_data
+
+        # En caché por id y selección hasta que cambie el maestro o su usuario
+        maestro_data = detalle("maestro", request.GET.get("id"), seleccion, serializar,
+                               dependencias=usuario_en("user"))
         return Response(maestro_data, 200)
     
     #Registrar nuevo usuario maestro
-    @transaction.atomic
     def post(self, request, *args, **kwargs):
         user = UserSerializer(data=request.data)
         if user.is_valid():
-            role = request.data['rol']
-            first_name = request.data['first_name']
-            last_name = request.data['last_name']
             email = request.data['email']
-            password = request.data['password']
-            existing_user = User.objects.filter(email=email).first()
-            if existing_user:
+            # Antes de cifrar la contraseña
+            if User.objects.filter(email=email).exists():
                 return Response({"message":"Username "+email+", is already taken"},400)
-            user = User.objects.create( username = email,
-                                        email = email,
-                                        first_name = first_name,
-                                        last_name = last_name,
-                                        is_active = 1)
-            user.save()
-            user.set_password(password)
-            user.save()
-            
-            group, created = Group.objects.get_or_create(name=role)
-            group.user_set.add(user)
-            user.save()
-            #Create a profile for the user
-            maestro = Maestros.objects.create(user=user,
-                                            id_trabajador= request.data["id_trabajador"],
-                                            fecha_nacimiento= request.data["fecha_nacimiento"],
-                                            telefono= request.data["telefono"],
-                                            rfc= request.data["rfc"].upper(),
-                                            cubiculo= request.data["cubiculo"],
-                                            area_investigacion= request.data["area_investigacion"],
-                                            materias_json = json.dumps(request.data["materias_json"]))
-            maestro.save()
+            # Vacío como NULL: no choca con el índice único
+            identificadores = {"id_trabajador": request.data["id_trabajador"] or None}
+            try:
+                # Usuario, rol y perfil con un INSERT cada uno. Los índices únicos
+                # resuelven dos altas simultáneas con el mismo email o ID de trabajador
+                maestro = registrar_perfil(Maestros, request.data, {
+                    "fecha_nacimiento": request.data["fecha_nacimiento"],
+                    "telefono": request.data["telefono"],
+                    "rfc": request.data["rfc"].upper(),
+                    "cubiculo": request.data["cubiculo"],
+                    "area_investigacion": request.data["area_investigacion"],
+                    "materias_json": json.dumps(request.data["materias_json"]),
+                    **identificadores,
+                })
+            except IntegrityError:
+                return respuesta_duplicados(Maestros, identificadores, email=email)
             return Response({"Maestro creado con ID= ": maestro.id }, 201)
         return Response(user.errors, status=status.HTTP_400_BAD_REQUEST)
     
     # Actualizar datos del maestro
-    @transaction.atomic
     def put(self, request, *args, **kwargs):
         # Primero obtenemos el maestro a actualizar
         maestro = get_object_or_404(Maestros, id=request.data["id"])
-        maestro.id_trabajador = request.data["id_trabajador"]
+        maestro.id_trabajador = request.data["id_trabajador"] or None
         maestro.fecha_nacimiento = request.data["fecha_nacimiento"]
         maestro.telefono = request.data["telefono"]
         maestro.rfc = request.data["rfc"].upper()
         maestro.cubiculo = request.data["cubiculo"]
         maestro.area_investigacion = request.data["area_investigacion"]
         maestro.materias_json = json.dumps(request.data["materias_json"])
-        maestro.save()
-        # Actualizamos los datos del usuario asociado (tabla auth_user de Django)
-        user = maestro.user
-        user.first_name = request.data["first_name"]
-        user.last_name = request.data["last_name"]
-        user.save()
+        try:
+            with transaction.atomic():
+                maestro.save()
+                # Actualizamos los datos del usuario asociado (tabla auth_user de Django)
+                user = maestro.user
+                user.first_name = request.data["first_name"]
+                user.last_name = request.data["last_name"]
+                user.save()
+        except IntegrityError:
+            # El ID de trabajador nuevo ya es de otro maestro
+            return respuesta_duplicados(Maestros, {"id_trabajador": maestro.id_trabajador}, excluir_id=maestro.id)
         
         return Response({"message": "Maestro actualizado correctamente", "maestro": MaestroSerializer(maestro).data}, 200)
     
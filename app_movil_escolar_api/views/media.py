@@ -0,0 +1,221 @@
+import os
+import re
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import default_storage
+from django.http import FileResponse, HttpResponse, HttpResponseRedirect
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, parse_http_date_safe
+from rest_framework import permissions
+from rest_framework import status
+from rest_framework.negotiation import BaseContentNegotiation
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from ..metrics import registry
+
+# Extensión -> content type de lo que se puede servir
+MEDIA_TYPES = {
+    ".mp4": "video/mp4",
+    ".m4v": "video/x-m4v",
+    ".webm": "video/webm",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".png": "image/png",
+    ".webp": "image/webp",
+}
+
+# Status -> resultado en media_requests_total
+RESULTADOS = {
+    200: "full",
+    206: "partial",
+    302: "redirect",
+    304: "not_modified",
+    412: "precondition_failed",
+    416: "unsatisfiable",
+}
+
+# Un solo rango: bytes=inicio-fin, bytes=inicio- o bytes=-sufijo
+RANGO = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class SinNegociacion(BaseContentNegotiation):
+    """
+    Los reproductores mandan Accept: video/*; la respuesta es el archivo, no
+    algo que DRF renderice, así que no se negocia
+    """
+
+    def select_parser(self, request, parsers):
+        return parsers[0] if parsers else None
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        return (renderers[0], renderers[0].media_type)
+
+
+class Rango:
+    """
+    Archivo abierto limitado a `largo` bytes desde `inicio`. Conserva
+    fileno(): con wsgi.file_wrapper (gunicorn) el servidor manda el rango
+    con sendfile desde la posición actual y hasta el Content-Length, sin
+    pasar los bytes por Python. Sin él, FileResponse lo lee por bloques.
+    """
+
+    def __init__(self, archivo, inicio, largo):
+        self.archivo = archivo
+        self.restante = largo
+        archivo.seek(inicio)
+
+    def read(self, size=-1):
+        if size is None or size < 0 or size > self.restante:
+            size = self.restante
+        datos = self.archivo.read(size)
+        self.restante -= len(datos)
+        return datos
+
+    def fileno(self):
+        return self.archivo.fileno()
+
+    def tell(self):
+        return self.archivo.tell()
+
+    def seek(self, *args):
+        return self.archivo.seek(*args)
+
+    def close(self):
+        self.archivo.close()
+
+
+def leer_rango(encabezado, tamano):
+    """
+    (inicio, fin) inclusivos del header Range, "invalido" si no se puede
+    cumplir (416) o None si no hay rango que atender (respuesta completa).
+    Varios rangos o una sintaxis que no se entiende se ignoran, como permite
+    el RFC 9110: los reproductores piden uno a la vez.
+    """
+    if not encabezado:
+        return None
+    m = RANGO.match(encabezado.replace(" ", ""))
+    if m is None or m.groups() == ("", ""):
+        return None
+    inicio, fin = m.groups()
+    if inicio == "":
+        # Los últimos `fin` bytes
+        sufijo = int(fin)
+        if sufijo == 0 or tamano == 0:
+            return "invalido"
+        return max(tamano - sufijo, 0), tamano - 1
+    inicio = int(inicio)
+    fin = tamano - 1 if fin == "" else min(int(fin), tamano - 1)
+    if inicio >= tamano or inicio > fin:
+        return "invalido"
+    return inicio, fin
+
+
+def _no_existe():
+    return Response(
+        {"message": "No existe el archivo"}, status=status.HTTP_404_NOT_FOUND
+    )
+
+
+def _contar(status_code, largo=0):
+    resultado = RESULTADOS[status_code]
+    registry.inc("media_requests_total", {"result": resultado})
+    if largo:
+        registry.inc("media_bytes_total", {"result": resultado}, largo)
+
+
+def _if_range_vigente(request, etag, modificado):
+    # If-Range: el rango solo vale si el archivo sigue siendo el mismo; si
+    # cambió se manda completo
+    valor = request.headers.get("If-Range")
+    if not valor:
+        return True
+    if valor.startswith(('"', 'W/"')):
+        return valor == etag
+    fecha = parse_http_date_safe(valor)
+    return fecha is not None and int(modificado) <= fecha
+
+
+class MediaView(APIView):
+    """
+    Sirve un archivo del storage (videos, fotos y banners) con soporte de
+    Range: el reproductor puede adelantar o retroceder sin descargar todo.
+    - 206 con el rango pedido, 416 si está fuera del archivo
+    - ETag y Last-Modified: 304 con If-None-Match / If-Modified-Since
+    - Con un storage remoto (GCS) redirige a su URL, que ya atiende Range
+    """
+
+    permission_classes = (permissions.IsAuthenticated,)
+    content_negotiation_class = SinNegociacion
+
+    def get(self, request, nombre, *args, **kwargs):
+        content_type = MEDIA_TYPES.get(os.path.splitext(nombre)[1].lower())
+        if content_type is None:
+            return _no_existe()
+        try:
+            ruta = default_storage.path(nombre)
+        except NotImplementedError:
+            # Sin archivo local: el storage (o su CDN) sirve los rangos
+            _contar(302)
+            return HttpResponseRedirect(default_storage.url(nombre))
+        except SuspiciousFileOperation:
+            return _no_existe()
+
+        try:
+            archivo = open(ruta, "rb")
+        except (FileNotFoundError, IsADirectoryError):
+            return _no_existe()
+        # Tamaño y fecha del archivo abierto, no de la ruta (puede cambiar)
+        info = os.fstat(archivo.fileno())
+        etag = f'"{info.st_size:x}-{info.st_mtime_ns:x}"'
+
+        encabezados = HttpResponse(status=200)
+        encabezados["ETag"] = etag
+        encabezados["Last-Modified"] = http_date(info.st_mtime)
+        encabezados["Accept-Ranges"] = "bytes"
+        patch_cache_control(
+            encabezados, private=True, max_age=settings.MEDIA_STREAM_MAX_AGE
+        )
+        condicional = get_conditional_response(
+            request,
+            etag=etag,
+            last_modified=int(info.st_mtime),
+            response=encabezados,
+        )
+        if condicional is not encabezados:
+            # 304 o 412: sin cuerpo
+            archivo.close()
+            _contar(condicional.status_code)
+            return condicional
+
+        rango = None
+        if _if_range_vigente(request, etag, info.st_mtime):
+            rango = leer_rango(request.headers.get("Range"), info.st_size)
+        if rango == "invalido":
+            archivo.close()
+            _contar(416)
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{info.st_size}"
+            response["Accept-Ranges"] = "bytes"
+            return response
+
+        if rango is None:
+            inicio, largo, codigo = 0, info.st_size, 200
+        else:
+            inicio, largo, codigo = rango[0], rango[1] - rango[0] + 1, 206
+        response = FileResponse(
+            Rango(archivo, inicio, largo),
+            status=codigo,
+            content_type=content_type,
+        )
+        response.block_size = settings.MEDIA_STREAM_CHUNK_SIZE
+        for encabezado in ("ETag", "Last-Modified", "Accept-Ranges", "Cache-Control"):
+            response[encabezado] = encabezados[encabezado]
+        response["Content-Length"] = str(largo)
+        if codigo == 206:
+            response["Content-Range"] = (
+                f"bytes {inicio}-{inicio + largo - 1}/{info.st_size}"
+            )
+        _contar(codigo, largo)
+        return response
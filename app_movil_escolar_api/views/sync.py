@@ -0,0 +1,54 @@
+from django.conf import settings
+from rest_framework import generics
+from rest_framework import permissions
+from rest_framework import status
+from rest_framework.response import Response
+
+from ..sync import ENTIDADES, cambios_desde
+
+
+class CambiosDesdeView(generics.CreateAPIView):
+    """
+    Sincronización incremental para la app sin conexión.
+    - GET ?cursor=N: cambios posteriores al cursor (0 = todo)
+    - ?entities=alumnos,eventos: entidades a sincronizar (por defecto todas)
+    - ?limit=500: máximo de objetos por respuesta; con has_more=true se
+      vuelve a pedir con el cursor recibido
+    """
+
+    permission_classes = (permissions.IsAuthenticated,)
+
+    def get(self, request, *args, **kwargs):
+        try:
+            cursor = int(request.GET.get("cursor", 0))
+            limite = int(request.GET.get("limit", settings.SYNC_PAGE_SIZE))
+        except ValueError:
+            return Response(
+                {"message": "'cursor' y 'limit' deben ser enteros"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if cursor < 0 or not 1 <= limite <= settings.SYNC_MAX_PAGE_SIZE:
+            return Response(
+                {
+                    "message": "'cursor' debe ser >= 0 y 'limit' estar entre 1 y "
+                    f"{settings.SYNC_MAX_PAGE_SIZE}"
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        entidades = [
+            e.strip() for e in request.GET.get("entities", "").split(",") if e.strip()
+        ] or list(ENTIDADES)
+        desconocidas = [e for e in entidades if e not in ENTIDADES]
+        if desconocidas:
+            return Response(
+                {
+                    "message": "Entidades desconocidas: " + ", ".join(desconocidas),
+                    "entities": list(ENTIDADES),
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        return Response(
+            cambios_desde(cursor, entidades, limite), status=status.HTTP_200_OK
+        )
@@ -1,14 +1,14 @@
-from django.db.models import *
-from django.db import transaction
-from app_movil_escolar_api.serializers import UserSerializer
-from app_movil_escolar_api.serializers import *
-from app_movil_escolar_api.models import *
+from django.db import IntegrityError, transaction
+from app_movil_escolar_api.serializers import AdminSerializer, AdminValuesSerializer
+from app_movil_escolar_api.models import Administradores, Alumnos, Maestros
+from app_movil_escolar_api.caching import detalle, get_or_compute, usuario_en
+from app_movil_escolar_api.registro import registrar_perfil, respuesta_duplicados
 from rest_framework import permissions
 from rest_framework import generics
 from rest_framework import status
 from rest_framework.response import Response
-from django.contrib.auth.models import Group
-import json
+from django.conf import settings
+from django.contrib.auth.models import User
 from django.shortcuts import get_object_or_404
 
 
@@ -19,7 +19,10 @@ class AdminAll(generics.CreateAPIView):
     # Invocamos la petición GET para obtener todos los administradores
     def get(self, request, *args, **kwargs):
         admin = Administradores.objects.filter(user__is_active=1).order_by("id")
-        lista = AdminSerializer(admin, many=True).data
+        # ?fields=id,clave_admin&expand=user limita columnas y anidados
+        seleccion = AdminValuesSerializer.select_from(request)
+        # Solo lectura: values_list() en lugar de AdminSerializer(many=True)
+        lista = AdminValuesSerializer(admin, seleccion).data
         return Response(lista, 200)
 
 
@@ -38,13 +41,24 @@ class AdminView(generics.CreateAPIView):
 
     # Obtener usuario por ID
     def get(self, request, *args, **kwargs):
-        admin = get_object_or_404(Administradores, id=request.GET.get("id"))
-        admin = AdminSerializer(admin, many=False).data
+        seleccion = AdminValuesSerializer.select_from(request)
+        admins = AdminValuesSerializer.narrow(Administradores.objects.all(), seleccion)
+        # En caché por id y selección hasta que cambie el admin o su usuario
+        admin = detalle(
+            "admin",
+            request.GET.get("id"),
+            seleccion,
+            lambda: AdminSerializer(
+                get_object_or_404(admins, id=request.GET.get("id")),
+                many=False,
+                fields=seleccion,
+            ).data,
+            dependencias=usuario_en("user"),
+        )
         # Si todo es correcto, regresamos la información
         return Response(admin, 200)
 
     # Registrar nuevo administrador
-    @transaction.atomic
     def post(self, request, *args, **kwargs):
         try:
             # Validar que vengan todos los campos requeridos
@@ -68,49 +82,29 @@ class AdminView(generics.CreateAPIView):
                         status=status.HTTP_400_BAD_REQUEST,
                     )
 
-            # Obtener datos del request
-            role = request.data["rol"]
-            first_name = request.data["first_name"]
-            last_name = request.data["last_name"]
             email = request.data["email"]
-            password = request.data["password"]
 
-            # Validar si existe el usuario o bien el email registrado
-            existing_user = User.objects.filter(email=email).first()
-            if existing_user:
+            # Validar si existe el usuario o bien el email registrado (antes de
+            # cifrar la contraseña)
+            if User.objects.filter(email=email).exists():
                 return Response(
                     {"message": f"El email {email} ya está registrado"},
                     status=status.HTTP_400_BAD_REQUEST,
                 )
 
-            # Crear el usuario en la tabla auth_user
-            user = User.objects.create(
-                username=email,
-                email=email,
-                first_name=first_name,
-                last_name=last_name,
-                is_active=1,
-            )
-
-            # Cifrar la contraseña
-            user.set_password(password)
-            user.save()
-
-            # Asignar el grupo/rol al usuario
-            group, created = Group.objects.get_or_create(name=role)
-            group.user_set.add(user)
-            user.save()
-
-            # Almacenar los datos adicionales del administrador
-            admin = Administradores.objects.create(
-                user=user,
-                clave_admin=request.data["clave_admin"],
-                telefono=request.data["telefono"],
-                rfc=request.data["rfc"].upper(),
-                edad=request.data["edad"],
-                ocupacion=request.data["ocupacion"],
+            # Usuario, rol y perfil con un INSERT cada uno. El índice único de
+            # email resuelve dos altas simultáneas: la segunda cae en IntegrityError
+            admin = registrar_perfil(
+                Administradores,
+                request.data,
+                {
+                    "clave_admin": request.data["clave_admin"],
+                    "telefono": request.data["telefono"],
+                    "rfc": request.data["rfc"].upper(),
+                    "edad": request.data["edad"],
+                    "ocupacion": request.data["ocupacion"],
+                },
             )
-            admin.save()
 
             return Response(
                 {
@@ -120,6 +114,9 @@ class AdminView(generics.CreateAPIView):
                 status=status.HTTP_201_CREATED,
             )
 
+        except IntegrityError:
+            return respuesta_duplicados(Administradores, {}, email=email)
+
         except Exception as e:
             # Si algo sale mal, revertir la transacción
             return Response(
@@ -195,24 +192,34 @@ class TotalUsers(generics.CreateAPIView):
     # Sólo usuarios autenticados pueden acceder a las estadísticas
     permission_classes = (permissions.IsAuthenticated,)
 
-    def get(self, request, *args, **kwargs):
-        try:
-            # TOTAL ADMINISTRADORES (Usuarios activos)
-            total_admins = Administradores.objects.filter(user__is_active=True).count()
+    @staticmethod
+    def conteos():
+        # TOTAL ADMINISTRADORES (Usuarios activos)
+        total_admins = Administradores.objects.filter(user__is_active=True).count()
+
+        # TOTAL MAESTROS (Usuarios activos)
+        total_maestros = Maestros.objects.filter(user__is_active=True).count()
 
-            # TOTAL MAESTROS (Usuarios activos)
-            total_maestros = Maestros.objects.filter(user__is_active=True).count()
+        # TOTAL ALUMNOS (Usuarios activos)
+        total_alumnos = Alumnos.objects.filter(user__is_active=True).count()
 
-            # TOTAL ALUMNOS (Usuarios activos)
-            total_alumnos = Alumnos.objects.filter(user__is_active=True).count()
+        return {
+            "admins": total_admins,
+            "maestros": total_maestros,
+            "alumnos": total_alumnos,
+        }
 
-            # Respuesta final con los conteos
+    def get(self, request, *args, **kwargs):
+        try:
+            # Respuesta final con los conteos; en caché hasta que cambie un
+            # perfil o usuario (el scheduler la mantiene caliente)
             return Response(
-                {
-                    "admins": total_admins,
-                    "maestros": total_maestros,
-                    "alumnos": total_alumnos,
-                },
+                get_or_compute(
+                    "estadisticas",
+                    "totales",
+                    self.conteos,
+                    settings.ESTADISTICAS_CACHE_TTL,
+                ),
                 status=status.HTTP_200_OK,
             )
 
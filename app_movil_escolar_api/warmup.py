@@ -0,0 +1,79 @@
+import logging
+import time
+
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+# Pasos de calentamiento registrados (nombre, función) en orden de registro
+_steps = []
+
+
+def register_step(name):
+    """
+    Decorador para registrar un paso de calentamiento de la instancia
+    """
+
+    def decorator(func):
+        _steps.append((name, func))
+        return func
+
+    return decorator
+
+
+def run_warmup():
+    """
+    Ejecuta todos los pasos registrados y regresa el tiempo (ms) de cada uno.
+    Un paso que falla no detiene a los demás.
+    """
+    timings = {}
+    for name, func in _steps:
+        inicio = time.perf_counter()
+        try:
+            func()
+        except Exception as e:
+            logger.warning("Paso de warmup '%s' falló: %s", name, e)
+        timings[name] = round((time.perf_counter() - inicio) * 1000, 2)
+    return timings
+
+
+@register_step("db")
+def _prime_db_connections():
+    # Abre la conexión de cada base configurada y hace un viaje de ida y vuelta
+    for alias in connections:
+        with connections[alias].cursor() as cursor:
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+
+
+@register_step("urls")
+def _prime_url_resolver():
+    # Importa urls.py (y con él todas las vistas y serializers)
+    from django.urls import get_resolver
+
+    get_resolver().url_patterns
+
+
+@register_step("serializers")
+def _prime_serializers():
+    # Construye una vez los campos de cada ModelSerializer para cargar los
+    # módulos de DRF que se importan de forma perezosa
+    from app_movil_escolar_api import serializers
+
+    for serializer_class in (
+        serializers.AdminSerializer,
+        serializers.AlumnoSerializer,
+        serializers.MaestroSerializer,
+        serializers.EventoAcademicoSerializer,
+    ):
+        serializer_class().fields
+
+
+@register_step("auth")
+def _prime_auth():
+    # Carga los grupos (roles) y el modelo de tokens usados en login
+    from django.contrib.auth.models import Group
+    from rest_framework.authtoken.models import Token
+
+    list(Group.objects.values_list("id", "name"))
+    Token.objects.exists()
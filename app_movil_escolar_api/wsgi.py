@@ -14,3 +14,30 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'app_movil_escolar_api.settings')
 
 application = get_wsgi_application()
+
+from django.conf import settings
+
+if settings.WARMUP_ON_START:
+    from app_movil_escolar_api.warmup import run_warmup
+
+    run_warmup()
+
+    # Con --preload esto corre en el master: los workers no deben heredar
+    # las conexiones a la base que abrió el warmup
+    from django.db import connections
+
+    from app_movil_escolar_api.db_pool.pool import cerrar_pools
+
+    connections.close_all()
+    cerrar_pools()
+
+if settings.SCHEDULER_IN_PROCESS:
+    from app_movil_escolar_api.scheduler import iniciar_en_hilo
+
+    _django_application = application
+
+    def application(environ, start_response):
+        # Con la primera petición de cada worker: con --preload este módulo
+        # se carga en el master y el hilo no pasaría a los workers
+        iniciar_en_hilo()
+        return _django_application(environ, start_response)
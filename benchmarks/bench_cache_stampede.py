@@ -0,0 +1,161 @@
+"""
+Benchmark de estampida de caché: muchos hilos leyendo una llave que vence.
+
+Varios hilos piden la lista de eventos (la misma consulta y serializer que
+lista-eventos, desde la base de DATABASE_URL) durante unos segundos, con un
+TTL corto para que la llave venza varias veces. Compara tres estrategias:
+
+- sin_cache: cada lectura va a la base
+- get_set: cache.get() y, si no está, calcular y cache.set(); al vencer
+  todos los hilos recalculan a la vez
+- get_or_compute: caching.get_or_compute() con single-flight y expiración
+  anticipada
+
+Reporta en JSON lecturas, recálculos, recálculos simultáneos máximos y las
+latencias p50/p99.
+
+Uso:
+    DATABASE_URL=sqlite:////tmp/seed.db DATABASE_SSL_REQUIRE=False \\
+        python benchmarks/bench_cache_stampede.py --threads 32 --rows 5000
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "app_movil_escolar_api.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.core.cache import caches  # noqa: E402
+from django.db import connections  # noqa: E402
+
+from app_movil_escolar_api import caching  # noqa: E402
+from app_movil_escolar_api.models import EventoAcademico  # noqa: E402
+from app_movil_escolar_api.serializers import (  # noqa: E402
+    EventoAcademicoValuesSerializer,
+)
+
+
+class Contador:
+    """
+    Recálculos totales y cuántos corrieron a la vez como máximo
+    """
+
+    def __init__(self, filas):
+        self.filas = filas
+        self.lock = threading.Lock()
+        self.total = 0
+        self.en_curso = 0
+        self.maximo = 0
+
+    def calcular(self):
+        with self.lock:
+            self.total += 1
+            self.en_curso += 1
+            self.maximo = max(self.maximo, self.en_curso)
+        try:
+            eventos = EventoAcademico.objects.order_by(
+                "-fecha_realizacion", "-hora_inicio"
+            )[: self.filas]
+            return EventoAcademicoValuesSerializer(eventos).data
+        finally:
+            with self.lock:
+                self.en_curso -= 1
+
+
+def estrategias(ttl):
+    cache = caches["default"]
+
+    def sin_cache(contador):
+        return contador.calcular()
+
+    def get_set(contador):
+        valor = cache.get("bench:eventos")
+        if valor is None:
+            valor = contador.calcular()
+            cache.set("bench:eventos", valor, ttl)
+        return valor
+
+    def get_or_compute(contador):
+        return caching.get_or_compute(
+            "bench", "eventos", contador.calcular, ttl, beta=1.0
+        )
+
+    return {
+        "sin_cache": sin_cache,
+        "get_set": get_set,
+        "get_or_compute": get_or_compute,
+    }
+
+
+def correr(leer, hilos, segundos, filas):
+    caches["default"].clear()
+    contador = Contador(filas)
+    latencias = [[] for _ in range(hilos)]
+    fin = time.monotonic() + segundos
+
+    def hilo(mias):
+        try:
+            while time.monotonic() < fin:
+                inicio = time.perf_counter()
+                leer(contador)
+                mias.append(time.perf_counter() - inicio)
+        finally:
+            connections.close_all()
+
+    trabajadores = [threading.Thread(target=hilo, args=(l,)) for l in latencias]
+    for t in trabajadores:
+        t.start()
+    for t in trabajadores:
+        t.join()
+
+    todas = sorted(x for l in latencias for x in l)
+    return {
+        "reads": len(todas),
+        "recomputes": contador.total,
+        "max_concurrent_recomputes": contador.maximo,
+        "p50_ms": round(statistics.median(todas) * 1000, 3),
+        "p99_ms": round(todas[int(len(todas) * 0.99) - 1] * 1000, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--rows", type=int, default=5000, help="Eventos en la lista")
+    parser.add_argument("--ttl", type=int, default=1, help="TTL de la llave (s)")
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--output", help="Archivo JSON de salida (por defecto stdout)")
+    args = parser.parse_args()
+
+    resultados = {}
+    for nombre, leer in estrategias(args.ttl).items():
+        resultados[nombre] = correr(leer, args.threads, args.seconds, args.rows)
+
+    reporte = {
+        "threads": args.threads,
+        "rows": args.rows,
+        "ttl": args.ttl,
+        "seconds": args.seconds,
+        "python": sys.version.split()[0],
+        "results": resultados,
+    }
+    salida = json.dumps(reporte, indent=2)
+    if args.output:
+        Path(args.output).write_text(salida + "\n")
+    else:
+        print(salida)
+
+
+if __name__ == "__main__":
+    main()
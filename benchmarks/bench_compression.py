@@ -0,0 +1,147 @@
+"""
+Benchmark de compresión de respuestas: costo de CPU contra bytes ahorrados.
+
+Arma payloads reales (lista-alumnos, lista-maestros y lista-eventos con
+distintos números de filas) desde la base configurada (DATABASE_URL, sembrada
+con `manage.py seed_data`), los comprime con cada codec disponible (gzip y,
+si están instalados, brotli y zstd) en varios niveles y reporta en JSON el
+tamaño final, la razón, el tiempo de compresión y los ms de CPU por cada
+100 KB ahorrados.
+
+Uso:
+    DATABASE_URL=sqlite:////tmp/seed.db DATABASE_SSL_REQUIRE=False \\
+        python benchmarks/bench_compression.py --sizes 1,10,100,1000,10000
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "app_movil_escolar_api.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from app_movil_escolar_api import compression  # noqa: E402
+from app_movil_escolar_api.models import (  # noqa: E402
+    Alumnos,
+    EventoAcademico,
+    Maestros,
+)
+from app_movil_escolar_api.renderers import FastJSONRenderer  # noqa: E402
+from app_movil_escolar_api.serializers import (  # noqa: E402
+    AlumnoValuesSerializer,
+    EventoAcademicoValuesSerializer,
+    MaestroValuesSerializer,
+)
+
+# Mismos querysets y serializers que las vistas de lista
+PAYLOADS = {
+    "lista-alumnos": lambda n: AlumnoValuesSerializer(
+        Alumnos.objects.filter(user__is_active=1).order_by("id")[:n]
+    ).data,
+    "lista-maestros": lambda n: MaestroValuesSerializer(
+        Maestros.objects.filter(user__is_active=1).order_by("id")[:n]
+    ).data,
+    "lista-eventos": lambda n: EventoAcademicoValuesSerializer(
+        EventoAcademico.objects.order_by("-fecha_realizacion", "-hora_inicio")[:n]
+    ).data,
+}
+
+NIVELES = {"gzip": (1, 6, 9), "br": (1, 4, 6, 11), "zstd": (1, 3, 9, 19)}
+CODECS = {
+    "gzip": compression.GzipCodec,
+    "br": compression.BrotliCodec,
+    "zstd": compression.ZstdCodec,
+}
+DISPONIBLES = {
+    "gzip": True,
+    "br": compression.brotli is not None,
+    "zstd": compression.zstandard is not None,
+}
+
+
+def median_ms(fn, runs):
+    tiempos = []
+    for _ in range(runs):
+        inicio = time.perf_counter()
+        fn()
+        tiempos.append(time.perf_counter() - inicio)
+    return statistics.median(tiempos) * 1000
+
+
+def bench_payload(body, runs):
+    resultados = []
+    for nombre, niveles in NIVELES.items():
+        if not DISPONIBLES[nombre]:
+            continue
+        for nivel in niveles:
+            codec = CODECS[nombre](nivel)
+            comprimido = codec.compress(body)
+            # Menos corridas para los niveles lentos con payloads grandes
+            ms = median_ms(lambda: codec.compress(body), runs if nivel < 10 else 1)
+            ahorro = len(body) - len(comprimido)
+            resultados.append(
+                {
+                    "codec": nombre,
+                    "level": nivel,
+                    "bytes": len(comprimido),
+                    "ratio": round(len(body) / len(comprimido), 2),
+                    "ms": round(ms, 3),
+                    "mb_per_s": round(len(body) / 1e6 / (ms / 1000), 1) if ms else None,
+                    "ms_per_100kb_saved": (
+                        round(ms / (ahorro / 100_000), 3) if ahorro > 0 else None
+                    ),
+                }
+            )
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--sizes", default="1,10,100,1000,10000", help="Filas por payload"
+    )
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument(
+        "--only", choices=sorted(PAYLOADS), action="append", help="Payloads a medir"
+    )
+    parser.add_argument("--output", help="Archivo JSON de salida (por defecto stdout)")
+    args = parser.parse_args()
+
+    renderer = FastJSONRenderer()
+    resultados = []
+    for nombre in args.only or PAYLOADS:
+        for filas in [int(s) for s in args.sizes.split(",")]:
+            body = renderer.render(PAYLOADS[nombre](filas))
+            resultados.append(
+                {
+                    "payload": nombre,
+                    "rows": filas,
+                    "bytes": len(body),
+                    "codecs": bench_payload(body, args.runs),
+                }
+            )
+
+    reporte = {
+        "runs": args.runs,
+        "python": sys.version.split()[0],
+        "available": [n for n, ok in DISPONIBLES.items() if ok],
+        "results": resultados,
+    }
+    salida = json.dumps(reporte, indent=2)
+    if args.output:
+        Path(args.output).write_text(salida + "\n")
+    else:
+        print(salida)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Benchmark de codificación y decodificación JSON: el JSONRenderer/JSONParser
+de DRF (json de la stdlib) contra FastJSONRenderer/FastJSONParser (orjson).
+
+Usa payloads reales de lista-eventos armados desde la base configurada
+(DATABASE_URL, sembrada con `manage.py seed_data`), verifica que ambos
+renderers produzcan los mismos bytes y que ambos parsers regresen los
+mismos datos, y reporta en JSON los tiempos por tamaño.
+
+Uso:
+    DATABASE_URL=sqlite:////tmp/seed.db DATABASE_SSL_REQUIRE=False \\
+        python benchmarks/bench_json.py --sizes 10,1000,10000 --runs 20
+"""
+
+import argparse
+import io
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "app_movil_escolar_api.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from rest_framework.parsers import JSONParser  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from app_movil_escolar_api import renderers  # noqa: E402
+from app_movil_escolar_api.models import EventoAcademico  # noqa: E402
+from app_movil_escolar_api.serializers import (  # noqa: E402
+    EventoAcademicoValuesSerializer,
+)
+
+
+def median_ms(fn, runs):
+    tiempos = []
+    for _ in range(runs):
+        inicio = time.perf_counter()
+        fn()
+        tiempos.append(time.perf_counter() - inicio)
+    return round(statistics.median(tiempos) * 1000, 3)
+
+
+def bench(size, runs):
+    # Mismo queryset y serializer que ListaEventosView
+    eventos = EventoAcademico.objects.order_by("-fecha_realizacion", "-hora_inicio")
+    data = EventoAcademicoValuesSerializer(eventos[:size]).data
+
+    drf_renderer, fast_renderer = JSONRenderer(), renderers.FastJSONRenderer()
+    drf_parser, fast_parser = JSONParser(), renderers.FastJSONParser()
+
+    body = drf_renderer.render(data)
+    fast_body = fast_renderer.render(data)
+    parsed = drf_parser.parse(io.BytesIO(body))
+    fast_parsed = fast_parser.parse(io.BytesIO(body))
+
+    encode_drf = median_ms(lambda: drf_renderer.render(data), runs)
+    encode_fast = median_ms(lambda: fast_renderer.render(data), runs)
+    decode_drf = median_ms(lambda: drf_parser.parse(io.BytesIO(body)), runs)
+    decode_fast = median_ms(lambda: fast_parser.parse(io.BytesIO(body)), runs)
+    return {
+        "rows": len(data),
+        "bytes": len(body),
+        "identical_bytes": body == fast_body,
+        "identical_data": parsed == fast_parsed,
+        "encode_drf_ms": encode_drf,
+        "encode_fast_ms": encode_fast,
+        "encode_speedup": round(encode_drf / encode_fast, 2) if encode_fast else None,
+        "decode_drf_ms": decode_drf,
+        "decode_fast_ms": decode_fast,
+        "decode_speedup": round(decode_drf / decode_fast, 2) if decode_fast else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--sizes",
+        default="10,1000,10000",
+        help="Eventos por payload, separados por coma",
+    )
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--output", help="Archivo JSON de salida (por defecto stdout)")
+    args = parser.parse_args()
+
+    if renderers.orjson is None:
+        raise SystemExit("orjson no está instalado; no hay nada que comparar")
+
+    resultados = [bench(int(s), args.runs) for s in args.sizes.split(",")]
+    reporte = {
+        "runs": args.runs,
+        "python": sys.version.split()[0],
+        "orjson": renderers.orjson.__version__,
+        "results": resultados,
+    }
+
+    salida = json.dumps(reporte, indent=2)
+    if args.output:
+        Path(args.output).write_text(salida + "\n")
+    else:
+        print(salida)
+    if not all(r["identical_bytes"] and r["identical_data"] for r in resultados):
+        raise SystemExit("orjson y DRF no coinciden")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Benchmark de serialización de las listas: ModelSerializer(many=True) contra
+la ruta rápida de solo lectura (ValuesSerializer sobre values_list()).
+
+Usa la base configurada (DATABASE_URL), que debe tener datos suficientes
+(`manage.py seed_data`). Verifica que ambos caminos produzcan exactamente los
+mismos bytes con el JSONRenderer de DRF y reporta en JSON el costo por fila.
+
+Uso:
+    DATABASE_URL=sqlite:////tmp/seed.db DATABASE_SSL_REQUIRE=False \\
+        python benchmarks/bench_serializers.py --rows 10000 --runs 5
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "app_movil_escolar_api.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from app_movil_escolar_api.models import (  # noqa: E402
+    Administradores,
+    Alumnos,
+    EventoAcademico,
+    Maestros,
+)
+from app_movil_escolar_api.serializers import (  # noqa: E402
+    AdminSerializer,
+    AdminValuesSerializer,
+    AlumnoSerializer,
+    AlumnoValuesSerializer,
+    EventoAcademicoSerializer,
+    EventoAcademicoValuesSerializer,
+    MaestroSerializer,
+    MaestroValuesSerializer,
+)
+
+# Mismos querysets que las vistas de lista
+LISTAS = {
+    "lista-admins": (
+        lambda: Administradores.objects.filter(user__is_active=1).order_by("id"),
+        AdminSerializer,
+        AdminValuesSerializer,
+    ),
+    "lista-alumnos": (
+        lambda: Alumnos.objects.filter(user__is_active=1).order_by("id"),
+        AlumnoSerializer,
+        AlumnoValuesSerializer,
+    ),
+    "lista-maestros": (
+        lambda: Maestros.objects.filter(user__is_active=1).order_by("id"),
+        MaestroSerializer,
+        MaestroValuesSerializer,
+    ),
+    "lista-eventos": (
+        lambda: EventoAcademico.objects.order_by("-fecha_realizacion", "-hora_inicio"),
+        EventoAcademicoSerializer,
+        EventoAcademicoValuesSerializer,
+    ),
+}
+
+# Las relaciones que cada ModelSerializer necesita para no caer en N+1
+RELACION = {"lista-eventos": "responsable_evento"}
+
+
+def timed(fn, runs):
+    tiempos = []
+    resultado = None
+    for _ in range(runs):
+        inicio = time.perf_counter()
+        resultado = fn()
+        tiempos.append(time.perf_counter() - inicio)
+    return statistics.median(tiempos), resultado
+
+
+def bench(nombre, rows, runs):
+    queryset, serializer, fast = LISTAS[nombre]
+    qs = queryset()[:rows]
+    relacion = RELACION.get(nombre, "user")
+    n = qs.count()
+
+    drf_s, drf_data = timed(
+        lambda: serializer(qs.select_related(relacion), many=True).data, runs
+    )
+    fast_s, fast_data = timed(lambda: fast(qs).data, runs)
+
+    renderer = JSONRenderer()
+    drf_bytes = renderer.render(drf_data)
+    fast_bytes = renderer.render(fast_data)
+    return {
+        "rows": n,
+        "identical": drf_bytes == fast_bytes,
+        "bytes": len(fast_bytes),
+        "drf_ms": round(drf_s * 1000, 2),
+        "fast_ms": round(fast_s * 1000, 2),
+        "drf_us_per_row": round(drf_s * 1e6 / max(n, 1), 2),
+        "fast_us_per_row": round(fast_s * 1e6 / max(n, 1), 2),
+        "speedup": round(drf_s / fast_s, 2) if fast_s else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument(
+        "--only", choices=sorted(LISTAS), action="append", help="Listas a medir"
+    )
+    parser.add_argument("--output", help="Archivo JSON de salida (por defecto stdout)")
+    args = parser.parse_args()
+
+    reporte = {
+        "rows": args.rows,
+        "runs": args.runs,
+        "python": sys.version.split()[0],
+        "results": {
+            nombre: bench(nombre, args.rows, args.runs)
+            for nombre in (args.only or LISTAS)
+        },
+    }
+    distintos = [n for n, r in reporte["results"].items() if not r["identical"]]
+
+    salida = json.dumps(reporte, indent=2)
+    if args.output:
+        Path(args.output).write_text(salida + "\n")
+    else:
+        print(salida)
+    if distintos:
+        raise SystemExit(f"La salida no es idéntica en: {', '.join(distintos)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Benchmark reproducible del arranque en frío de la API.
+
+Lanza N procesos nuevos de Python que cargan la aplicación WSGI y atienden
+una primera petición, y reporta (en JSON) el tiempo de cada fase junto con
+los módulos que más tardan en importarse (python -X importtime).
+
+Uso:
+    DATABASE_URL=sqlite:////tmp/bench.db DATABASE_SSL_REQUIRE=False \\
+        python benchmarks/bench_startup.py --runs 10 --path /_ah/warmup
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+# Código que corre en cada proceso hijo; imprime sus tiempos como JSON en stdout
+CHILD = """
+import json, sys, time
+t0 = time.perf_counter()
+from app_movil_escolar_api.wsgi import application
+t1 = time.perf_counter()
+from wsgiref.util import setup_testing_defaults
+environ = {"PATH_INFO": sys.argv[1], "REQUEST_METHOD": "GET"}
+setup_testing_defaults(environ)
+status = []
+body = b"".join(application(environ, lambda s, h, e=None: status.append(s)))
+t2 = time.perf_counter()
+print(json.dumps({
+    "import_ms": (t1 - t0) * 1000,
+    "first_request_ms": (t2 - t1) * 1000,
+    "status": status[0] if status else None,
+    "modules": len(sys.modules),
+}))
+"""
+
+
+def parse_importtime(stderr, top):
+    """
+    Regresa los módulos con mayor tiempo acumulado de importación
+    """
+    modulos = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, datos = line.split(":", 1)
+        self_us, cumulative_us, nombre = [d.strip() for d in datos.split("|")]
+        modulos.append(
+            {
+                "module": nombre,
+                "self_ms": int(self_us) / 1000,
+                "cumulative_ms": int(cumulative_us) / 1000,
+            }
+        )
+    modulos.sort(key=lambda m: m["cumulative_ms"], reverse=True)
+    return modulos[:top]
+
+
+def run_once(path):
+    env = dict(os.environ)
+    env.setdefault("DJANGO_SETTINGS_MODULE", "app_movil_escolar_api.settings")
+    inicio = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHILD, path],
+        cwd=BASE_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    total_ms = (time.perf_counter() - inicio) * 1000
+    if proc.returncode != 0:
+        # Sin la línea "import time:" queda el traceback real del hijo
+        errores = [l for l in proc.stderr.splitlines() if not l.startswith("import time:")]
+        raise SystemExit("\n".join(errores))
+    resultado = json.loads(proc.stdout.strip().splitlines()[-1])
+    resultado["process_ms"] = total_ms
+    return resultado, proc.stderr
+
+
+def summarize(valores):
+    return {
+        "median": round(statistics.median(valores), 2),
+        "min": round(min(valores), 2),
+        "max": round(max(valores), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--path", default="/_ah/warmup", help="URL de la primera petición")
+    parser.add_argument("--top", type=int, default=15, help="Módulos más lentos a reportar")
+    parser.add_argument("--output", help="Archivo JSON de salida (por defecto stdout)")
+    args = parser.parse_args()
+
+    corridas = []
+    stderr = ""
+    for _ in range(args.runs):
+        resultado, stderr = run_once(args.path)
+        corridas.append(resultado)
+
+    reporte = {
+        "runs": args.runs,
+        "python": sys.version.split()[0],
+        "path": args.path,
+        "status": corridas[-1]["status"],
+        "modules_loaded": corridas[-1]["modules"],
+        "process_ms": summarize([c["process_ms"] for c in corridas]),
+        "import_ms": summarize([c["import_ms"] for c in corridas]),
+        "first_request_ms": summarize([c["first_request_ms"] for c in corridas]),
+        "slowest_imports": parse_importtime(stderr, args.top),
+    }
+
+    salida = json.dumps(reporte, indent=2)
+    if args.output:
+        Path(args.output).write_text(salida + "\n")
+    else:
+        print(salida)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,526 @@
+"""
+Prueba de carga HTTP de punta a punta.
+
+Arranca la API con gunicorn sobre una base local (SQLite por defecto, o la
+que indique --database-url) sembrada con `manage.py seed_data`, la somete a
+una mezcla realista de peticiones (login, eventos-por-rol, lista-alumnos,
+CRUD de eventos, ...) con la concurrencia indicada y reporta en JSON el
+throughput y los percentiles p50/p95/p99 por endpoint, para comparar entre
+versiones.
+
+Uso:
+    python benchmarks/loadtest.py --concurrency 16 --duration 30 --output actual.json
+    python benchmarks/loadtest.py --compare actual.json       # contra una corrida previa
+    python benchmarks/loadtest.py --url http://127.0.0.1:8000  # servidor ya levantado
+    python benchmarks/loadtest.py --database-url postgres://postgres@127.0.0.1:5432/carga
+
+Nota: eventos-por-rol para alumnos y maestros filtra con JSONField `contains`,
+que SQLite no soporta. Sobre SQLite la mezcla por defecto no la incluye (y
+pedirla en --mix es un error); para medirla usa Postgres con --database-url.
+
+El servidor que arranca corre con RATELIMIT_ENABLED=False: toda la carga sale
+de una IP y el límite de login la cortaría en 429. Con --url se mide el
+servidor tal como esté configurado.
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from urllib.parse import urlsplit
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+# Operaciones que necesitan Postgres (JSONField `contains`)
+SOLO_POSTGRES = ("eventos-por-rol",)
+
+# Peso relativo de cada operación en la mezcla por defecto
+DEFAULT_MIX = {
+    "login": 5,
+    "eventos-por-rol": 35,
+    "lista-eventos": 15,
+    "lista-alumnos": 10,
+    "lista-maestros": 5,
+    "total-usuarios": 5,
+    "evento-get": 10,
+    "evento-create": 5,
+    "evento-update": 5,
+    "evento-delete": 5,
+}
+
+
+def percentile(valores, p):
+    """
+    Percentil por rango más cercano sobre una lista ya ordenada
+    """
+    if not valores:
+        return None
+    k = max(0, min(len(valores) - 1, int(round(p / 100 * len(valores) + 0.5)) - 1))
+    return valores[k]
+
+
+class Client:
+    """
+    Cliente HTTP con conexión keep-alive (uno por hilo)
+    """
+
+    def __init__(self, base_url, timeout):
+        partes = urlsplit(base_url)
+        self.host = partes.hostname
+        self.port = partes.port or 80
+        self.timeout = timeout
+        self.conn = None
+        self.token = None
+
+    def request(self, method, path, body=None):
+        headers = {"Accept": "application/json"}
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        if body is not None:
+            body = json.dumps(body)
+            headers["Content-Type"] = "application/json"
+        for intento in range(2):
+            if self.conn is None:
+                self.conn = http.client.HTTPConnection(
+                    self.host, self.port, timeout=self.timeout
+                )
+            try:
+                self.conn.request(method, path, body=body, headers=headers)
+                resp = self.conn.getresponse()
+                data = resp.read()
+                return resp.status, data
+            except (http.client.HTTPException, OSError):
+                # El servidor cerró la conexión keep-alive; reintenta una vez
+                self.conn.close()
+                self.conn = None
+                if intento:
+                    raise
+
+
+class VirtualUser:
+    """
+    Usuario simulado: inicia sesión con una cuenta sembrada y ejecuta la mezcla
+    """
+
+    def __init__(self, runner, index):
+        self.runner = runner
+        self.rng = random.Random(runner.seed + index)
+        self.client = Client(runner.base_url, runner.timeout)
+        self.admin = Client(runner.base_url, runner.timeout)
+        self.credentials = runner.account(self.rng)
+        self.admin_credentials = runner.account(self.rng, "administrador")
+        self.admin_id = None
+        self.eventos = []
+
+    def login(self, client, credentials):
+        status, data = self.timed("login", client, "POST", "/login/", credentials)
+        if status == 200:
+            payload = json.loads(data)
+            client.token = payload["token"]
+            return payload
+        return None
+
+    def setup(self):
+        self.login(self.client, self.credentials)
+        admin = self.login(self.admin, self.admin_credentials)
+        if admin:
+            self.admin_id = admin["id"]
+
+    def timed(self, name, client, method, path, body=None):
+        inicio = time.perf_counter()
+        try:
+            status, data = client.request(method, path, body)
+        except (http.client.HTTPException, OSError) as e:
+            self.runner.record(
+                name, time.perf_counter() - inicio, f"error:{type(e).__name__}"
+            )
+            return None, b""
+        self.runner.record(name, time.perf_counter() - inicio, status)
+        return status, data
+
+    def evento_payload(self):
+        fecha = date.today() + timedelta(days=self.rng.randint(1, 180))
+        return {
+            "nombre_evento": f"Carga {self.rng.randint(1, 10**6)}",
+            "tipo_evento": "Taller",
+            "fecha_realizacion": fecha.isoformat(),
+            "hora_inicio": "10:00",
+            "hora_fin": "12:00",
+            "lugar": "Auditorio",
+            "publico_objetivo": ["Estudiantes", "Público general"],
+            "programa_educativo": "Licenciatura en Ingeniería de Software",
+            "responsable_evento_id": self.admin_id,
+            "descripcion_breve": "Evento de prueba de carga.",
+            "cupo_maximo": 50,
+        }
+
+    def step(self, op):
+        if op == "login":
+            self.login(
+                Client(self.runner.base_url, self.runner.timeout), self.credentials
+            )
+        elif op in ("eventos-por-rol", "lista-eventos", "total-usuarios"):
+            self.timed(op, self.client, "GET", f"/{op}/")
+        elif op in ("lista-alumnos", "lista-maestros"):
+            self.timed(op, self.admin, "GET", f"/{op}/")
+        elif op == "evento-create" or not self.eventos:
+            status, data = self.timed(
+                "evento-create",
+                self.admin,
+                "POST",
+                "/eventos-academicos/",
+                self.evento_payload(),
+            )
+            if status == 201:
+                self.eventos.append(json.loads(data)["evento_id"])
+        elif op == "evento-get":
+            evento = self.rng.choice(self.eventos)
+            self.timed(op, self.client, "GET", f"/eventos-academicos/?id={evento}")
+        elif op == "evento-update":
+            evento = self.rng.choice(self.eventos)
+            self.timed(
+                op,
+                self.admin,
+                "PUT",
+                "/eventos-academicos/",
+                {"id": evento, "cupo_maximo": self.rng.randint(10, 999)},
+            )
+        elif op == "evento-delete":
+            evento = self.eventos.pop(self.rng.randrange(len(self.eventos)))
+            self.timed(op, self.admin, "DELETE", f"/eventos-academicos/?id={evento}")
+
+    def run(self, deadline, remaining):
+        ops = list(self.runner.mix)
+        pesos = [self.runner.mix[o] for o in ops]
+        while time.perf_counter() < deadline and remaining():
+            self.step(self.rng.choices(ops, weights=pesos)[0])
+
+
+class Runner:
+    def __init__(self, args, base_url):
+        self.base_url = base_url
+        self.seed = args.seed
+        self.timeout = args.timeout
+        self.mix = args.mix
+        self.sizes = {
+            "alumno": args.alumnos,
+            "maestro": args.maestros,
+            "administrador": args.admins,
+        }
+        self.domain = args.domain
+        self.password = args.password
+        self.lock = threading.Lock()
+        self.samples = {}
+        self.statuses = {}
+        self.budget = args.requests
+
+    def account(self, rng, rol=None):
+        rol = rol or rng.choice(["alumno", "alumno", "alumno", "maestro"])
+        i = rng.randrange(self.sizes[rol])
+        return {"username": f"{rol}.{i}@{self.domain}", "password": self.password}
+
+    def record(self, name, seconds, status):
+        with self.lock:
+            self.samples.setdefault(name, []).append(seconds)
+            por_status = self.statuses.setdefault(name, {})
+            por_status[str(status)] = por_status.get(str(status), 0) + 1
+            if self.budget is not None:
+                self.budget -= 1
+
+    def remaining(self):
+        return self.budget is None or self.budget > 0
+
+    def run(self, concurrency, duration):
+        usuarios = [VirtualUser(self, i) for i in range(concurrency)]
+        hilos = [threading.Thread(target=u.setup) for u in usuarios]
+        for h in hilos:
+            h.start()
+        for h in hilos:
+            h.join()
+        # Las sesiones iniciales no cuentan en el resultado
+        self.samples, self.statuses = {}, {}
+
+        inicio = time.perf_counter()
+        deadline = inicio + duration
+        hilos = [
+            threading.Thread(target=u.run, args=(deadline, self.remaining))
+            for u in usuarios
+        ]
+        for h in hilos:
+            h.start()
+        for h in hilos:
+            h.join()
+        return time.perf_counter() - inicio
+
+    def report(self, elapsed):
+        endpoints = {}
+        total = 0
+        for name, valores in sorted(self.samples.items()):
+            valores.sort()
+            total += len(valores)
+            endpoints[name] = {
+                "requests": len(valores),
+                "throughput_rps": round(len(valores) / elapsed, 2),
+                "p50_ms": round(percentile(valores, 50) * 1000, 2),
+                "p95_ms": round(percentile(valores, 95) * 1000, 2),
+                "p99_ms": round(percentile(valores, 99) * 1000, 2),
+                "max_ms": round(valores[-1] * 1000, 2),
+                "status": self.statuses[name],
+            }
+        return {
+            "elapsed_s": round(elapsed, 2),
+            "requests": total,
+            "throughput_rps": round(total / elapsed, 2),
+            "endpoints": endpoints,
+        }
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BASE_DIR,
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+    except OSError:
+        return None
+
+
+def prepare_database(args, env):
+    """
+    Migra la base y la siembra si todavía no tiene los datos sintéticos
+    """
+    manage = [sys.executable, str(BASE_DIR / "manage.py")]
+    subprocess.run(manage + ["migrate", "-v0"], env=env, check=True)
+    sembrada = (
+        subprocess.run(
+            manage
+            + [
+                "shell",
+                "-c",
+                "from django.contrib.auth.models import User;"
+                f"print(User.objects.filter(email__endswith='@{args.domain}').exists())",
+            ],
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+        == "True"
+    )
+    if not sembrada or args.reseed:
+        subprocess.run(
+            manage
+            + [
+                "seed_data",
+                "--clear",
+                "--alumnos",
+                str(args.alumnos),
+                "--maestros",
+                str(args.maestros),
+                "--admins",
+                str(args.admins),
+                "--eventos",
+                str(args.eventos),
+                "--seed",
+                str(args.seed),
+                "--domain",
+                args.domain,
+                "--password",
+                args.password,
+            ],
+            env=env,
+            check=True,
+        )
+
+
+def start_server(args, env):
+    base_url = f"http://127.0.0.1:{args.port}"
+    proc = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "gunicorn",
+            "-w",
+            str(args.workers),
+            "-b",
+            f"127.0.0.1:{args.port}",
+            "--log-level",
+            "warning",
+            "app_movil_escolar_api.wsgi:application",
+        ],
+        cwd=BASE_DIR,
+        env=env,
+    )
+    cliente = Client(base_url, 2)
+    for _ in range(100):
+        try:
+            status, _ = cliente.request("GET", "/_ah/warmup")
+            if status == 200:
+                return proc, base_url
+        except OSError:
+            pass
+        if proc.poll() is not None:
+            raise SystemExit("gunicorn terminó antes de estar listo")
+        time.sleep(0.2)
+    proc.terminate()
+    raise SystemExit("El servidor no respondió a /_ah/warmup")
+
+
+def compare(actual, previo):
+    """
+    Imprime la diferencia de p50/p95 y throughput por endpoint contra otra corrida
+    """
+    print(f"{'endpoint':<18}{'p50 ms':>26}{'p95 ms':>26}{'rps':>26}")
+    for name, datos in actual["endpoints"].items():
+        antes = previo["endpoints"].get(name)
+        if not antes:
+            continue
+        celdas = []
+        for k in ("p50_ms", "p95_ms", "throughput_rps"):
+            delta = (datos[k] - antes[k]) / antes[k] * 100 if antes[k] else 0
+            celdas.append(f"{antes[k]} -> {datos[k]} ({delta:+.0f}%)")
+        print(f"{name:<18}" + "".join(f"{c:>26}" for c in celdas))
+
+
+def parse_mix(texto):
+    mix = dict(DEFAULT_MIX)
+    if texto:
+        mix = {}
+        for parte in texto.split(","):
+            nombre, peso = parte.split("=")
+            if nombre not in DEFAULT_MIX:
+                raise SystemExit(f"Operación desconocida en --mix: {nombre}")
+            mix[nombre] = float(peso)
+    return mix
+
+
+def mezcla(args):
+    """
+    La mezcla a correr: sobre SQLite (la base por defecto) se quitan las
+    operaciones que solo funcionan en Postgres, para no medir errores 400
+    """
+    sqlite = not args.url and (
+        not args.database_url or args.database_url.startswith("sqlite")
+    )
+    if args.mix is None:
+        mix = dict(DEFAULT_MIX)
+        if sqlite:
+            for nombre in SOLO_POSTGRES:
+                mix.pop(nombre)
+            print(
+                f"SQLite: sin {', '.join(SOLO_POSTGRES)} en la mezcla "
+                "(usa --database-url con Postgres para medirlas)",
+                file=sys.stderr,
+            )
+        return mix
+    if sqlite:
+        pedidas = [nombre for nombre in SOLO_POSTGRES if args.mix.get(nombre)]
+        if pedidas:
+            raise SystemExit(
+                f"{', '.join(pedidas)} necesita Postgres (JSONField contains); "
+                "usa --database-url o quítala de --mix"
+            )
+    return args.mix
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--url", help="Usar un servidor ya levantado en lugar de arrancar uno"
+    )
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=20, help="Segundos de carga")
+    parser.add_argument("--requests", type=int, help="Detenerse tras N peticiones")
+    parser.add_argument(
+        "--mix",
+        type=parse_mix,
+        help="p. ej. 'eventos-por-rol=50,login=10,evento-create=5' "
+        "(por defecto DEFAULT_MIX, sin eventos-por-rol sobre SQLite)",
+    )
+    parser.add_argument("--workers", type=int, default=4, help="Workers de gunicorn")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument(
+        "--db",
+        default=os.path.join(tempfile.gettempdir(), "loadtest.db"),
+        help="Archivo SQLite a usar si no se da --database-url",
+    )
+    parser.add_argument(
+        "--database-url", help="Base local distinta de SQLite (dj-database-url)"
+    )
+    parser.add_argument(
+        "--reseed", action="store_true", help="Volver a sembrar la base"
+    )
+    parser.add_argument("--alumnos", type=int, default=5000)
+    parser.add_argument("--maestros", type=int, default=300)
+    parser.add_argument("--admins", type=int, default=20)
+    parser.add_argument("--eventos", type=int, default=2000)
+    parser.add_argument("--domain", default="seed.local")
+    parser.add_argument("--password", default="seed1234")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--output", help="Archivo JSON de salida (por defecto stdout)")
+    parser.add_argument("--compare", help="JSON de una corrida anterior para comparar")
+    args = parser.parse_args()
+    args.mix = mezcla(args)
+
+    proc = None
+    base_url = args.url
+    if not base_url:
+        env = dict(os.environ)
+        env.update(
+            DJANGO_SETTINGS_MODULE="app_movil_escolar_api.settings",
+            DATABASE_URL=args.database_url or f"sqlite:///{os.path.abspath(args.db)}",
+            DATABASE_SSL_REQUIRE="False",
+            DEBUG="False",
+            # La carga sale de una sola IP: con el límite activo los logins
+            # medirían 429, no la API
+            RATELIMIT_ENABLED="False",
+            FRONTEND_URL=env.get("FRONTEND_URL", "http://localhost:4200"),
+        )
+        prepare_database(args, env)
+        proc, base_url = start_server(args, env)
+
+    try:
+        runner = Runner(args, base_url)
+        elapsed = runner.run(args.concurrency, args.duration)
+    finally:
+        if proc:
+            proc.terminate()
+            proc.wait()
+
+    reporte = {
+        "revision": git_revision(),
+        "base_url": base_url,
+        "concurrency": args.concurrency,
+        "workers": None if args.url else args.workers,
+        "dataset": {
+            "alumnos": args.alumnos,
+            "maestros": args.maestros,
+            "admins": args.admins,
+            "eventos": args.eventos,
+        },
+        "mix": args.mix,
+        **runner.report(elapsed),
+    }
+
+    salida = json.dumps(reporte, indent=2)
+    if args.output:
+        Path(args.output).write_text(salida + "\n")
+    else:
+        print(salida)
+    if args.compare:
+        compare(reporte, json.loads(Path(args.compare).read_text()))
+
+
+if __name__ == "__main__":
+    main()